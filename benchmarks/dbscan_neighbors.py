@@ -0,0 +1,88 @@
+"""Compare DBSCAN on the dense distance matrix with DBSCAN on the sparse graph of neighbors.
+
+Embeddings are synthetic stories of about four posts each with noise, which gives a few neighbors
+per post like real news. Prints the best time and the peak memory traced by tracemalloc of both
+modes for each number of posts, the crossover is where the sparse mode becomes faster.
+
+Usage: python benchmarks/dbscan_neighbors.py [--sizes 100 500 1000] [--dimensions 3072]
+"""
+
+import argparse
+import time
+import tracemalloc
+from collections.abc import Callable
+
+import numpy as np
+
+from news_grouper.api.news_grouping.news_groupers.distances import (
+    normalize_embeddings,
+)
+from news_grouper.api.news_grouping.news_groupers.embeddings_groupers import (
+    EmbeddingsDBSCANGrouper,
+)
+
+
+def make_embeddings(posts: int, dimensions: int, seed: int = 0) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    stories = rng.normal(size=(max(posts // 4, 1), dimensions))
+    embeddings = stories[rng.integers(0, len(stories), size=posts)]
+    return normalize_embeddings(
+        embeddings + rng.normal(scale=0.25, size=embeddings.shape)
+    )
+
+
+def cluster(mode: str) -> Callable[[np.ndarray], np.ndarray]:
+    def run(embeddings: np.ndarray) -> np.ndarray:
+        EmbeddingsDBSCANGrouper.neighbors_mode = mode
+        return EmbeddingsDBSCANGrouper._cluster_embeddings(embeddings)
+
+    return run
+
+
+def measure(
+    func: Callable[[np.ndarray], np.ndarray], embeddings: np.ndarray, repeat: int
+) -> tuple[float, float]:
+    """Get the best time in seconds and the peak memory in MiB of a function."""
+    best = min(_timed(func, embeddings) for _ in range(repeat))
+    tracemalloc.start()
+    func(embeddings)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return best, peak / 2**20
+
+
+def _timed(func: Callable[[np.ndarray], np.ndarray], embeddings: np.ndarray) -> float:
+    start = time.perf_counter()
+    func(embeddings)
+    return time.perf_counter() - start
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--sizes",
+        type=int,
+        nargs="+",
+        default=[50, 200, 500, 1000, 2000, 4000, 8000],
+        help="Numbers of posts to cluster.",
+    )
+    parser.add_argument("--dimensions", type=int, default=3072)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    print(f"{'posts':>6} | {'dense s':>8} {'MiB':>7} | {'sparse s':>8} {'MiB':>7}")
+    for posts in args.sizes:
+        embeddings = make_embeddings(posts, args.dimensions)
+        dense_labels = cluster("dense")(embeddings)
+        sparse_labels = cluster("sparse")(embeddings)
+        assert (dense_labels == sparse_labels).all(), "labels differ"  # noqa: S101
+        dense_time, dense_memory = measure(cluster("dense"), embeddings, args.repeat)
+        sparse_time, sparse_memory = measure(cluster("sparse"), embeddings, args.repeat)
+        print(
+            f"{posts:>6} | {dense_time:>8.4f} {dense_memory:>7.1f} "
+            f"| {sparse_time:>8.4f} {sparse_memory:>7.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
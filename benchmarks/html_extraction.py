@@ -0,0 +1,104 @@
+"""Compare engines converting HTML of feed entries to text.
+
+Entries are synthetic articles of paragraphs with inline markup and line breaks, like the
+content of RSS entries, and Telegram messages of rss-bridge.org with a quote. Prints the best
+time per entry in microseconds of every engine for each entry size and the speedup of the
+first engine over the last one.
+
+Usage: python benchmarks/html_extraction.py [--paragraphs 1 5 20 100] [--entries 200]
+"""
+
+import argparse
+import time
+from collections.abc import Callable
+
+from news_grouper.api.news_sources.news_parsers.html_text import TextExtractor
+
+PARAGRAPH = (
+    "<p>Lorem <b>ipsum</b> dolor sit amet, consectetur adipiscing elit.<br>"
+    'Sed do <a href="https://example.com">eiusmod</a> tempor incididunt '
+    "ut labore et <i>dolore</i> magna aliqua.</p>"
+)
+
+
+def make_entries(paragraphs: int, entries: int) -> list[str]:
+    return [f"<div>Entry {i}{PARAGRAPH * paragraphs}</div>" for i in range(entries)]
+
+
+def make_messages(paragraphs: int, entries: int) -> list[str]:
+    return [
+        f'<div class="tgme_widget_message_text">Message {i}{PARAGRAPH * paragraphs}'
+        f"<blockquote>Quote</blockquote></div><div>Footer</div>"
+        for i in range(entries)
+    ]
+
+
+def extract_text(engine: type[TextExtractor]) -> Callable[[str], object]:
+    return engine.extract_text
+
+
+def extract_messages(engine: type[TextExtractor]) -> Callable[[str], object]:
+    def run(content: str) -> list[str]:
+        return engine.extract_selected_texts(
+            content, classes=["tgme_widget_message_text"], tags=["blockquote"]
+        )
+
+    return run
+
+
+def measure(func: Callable[[str], object], entries: list[str], repeat: int) -> float:
+    """Get the best time per entry in microseconds of a function."""
+    best = min(_timed(func, entries) for _ in range(repeat))
+    return best / len(entries) * 1e6
+
+
+def _timed(func: Callable[[str], object], entries: list[str]) -> float:
+    start = time.perf_counter()
+    for entry in entries:
+        func(entry)
+    return time.perf_counter() - start
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--paragraphs",
+        type=int,
+        nargs="+",
+        default=[1, 5, 20, 100],
+        help="Numbers of paragraphs of every entry.",
+    )
+    parser.add_argument("--entries", type=int, default=200)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument(
+        "--engines",
+        nargs="+",
+        default=["lxml", "BeautifulSoup"],
+        help="Names of engines to compare.",
+    )
+    args = parser.parse_args()
+    engines = [TextExtractor.get_subclass_by_name(name) for name in args.engines]
+
+    header = " ".join(f"{engine.name + ' us':>16}" for engine in engines)
+    print(f"{'mode':>9} {'paragraphs':>10} | {header} | {'speedup':>7}")
+    for mode, make, extract in [
+        ("rss", make_entries, extract_text),
+        ("telegram", make_messages, extract_messages),
+    ]:
+        for paragraphs in args.paragraphs:
+            entries = make(paragraphs, args.entries)
+            results = [
+                [extract(engine)(entry) for entry in entries] for engine in engines
+            ]
+            assert all(result == results[0] for result in results), "texts differ"  # noqa: S101
+            times = [
+                measure(extract(engine), entries, args.repeat) for engine in engines
+            ]
+            columns = " ".join(f"{seconds:>16.1f}" for seconds in times)
+            print(
+                f"{mode:>9} {paragraphs:>10} | {columns} | {times[-1] / times[0]:>6.1f}x"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -40,10 +40,20 @@ def register_blueprints(app: APIFlask) -> None:
 
 def register_models() -> None:
     from news_grouper.api.auth import models
+    from news_grouper.api.news_grouping import models  # noqa
     from news_grouper.api.news_sources import models  # noqa
     from news_grouper.api.profiles import models  # noqa
 
 
+def register_commands(app: APIFlask) -> None:
+    from news_grouper.api.news_grouping.commands import embeddings_cli, jobs_cli
+    from news_grouper.api.news_sources.commands import posts_cli
+
+    app.cli.add_command(posts_cli)
+    app.cli.add_command(embeddings_cli)
+    app.cli.add_command(jobs_cli)
+
+
 def create_app(config: type[Config]) -> APIFlask:
     app = APIFlask(__name__, title="News Grouper API")
     app.security_schemes = authorizations
@@ -54,6 +64,7 @@ def create_app(config: type[Config]) -> APIFlask:
     jwt.init_app(app)
     register_models()
     register_blueprints(app)
+    register_commands(app)
     return app
 
 
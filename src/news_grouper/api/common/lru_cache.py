@@ -0,0 +1,105 @@
+"""Thread-safe in-memory LRU cache which the caches and stores of the app are built on."""
+
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Callable
+from datetime import timedelta
+
+
+class LRUCache[K, V]:
+    """Thread-safe LRU cache of at most ``max_entries`` values. If ``ttl`` is given, values expire
+    after it since they were stored.
+
+    >>> cache = LRUCache[str, int](max_entries=2)
+    >>> cache.set("a", 1)
+    >>> cache.set("b", 2)
+    >>> cache.get("a")
+    1
+    >>> cache.set("c", 3)
+    >>> cache.get("b") is None
+    True
+    >>> cache.update("a", lambda value: (value or 0) + 10)
+    11
+    >>> expiring = LRUCache[str, int](max_entries=2, ttl=timedelta(minutes=5))
+    >>> expiring.set("a", 1, stored_at=time.monotonic() - 600)
+    >>> expiring.get("a") is None
+    True
+    """
+
+    def __init__(self, max_entries: int, ttl: timedelta | None = None):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        # time of storing and value by key, least recently used first
+        self._entries: OrderedDict[K, tuple[float, V]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: K) -> V | None:
+        """Get the value of the key and mark it as recently used.
+
+        :param key: The key.
+        :return: The value or None if it isn't cached or expired.
+        """
+        with self._lock:
+            return self._get(key)
+
+    def set(self, key: K, value: V, stored_at: float | None = None) -> None:
+        """Cache the value, evicting the least recently used values if the cache is full.
+
+        :param key: The key.
+        :param value: The value.
+        :param stored_at: When the value was stored in ``time.monotonic`` seconds, e.g. to expire
+            values loaded from another cache in time, or None for now.
+        """
+        with self._lock:
+            self._set(key, value, time.monotonic() if stored_at is None else stored_at)
+
+    def update(self, key: K, update: Callable[[V | None], V]) -> V:
+        """Replace the value of the key with a new value computed from it, so that concurrent
+        updates of the key don't overwrite each other. The function is called under the lock of
+        the cache, so it should be fast.
+
+        :param key: The key.
+        :param update: Gets the current value or None if there is none and returns the new value.
+        :return: The new value.
+        """
+        with self._lock:
+            current = self._get(key)
+            value = update(current)
+            if value is not current:
+                self._set(key, value, time.monotonic())
+            return value
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
+
+    def _get(self, key: K) -> V | None:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        stored_at, value = entry
+        if (
+            self.ttl is not None
+            and time.monotonic() - stored_at > self.ttl.total_seconds()
+        ):
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return value
+
+    def _set(self, key: K, value: V, stored_at: float) -> None:
+        self._entries[key] = (stored_at, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+
+if __name__ == "__main__":
+    import doctest
+
+    doctest.testmod()
@@ -0,0 +1,146 @@
+"""Per-request timings and counters of the news pipeline, reported in the Server-Timing header and
+logged, so slow requests can be attributed to a stage.
+
+Code deep in the pipeline records metrics with ``timed`` and ``count``, which do nothing outside
+of ``collect_metrics``. Metrics are kept in a context variable, so worker threads only record them
+when they run in a copy of the request's context, see ``in_current_context``. Durations recorded
+by several threads at once, e.g. extraction of all sources, are summed.
+"""
+
+import contextvars
+import threading
+import time
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+
+
+@dataclass
+class PipelineMetrics:
+    # total seconds spent in every stage, in the order stages were first recorded
+    durations: dict[str, float] = field(default_factory=dict)
+    counters: dict[str, int] = field(default_factory=dict)
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+
+    def add_duration(self, stage: str, seconds: float) -> None:
+        with self._lock:
+            self.durations[stage] = self.durations.get(stage, 0.0) + seconds
+
+    def count(self, name: str, value: int = 1) -> None:
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + value
+
+    def server_timing(self) -> str:
+        """Format metrics as the value of the Server-Timing header, durations in milliseconds and
+        counters as descriptions.
+
+        >>> metrics = PipelineMetrics()
+        >>> metrics.add_duration("fetch", 0.1234)
+        >>> metrics.count("posts", 42)
+        >>> metrics.server_timing()
+        'fetch;dur=123.4, posts;desc=42'
+        """
+        with self._lock:
+            return ", ".join(
+                [
+                    *(
+                        f"{stage};dur={seconds * 1000:.1f}"
+                        for stage, seconds in self.durations.items()
+                    ),
+                    *(f"{name};desc={value}" for name, value in self.counters.items()),
+                ]
+            )
+
+    def log_fields(self) -> str:
+        """Format metrics as space separated key=value pairs for a log line.
+
+        >>> metrics = PipelineMetrics()
+        >>> metrics.add_duration("fetch", 0.1234)
+        >>> metrics.count("posts", 42)
+        >>> metrics.log_fields()
+        'fetch_ms=123.4 posts=42'
+        """
+        with self._lock:
+            return " ".join(
+                [
+                    *(
+                        f"{stage}_ms={seconds * 1000:.1f}"
+                        for stage, seconds in self.durations.items()
+                    ),
+                    *(f"{name}={value}" for name, value in self.counters.items()),
+                ]
+            )
+
+
+_current_metrics: contextvars.ContextVar[PipelineMetrics | None] = (
+    contextvars.ContextVar("pipeline_metrics", default=None)
+)
+
+
+@contextmanager
+def collect_metrics(
+    metrics: PipelineMetrics | None = None,
+) -> Iterator[PipelineMetrics]:
+    """Collect metrics recorded in the current context until the block exits.
+
+    :param metrics: The metrics to add to, e.g. to keep collecting metrics of a request while its
+        response is streamed, or None for new metrics.
+    :return: The collected metrics.
+    """
+    if metrics is None:
+        metrics = PipelineMetrics()
+    token = _current_metrics.set(metrics)
+    try:
+        yield metrics
+    finally:
+        _current_metrics.reset(token)
+
+
+@contextmanager
+def timed(stage: str) -> Iterator[None]:
+    """Add the duration of the block to the stage if metrics are collected.
+
+    :param stage: The name of the stage, a token of the Server-Timing header.
+    """
+    metrics = _current_metrics.get()
+    if metrics is None:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        metrics.add_duration(stage, time.perf_counter() - start)
+
+
+def count(name: str, value: int = 1) -> None:
+    """Add the value to the counter if metrics are collected.
+
+    :param name: The name of the counter, a token of the Server-Timing header.
+    :param value: The value to add.
+    """
+    metrics = _current_metrics.get()
+    if metrics is not None:
+        metrics.count(name, value)
+
+
+def in_current_context[**P, R](func: Callable[P, R]) -> Callable[P, R]:
+    """Wrap the function to run in a copy of the current context, so it records metrics of the
+    current request when it runs in a worker thread.
+
+    :param func: The function.
+    :return: The wrapped function.
+    """
+    context = contextvars.copy_context()
+
+    def wrapper(*args: P.args, **kwargs: P.kwargs) -> R:
+        # a context can't be entered by several threads at once
+        return context.copy().run(func, *args, **kwargs)
+
+    return wrapper
+
+
+if __name__ == "__main__":
+    import doctest
+
+    doctest.testmod()
@@ -1,7 +1,9 @@
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from datetime import datetime, timezone
 
+import sqlalchemy as sa
 from sqlalchemy import orm as so
+from sqlalchemy.dialects import postgresql, sqlite
 
 
 @dataclass
@@ -11,6 +13,8 @@ class Post:
     published_time: datetime
     author: str
     link: str
+    # authors of copies of the post from other sources merged into it
+    other_authors: list[str] = field(default_factory=list)
 
 
 @dataclass
@@ -27,3 +31,23 @@ class TimestampMixin:
         default=lambda: datetime.now(timezone.utc),
         onupdate=lambda: datetime.now(timezone.utc),
     )
+
+
+def insert_ignoring_conflicts(
+    session: so.Session | so.scoped_session, model: type, rows: list[dict]
+) -> None:
+    """Insert rows, silently skipping rows which conflict with existing primary or unique keys.
+
+    Concurrent requests may try to insert the same rows, e.g. cache entries, so conflicts are
+    expected and harmless.
+    """
+    if not rows:
+        return
+    dialect = session.get_bind().dialect.name
+    if dialect == "postgresql":
+        statement = postgresql.insert(model).on_conflict_do_nothing()
+    elif dialect == "sqlite":
+        statement = sqlite.insert(model).on_conflict_do_nothing()
+    else:
+        statement = sa.insert(model).prefix_with("IGNORE")
+    session.execute(statement, rows)
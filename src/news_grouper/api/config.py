@@ -26,6 +26,78 @@ class Config:
     JWT_REFRESH_COOKIE_PATH = "/api/refresh"
     JWT_REFRESH_CSRF_COOKIE_PATH = "/api/refresh"
     JWT_COOKIE_SECURE = True
+    # fetching posts from news sources
+    NEWS_FETCH_MAX_WORKERS = int(os.environ.get("NEWS_FETCH_MAX_WORKERS") or 16)
+    NEWS_FETCH_SOURCE_TIMEOUT_SECONDS = float(
+        os.environ.get("NEWS_FETCH_SOURCE_TIMEOUT_SECONDS") or 15
+    )
+    NEWS_FETCH_TOTAL_TIMEOUT_SECONDS = float(
+        os.environ.get("NEWS_FETCH_TOTAL_TIMEOUT_SECONDS") or 30
+    )
+    # HTTP requests of news parsers
+    HTTP_CONNECT_TIMEOUT_SECONDS = float(
+        os.environ.get("HTTP_CONNECT_TIMEOUT_SECONDS") or 5
+    )
+    HTTP_READ_TIMEOUT_SECONDS = float(os.environ.get("HTTP_READ_TIMEOUT_SECONDS") or 10)
+    # number of hosts which keep their connection pools alive
+    HTTP_POOL_HOSTS = int(os.environ.get("HTTP_POOL_HOSTS") or 32)
+    # maximum number of simultaneous connections to a single host
+    HTTP_POOL_CONNECTIONS_PER_HOST = int(
+        os.environ.get("HTTP_POOL_CONNECTIONS_PER_HOST") or 8
+    )
+    # posts ingested by `flask posts ingest`, requests for earlier posts fetch them live
+    POSTS_RETENTION_DAYS = float(os.environ.get("POSTS_RETENTION_DAYS") or 7)
+    # feeds ingested longer ago than this are fetched live, 0 disables reading stored posts
+    POSTS_MAX_AGE_MINUTES = float(os.environ.get("POSTS_MAX_AGE_MINUTES") or 30)
+    # feeds fetched live whose posts are kept in hourly buckets for POSTS_RETENTION_DAYS,
+    # so a sliding time range only fetches posts since the previous request, 0 disables them
+    POST_BUCKETS_MAX_FEEDS = int(os.environ.get("POST_BUCKETS_MAX_FEEDS") or 1024)
+    # maximum number of concurrent Gemini API requests per news request
+    GEMINI_MAX_CONCURRENCY = int(os.environ.get("GEMINI_MAX_CONCURRENCY") or 8)
+    # rate limit of Gemini API requests per API key shared by all requests in the process,
+    # 0 disables it
+    GEMINI_REQUESTS_PER_MINUTE = float(
+        os.environ.get("GEMINI_REQUESTS_PER_MINUTE") or 600
+    )
+    GEMINI_REQUESTS_BURST = int(os.environ.get("GEMINI_REQUESTS_BURST") or 20)
+    # Gemini clients are reused by requests with the same API key to keep connections open
+    GEMINI_CLIENT_POOL_SIZE = int(os.environ.get("GEMINI_CLIENT_POOL_SIZE") or 64)
+    GEMINI_CLIENT_IDLE_MINUTES = float(
+        os.environ.get("GEMINI_CLIENT_IDLE_MINUTES") or 10
+    )
+    # cached embeddings not used for this long are evicted
+    EMBEDDING_CACHE_MAX_AGE_DAYS = float(
+        os.environ.get("EMBEDDING_CACHE_MAX_AGE_DAYS") or 30
+    )
+    EMBEDDING_CACHE_MAX_ENTRIES = int(
+        os.environ.get("EMBEDDING_CACHE_MAX_ENTRIES") or 20000
+    )
+    # summaries of groups with the same posts are reused for this long
+    SUMMARY_CACHE_TTL_HOURS = float(os.environ.get("SUMMARY_CACHE_TTL_HOURS") or 24)
+    SUMMARY_CACHE_MAX_ENTRIES = int(os.environ.get("SUMMARY_CACHE_MAX_ENTRIES") or 2048)
+    # also store summaries in the database to share them between processes and restarts
+    SUMMARY_CACHE_PERSISTENT = os.environ.get(
+        "SUMMARY_CACHE_PERSISTENT", ""
+    ).lower() in ("1", "true", "yes")
+    # responses of the news endpoint are reused for this long, 0 disables the cache
+    NEWS_CACHE_TTL_MINUTES = float(os.environ.get("NEWS_CACHE_TTL_MINUTES") or 5)
+    NEWS_CACHE_MAX_ENTRIES = int(os.environ.get("NEWS_CACHE_MAX_ENTRIES") or 256)
+    # cluster only posts which are new since the previous grouping of the same profile and
+    # grouper, the previous clusters are kept in memory of the process
+    INCREMENTAL_GROUPING = os.environ.get("INCREMENTAL_GROUPING", "").lower() in (
+        "1",
+        "true",
+        "yes",
+    )
+    # grouping jobs run by `flask jobs work`
+    GROUPING_JOB_POLL_SECONDS = float(os.environ.get("GROUPING_JOB_POLL_SECONDS") or 1)
+    # running jobs which didn't change stage for this long are failed
+    GROUPING_JOB_TIMEOUT_MINUTES = float(
+        os.environ.get("GROUPING_JOB_TIMEOUT_MINUTES") or 30
+    )
+    GROUPING_JOB_RETENTION_HOURS = float(
+        os.environ.get("GROUPING_JOB_RETENTION_HOURS") or 24
+    )
 
 
 class DevConfig(Config):
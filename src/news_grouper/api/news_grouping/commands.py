@@ -0,0 +1,66 @@
+import time
+from datetime import datetime, timedelta, timezone
+
+import click
+import sqlalchemy as sa
+from flask import current_app
+from flask.cli import AppGroup
+
+from news_grouper.api import db
+from news_grouper.api.news_grouping.embedding_cache import get_embedding_cache
+from news_grouper.api.news_grouping.jobs import (
+    claim_job,
+    fail_stale_jobs,
+    prune_jobs,
+    run_job,
+)
+from news_grouper.api.news_grouping.models import EmbeddingCacheEntry
+
+embeddings_cli = AppGroup("embeddings", help="Manage the embedding cache.")
+jobs_cli = AppGroup("jobs", help="Run grouping jobs submitted through the API.")
+
+
+@embeddings_cli.command("stats")
+def stats() -> None:
+    """Show the number and size of cached embeddings."""
+    entries, size = db.session.execute(
+        sa.select(
+            sa.func.count(EmbeddingCacheEntry.key),
+            sa.func.coalesce(
+                sa.func.sum(sa.func.length(EmbeddingCacheEntry.vector)), 0
+            ),
+        )
+    ).one()
+    click.echo(f"{entries} cached embeddings, {size / 2**20:.1f} MiB")
+
+
+@embeddings_cli.command("prune")
+def prune() -> None:
+    """Evict old cached embeddings and embeddings exceeding the maximum number of entries."""
+    deleted = get_embedding_cache().prune()
+    click.echo(f"Evicted {deleted} cached embeddings")
+
+
+@jobs_cli.command("work")
+@click.option("--once", is_flag=True, help="Exit when there are no pending jobs left.")
+def work(once: bool) -> None:
+    """Claim pending grouping jobs and run them one at a time."""
+    config = current_app.config
+    timeout = timedelta(minutes=config["GROUPING_JOB_TIMEOUT_MINUTES"])
+    retention = timedelta(hours=config["GROUPING_JOB_RETENTION_HOURS"])
+    while True:
+        now = datetime.now(timezone.utc)
+        fail_stale_jobs(now - timeout)
+        prune_jobs(now - retention)
+        job = claim_job()
+        if job is None:
+            if once:
+                break
+            time.sleep(config["GROUPING_JOB_POLL_SECONDS"])
+            continue
+        started = time.monotonic()
+        run_job(job)
+        click.echo(
+            f"Job {job.id} {job.status} in {time.monotonic() - started:.1f}s"
+            + (f": {job.error}" if job.error else "")
+        )
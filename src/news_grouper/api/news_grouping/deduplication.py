@@ -0,0 +1,119 @@
+"""Merging of copies of the same post from several sources of a profile, e.g. aggregators, mirrors
+or the same feed added twice, before grouping."""
+
+import hashlib
+from dataclasses import dataclass, replace
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+from news_grouper.api.common.models import Post
+
+TRACKING_PARAMS = frozenset(
+    {
+        "fbclid",
+        "gclid",
+        "dclid",
+        "yclid",
+        "msclkid",
+        "igshid",
+        "mc_cid",
+        "mc_eid",
+        "ref_src",
+        "_ga",
+        "_hsenc",
+        "_hsmi",
+    }
+)
+TRACKING_PARAM_PREFIXES = ("utm_",)
+DEFAULT_PORTS = {"http": 80, "https": 443}
+
+
+@dataclass
+class DeduplicatedPosts:
+    posts: list[Post]
+    removed: int
+
+
+def deduplicate_posts(posts: list[Post]) -> DeduplicatedPosts:
+    """Merge posts with the same canonical link or the same normalized body into the first of them,
+    which keeps the authors of the other copies in ``other_authors``.
+
+    :param posts: The posts of all sources.
+    :return: The posts without duplicates in their original order and the number of removed posts.
+    """
+    parents = list(range(len(posts)))
+
+    def find(i: int) -> int:
+        while parents[i] != i:
+            parents[i] = parents[parents[i]]
+            i = parents[i]
+        return i
+
+    first_with_key: dict[tuple[str, str | bytes], int] = {}
+    for i, post in enumerate(posts):
+        for key in _duplicate_keys(post):
+            first = find(first_with_key.setdefault(key, i))
+            root = find(i)
+            # the first post of duplicates is the root, so it is kept
+            parents[max(first, root)] = min(first, root)
+
+    duplicates: dict[int, list[Post]] = {}
+    for i, post in enumerate(posts):
+        duplicates.setdefault(find(i), []).append(post)
+    merged = []
+    for kept, *copies in duplicates.values():
+        if not copies:
+            merged.append(kept)
+            continue
+        authors = list(kept.other_authors)
+        for copy in copies:
+            authors += [copy.author, *copy.other_authors]
+        other_authors = [
+            author
+            for author in dict.fromkeys(authors)
+            if author and author != kept.author
+        ]
+        merged.append(replace(kept, other_authors=other_authors))
+    return DeduplicatedPosts(merged, len(posts) - len(merged))
+
+
+def canonical_url(url: str) -> str:
+    """Normalize the link of a post so that links to the same page are equal: the host is
+    lowercase, the default port of the scheme, a trailing slash, the fragment and known tracking
+    parameters are removed, and the other parameters are sorted. The scheme and subdomains are
+    kept, since sites may serve different pages on them.
+
+    >>> canonical_url("HTTPS://www.Example.com:443/news/1/?utm_source=rss&b=2&a=1#comments")
+    'https://www.example.com/news/1?a=1&b=2'
+    >>> canonical_url("http://example.com/?fbclid=abc&ref=home")
+    'http://example.com/?ref=home'
+    """
+    parts = urlsplit(url.strip())
+    host = (parts.hostname or "").lower()
+    if parts.port and parts.port != DEFAULT_PORTS.get(parts.scheme):
+        host = f"{host}:{parts.port}"
+    query = sorted(
+        (name, value)
+        for name, value in parse_qsl(parts.query, keep_blank_values=True)
+        if name.lower() not in TRACKING_PARAMS
+        and not name.lower().startswith(TRACKING_PARAM_PREFIXES)
+    )
+    path = parts.path.rstrip("/") or "/"
+    return urlunsplit((parts.scheme, host, path, urlencode(query), ""))
+
+
+def _duplicate_keys(post: Post) -> list[tuple[str, str | bytes]]:
+    """Get keys which are equal for duplicates of the post: its canonical link and the hash of its
+    body with normalized case and whitespace. Empty links and bodies have no keys."""
+    keys: list[tuple[str, str | bytes]] = []
+    if post.link.strip():
+        keys.append(("link", canonical_url(post.link)))
+    body = " ".join(post.body.lower().split())
+    if body:
+        keys.append(("body", hashlib.sha256(body.encode()).digest()))
+    return keys
+
+
+if __name__ == "__main__":
+    import doctest
+
+    doctest.testmod()
@@ -0,0 +1,141 @@
+"""Persistent content-addressed cache of post embeddings."""
+
+import hashlib
+import json
+import logging
+import time
+from collections.abc import Iterable
+from datetime import datetime, timedelta, timezone
+
+import numpy as np
+import sqlalchemy as sa
+from flask import current_app
+
+from news_grouper.api import db
+from news_grouper.api.common.metrics import count
+from news_grouper.api.common.models import insert_ignoring_conflicts
+from news_grouper.api.news_grouping.models import EmbeddingCacheEntry
+from news_grouper.api.news_grouping.news_groupers.gemini import (
+    EMBEDDING_LENGTH,
+    EMBEDDING_MODEL,
+    EMBEDDING_TASK_TYPE,
+)
+
+VECTOR_DTYPE = np.dtype("<f4")
+PRUNE_INTERVAL_SECONDS = 3600
+
+logger = logging.getLogger(__name__)
+
+
+class EmbeddingCache:
+    """Database cache of embeddings keyed by the hash of text and embedding parameters.
+
+    Hits bypass the Gemini API entirely. Entries which were not used for ``max_age`` are evicted,
+    and if there are still more than ``max_entries`` entries, the least recently used are evicted.
+    Hits and misses are counted in the metrics of the current request, so they are reported in
+    its Server-Timing header and log line.
+    """
+
+    def __init__(self, max_age: timedelta, max_entries: int):
+        self.max_age = max_age
+        self.max_entries = max_entries
+        self._last_prune = time.monotonic()
+
+    def get_many(self, texts: Iterable[str]) -> dict[str, list[float]]:
+        """Get cached embeddings of the texts.
+
+        :param texts: The texts to get embeddings for.
+        :return: A dictionary mapping texts to their cached embeddings. Texts without cached
+            embeddings are omitted.
+        """
+        keys = {embedding_key(text): text for text in texts}
+        if not keys:
+            return {}
+        entries = db.session.scalars(
+            sa.select(EmbeddingCacheEntry).where(EmbeddingCacheEntry.key.in_(keys))
+        ).all()
+        found = {
+            keys[entry.key]: np.frombuffer(entry.vector, dtype=VECTOR_DTYPE).tolist()
+            for entry in entries
+        }
+        if entries:
+            db.session.execute(
+                sa.update(EmbeddingCacheEntry)
+                .where(EmbeddingCacheEntry.key.in_([entry.key for entry in entries]))
+                .values(last_used=datetime.now(timezone.utc))
+            )
+            db.session.commit()
+        count("embedding_cache_hits", len(found))
+        count("embedding_cache_misses", len(keys) - len(found))
+        return found
+
+    def set_many(self, embeddings: dict[str, list[float]]) -> None:
+        """Store embeddings of texts in the cache.
+
+        :param embeddings: A dictionary mapping texts to their embeddings.
+        """
+        rows = [
+            {
+                "key": embedding_key(text),
+                "vector": np.asarray(embedding, dtype=VECTOR_DTYPE).tobytes(),
+            }
+            for text, embedding in embeddings.items()
+        ]
+        insert_ignoring_conflicts(db.session, EmbeddingCacheEntry, rows)
+        db.session.commit()
+        if time.monotonic() - self._last_prune > PRUNE_INTERVAL_SECONDS:
+            self.prune()
+
+    def prune(self) -> int:
+        """Evict entries which are too old or exceed the maximum number of entries.
+
+        :return: The number of evicted entries.
+        """
+        self._last_prune = time.monotonic()
+        cutoff = datetime.now(timezone.utc) - self.max_age
+        deleted = db.session.execute(
+            sa.delete(EmbeddingCacheEntry).where(EmbeddingCacheEntry.last_used < cutoff)
+        ).rowcount  # type: ignore
+        oldest_kept = db.session.scalar(
+            sa.select(EmbeddingCacheEntry.last_used)
+            .order_by(EmbeddingCacheEntry.last_used.desc())
+            .offset(self.max_entries)
+            .limit(1)
+        )
+        if oldest_kept is not None:
+            deleted += db.session.execute(
+                sa.delete(EmbeddingCacheEntry).where(
+                    EmbeddingCacheEntry.last_used <= oldest_kept
+                )
+            ).rowcount  # type: ignore
+        db.session.commit()
+        if deleted:
+            logger.info("Evicted %d cached embeddings", deleted)
+        return deleted
+
+
+def get_embedding_cache() -> EmbeddingCache:
+    """Get the embedding cache of the current app, creating it on first use."""
+    cache = current_app.extensions.get("embedding_cache")
+    if cache is None:
+        cache = EmbeddingCache(
+            max_age=timedelta(days=current_app.config["EMBEDDING_CACHE_MAX_AGE_DAYS"]),
+            max_entries=current_app.config["EMBEDDING_CACHE_MAX_ENTRIES"],
+        )
+        current_app.extensions["embedding_cache"] = cache
+    return cache
+
+
+def embedding_key(text: str) -> str:
+    """Get the cache key of the text's embedding for the current embedding parameters.
+
+    >>> len(embedding_key("Some post"))
+    64
+    >>> embedding_key("Some post") == embedding_key("Another post")
+    False
+    """
+    payload = json.dumps(
+        [text, EMBEDDING_MODEL, EMBEDDING_TASK_TYPE, EMBEDDING_LENGTH],
+        ensure_ascii=False,
+    )
+    return hashlib.sha256(payload.encode()).hexdigest()
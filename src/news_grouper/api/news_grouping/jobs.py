@@ -0,0 +1,170 @@
+"""Grouping jobs which run the news pipeline outside of web workers.
+
+Jobs are rows of the grouping_job table: web workers insert them and `flask jobs work` processes
+claim and run them, so no message broker is needed.
+"""
+
+import json
+import logging
+from datetime import datetime, timezone
+
+import sqlalchemy as sa
+
+from news_grouper.api import db
+from news_grouper.api.auth.models import User
+from news_grouper.api.news_grouping.models import (
+    JOB_FAILED,
+    JOB_PENDING,
+    JOB_RUNNING,
+    JOB_SUCCEEDED,
+    GroupingJob,
+)
+from news_grouper.api.news_grouping.pipeline import NoPostsError, get_news
+from news_grouper.api.news_grouping.schemas import NewsResponseSchema
+from news_grouper.api.profiles.models import Profile
+
+logger = logging.getLogger(__name__)
+
+
+def submit_job(
+    user_id: int,
+    profile_id: int,
+    grouper: str,
+    from_datetime: str,
+    to_datetime: str | None,
+    distance_threshold: float | None = None,
+) -> GroupingJob:
+    """Add a pending grouping job.
+
+    :param user_id: The ID of the user who submitted the job.
+    :param profile_id: The ID of the profile to get news for.
+    :param grouper: The name of the grouper.
+    :param from_datetime: The start of the time range of posts in ISO 8601 format.
+    :param to_datetime: The end of the time range of posts in ISO 8601 format or None for now.
+    :param distance_threshold: The distance threshold of the grouper or None for its default.
+    :return: The created job.
+    """
+    job = GroupingJob(
+        user_id=user_id,  # type: ignore
+        profile_id=profile_id,  # type: ignore
+        grouper=grouper,  # type: ignore
+        from_datetime=from_datetime,  # type: ignore
+        to_datetime=to_datetime,  # type: ignore
+        distance_threshold=distance_threshold,  # type: ignore
+        status=JOB_PENDING,  # type: ignore
+    )
+    db.session.add(job)
+    db.session.commit()
+    return job
+
+
+def claim_job() -> GroupingJob | None:
+    """Mark the oldest pending job as running. Safe to call from several worker processes.
+
+    :return: The claimed job or None if there are no pending jobs.
+    """
+    while True:
+        job_id = db.session.scalar(
+            sa.select(GroupingJob.id)
+            .where(GroupingJob.status == JOB_PENDING)
+            .order_by(GroupingJob.id)
+            .limit(1)
+        )
+        if job_id is None:
+            return None
+        now = datetime.now(timezone.utc)
+        claimed = db.session.execute(
+            sa.update(GroupingJob)
+            .where(GroupingJob.id == job_id, GroupingJob.status == JOB_PENDING)
+            .values(status=JOB_RUNNING, started=now, updated=now)
+        ).rowcount  # type: ignore
+        db.session.commit()
+        if claimed:
+            return db.session.get(GroupingJob, job_id, populate_existing=True)
+
+
+def run_job(job: GroupingJob) -> None:
+    """Run the news pipeline of a claimed job and store its result or error.
+
+    :param job: The job to run.
+    """
+
+    def on_stage(stage: str) -> None:
+        job.stage = stage
+        db.session.commit()
+
+    user = db.session.get(User, job.user_id)
+    profile = db.session.get(Profile, job.profile_id)
+    try:
+        if user is None or profile is None:
+            raise NoPostsError("Profile not found")
+        result = get_news(
+            user,
+            profile,
+            job.grouper,
+            datetime.fromisoformat(job.from_datetime),
+            datetime.fromisoformat(job.to_datetime) if job.to_datetime else None,
+            on_stage=on_stage,
+            distance_threshold=job.distance_threshold,
+        )
+    except NoPostsError as e:
+        _finish(job, JOB_FAILED, error=str(e))
+    except Exception:
+        logger.exception("Grouping job %d failed", job.id)
+        _finish(job, JOB_FAILED, error="Internal error")
+    else:
+        _finish(
+            job, JOB_SUCCEEDED, result=json.dumps(NewsResponseSchema().dump(result))
+        )
+
+
+def fail_stale_jobs(not_updated_since: datetime) -> int:
+    """Fail running jobs whose worker stopped, e.g. because it was killed.
+
+    :param not_updated_since: Running jobs which didn't change stage since then are failed.
+    :return: The number of failed jobs.
+    """
+    failed = db.session.execute(
+        sa.update(GroupingJob)
+        .where(
+            GroupingJob.status == JOB_RUNNING,
+            GroupingJob.updated < not_updated_since,
+        )
+        .values(
+            status=JOB_FAILED,
+            error="Job timed out",
+            finished=datetime.now(timezone.utc),
+        )
+    ).rowcount  # type: ignore
+    db.session.commit()
+    return failed
+
+
+def prune_jobs(finished_before: datetime) -> int:
+    """Delete jobs which finished before the given time.
+
+    :param finished_before: Jobs which finished before this time are deleted.
+    :return: The number of deleted jobs.
+    """
+    deleted = db.session.execute(
+        sa.delete(GroupingJob).where(
+            GroupingJob.status.in_([JOB_SUCCEEDED, JOB_FAILED]),
+            GroupingJob.finished < finished_before,
+        )
+    ).rowcount  # type: ignore
+    db.session.commit()
+    return deleted
+
+
+def _finish(
+    job: GroupingJob, status: str, result: str | None = None, error: str | None = None
+) -> None:
+    db.session.rollback()
+    job.status = status
+    if status != JOB_FAILED:
+        # failed jobs keep the stage which failed
+        job.stage = None
+    job.result = result
+    job.error = error
+    job.finished = datetime.now(timezone.utc)
+    db.session.commit()
@@ -0,0 +1,79 @@
+from datetime import datetime, timezone
+
+import sqlalchemy as sa
+from sqlalchemy import orm as so
+
+from news_grouper.api import db
+from news_grouper.api.common.models import TimestampMixin
+
+JOB_PENDING = "pending"
+JOB_RUNNING = "running"
+JOB_SUCCEEDED = "succeeded"
+JOB_FAILED = "failed"
+
+
+class EmbeddingCacheEntry(db.Model):
+    """Embedding addressed by the hash of the embedded text and the embedding parameters."""
+
+    __tablename__ = "embedding_cache"
+
+    key: so.Mapped[str] = so.mapped_column(sa.String(64), primary_key=True)
+    # little-endian float32 vector
+    vector: so.Mapped[bytes] = so.mapped_column(sa.LargeBinary())
+    created: so.Mapped[datetime] = so.mapped_column(
+        default=lambda: datetime.now(timezone.utc)
+    )
+    last_used: so.Mapped[datetime] = so.mapped_column(
+        default=lambda: datetime.now(timezone.utc), index=True
+    )
+
+    def __repr__(self):
+        return f"EmbeddingCacheEntry(key={self.key!r}, last_used={self.last_used!r})"
+
+
+class SummaryCacheEntry(db.Model):
+    """Summary of a group addressed by the hash of the group's posts and summarization parameters."""
+
+    __tablename__ = "summary_cache"
+
+    key: so.Mapped[str] = so.mapped_column(sa.String(64), primary_key=True)
+    summary: so.Mapped[str] = so.mapped_column(sa.Text())
+    # JSON list of content hashes of posts in the order they were summarized in
+    post_hashes: so.Mapped[str] = so.mapped_column(sa.Text())
+    created: so.Mapped[datetime] = so.mapped_column(
+        default=lambda: datetime.now(timezone.utc), index=True
+    )
+
+    def __repr__(self):
+        return f"SummaryCacheEntry(key={self.key!r}, created={self.created!r})"
+
+
+class GroupingJob(TimestampMixin, db.Model):
+    """Grouping run submitted through the jobs API and executed by `flask jobs work`."""
+
+    __tablename__ = "grouping_job"
+
+    id: so.Mapped[int] = so.mapped_column(primary_key=True)
+    user_id: so.Mapped[int] = so.mapped_column(sa.ForeignKey("user.id"))
+    profile_id: so.Mapped[int] = so.mapped_column(
+        sa.ForeignKey("profile.id", ondelete="CASCADE")
+    )
+    grouper: so.Mapped[str] = so.mapped_column(sa.String(256))
+    # ISO 8601 datetimes as given in the request
+    from_datetime: so.Mapped[str] = so.mapped_column(sa.String(64))
+    to_datetime: so.Mapped[str | None] = so.mapped_column(sa.String(64))
+    distance_threshold: so.Mapped[float | None]
+    status: so.Mapped[str] = so.mapped_column(
+        sa.String(16), default=JOB_PENDING, index=True
+    )
+    stage: so.Mapped[str | None] = so.mapped_column(sa.String(32))
+    # JSON dump of NewsResponseSchema
+    result: so.Mapped[str | None] = so.mapped_column(sa.Text())
+    error: so.Mapped[str | None] = so.mapped_column(sa.Text())
+    started: so.Mapped[datetime | None]
+    finished: so.Mapped[datetime | None]
+
+    def __repr__(self):
+        return (
+            f"GroupingJob(id={self.id!r}, status={self.status!r}, stage={self.stage!r})"
+        )
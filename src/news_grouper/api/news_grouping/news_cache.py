@@ -0,0 +1,126 @@
+"""Cache of complete news responses, so reloading the same view of a profile skips the pipeline and
+clients can revalidate it with its ETag."""
+
+import hashlib
+import json
+from collections.abc import Iterable
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import cast
+
+from flask import current_app
+
+from news_grouper.api.common.lru_cache import LRUCache
+from news_grouper.api.news_grouping.news_groupers.gemini import SUMMARY_FAILED_MESSAGE
+from news_grouper.api.news_grouping.schemas import NewsResponseSchema
+from news_grouper.api.news_sources.models import NewsSource, as_utc
+
+
+@dataclass
+class CachedNews:
+    # the news serialized with NewsResponseSchema
+    news: dict
+    # strong ETag of the serialized news without quotes
+    etag: str
+
+
+class NewsCache:
+    """Thread-safe LRU cache of at most ``max_entries`` news responses which expire after ``ttl``.
+
+    Keys include a fingerprint of the profile's sources, so news of a profile whose sources
+    changed are never served and age out of the cache.
+    """
+
+    def __init__(self, ttl: timedelta, max_entries: int):
+        self.ttl = ttl
+        self._news = LRUCache[str, CachedNews](max_entries, ttl)
+
+    def get(self, key: str) -> CachedNews | None:
+        """Get cached news.
+
+        :param key: The key from ``news_key``.
+        :return: The news or None if they aren't cached or expired.
+        """
+        return self._news.get(key)
+
+    def set(self, key: str, news: dict) -> CachedNews:
+        """Serialize news and cache them unless some sources or summaries failed, so the next
+        request retries them.
+
+        :param key: The key from ``news_key``.
+        :param news: The news returned by ``pipeline.get_news`` or collected from a stream with
+            ``pipeline.collect_news``.
+        :return: The serialized news with their ETag.
+        """
+        serialized = cast(dict, NewsResponseSchema().dump(news))
+        payload = json.dumps(serialized, sort_keys=True, ensure_ascii=False)
+        cached = CachedNews(serialized, hashlib.sha256(payload.encode()).hexdigest())
+        failed = serialized["failed_sources"] or any(
+            group["summary"].endswith(SUMMARY_FAILED_MESSAGE)
+            for group in serialized["post_groups"]
+        )
+        if not failed and self.ttl > timedelta(0):
+            self._news.set(key, cached)
+        return cached
+
+    def clear(self) -> None:
+        self._news.clear()
+
+
+def get_news_cache() -> NewsCache:
+    """Get the news cache of the current app, creating it on first use."""
+    cache = current_app.extensions.get("news_cache")
+    if cache is None:
+        cache = NewsCache(
+            ttl=timedelta(minutes=current_app.config["NEWS_CACHE_TTL_MINUTES"]),
+            max_entries=current_app.config["NEWS_CACHE_MAX_ENTRIES"],
+        )
+        current_app.extensions["news_cache"] = cache
+    return cache
+
+
+def news_key(
+    profile_id: int,
+    sources: Iterable[NewsSource],
+    grouper_name: str,
+    from_datetime: datetime,
+    to_datetime: datetime | None,
+    distance_threshold: float | None = None,
+) -> str:
+    """Get the cache key of news of a profile. Datetimes are compared in UTC, naive ones are
+    treated as UTC.
+
+    :param profile_id: The id of the profile.
+    :param sources: The sources of the profile, their fingerprint is a part of the key.
+    :param grouper_name: The name of the grouper.
+    :param from_datetime: The start of the time range of posts.
+    :param to_datetime: The end of the time range of posts or None for now.
+    :param distance_threshold: The distance threshold of the grouper or None for its default.
+    :return: The key.
+    """
+    payload = json.dumps(
+        [
+            profile_id,
+            sorted([source.id, source.parser_name, source.link] for source in sources),
+            grouper_name,
+            _utc_isoformat(from_datetime),
+            _utc_isoformat(to_datetime) if to_datetime else None,
+            distance_threshold,
+        ]
+    )
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+def _utc_isoformat(value: datetime) -> str:
+    """Format the datetime in UTC, so equal instants in different timezones are equal.
+
+    >>> _utc_isoformat(datetime.fromisoformat("2025-01-01T12:00:00+02:00"))
+    '2025-01-01T10:00:00+00:00'
+    """
+    return as_utc(value).astimezone(timezone.utc).isoformat()
+
+
+if __name__ == "__main__":
+    import doctest
+
+    doctest.testmod()
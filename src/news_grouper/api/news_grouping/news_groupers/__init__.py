@@ -1,7 +1,21 @@
-from news_grouper.api.news_grouping.news_groupers.abstract_grouper import NewsGrouper
+from news_grouper.api.news_grouping.news_groupers.abstract_grouper import (
+    GroupingOptions,
+    NewsGrouper,
+)
 from news_grouper.api.news_grouping.news_groupers.embeddings_groupers import (
     EmbeddingsAgglomerativeGrouper,
     EmbeddingsDBSCANGrouper,
 )
+from news_grouper.api.news_grouping.news_groupers.local_groupers import (
+    LocalAgglomerativeGrouper,
+    LocalDBSCANGrouper,
+)
 
-__all__ = ["EmbeddingsAgglomerativeGrouper", "EmbeddingsDBSCANGrouper", "NewsGrouper"]
+__all__ = [
+    "EmbeddingsAgglomerativeGrouper",
+    "EmbeddingsDBSCANGrouper",
+    "GroupingOptions",
+    "LocalAgglomerativeGrouper",
+    "LocalDBSCANGrouper",
+    "NewsGrouper",
+]
@@ -1,37 +1,166 @@
+import logging
 from abc import ABC, abstractmethod
-from collections.abc import Iterable
+from collections.abc import Callable, Iterable, Iterator
+from dataclasses import dataclass
 
+from news_grouper.api.common.metrics import count, timed
 from news_grouper.api.common.models import Post, PostGroup
 from news_grouper.api.common.subclass_registrar import SubclassRegistrar
 from news_grouper.api.news_grouping.news_groupers.gemini import GeminiClient
 
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class GroupingOptions:
+    """Options of a grouping request. Groupers ignore options they don't support."""
+
+    # identifies repeated groupings of the same feed, e.g. a profile, so the grouper can update
+    # its previous grouping instead of starting from scratch
+    state_key: str | None = None
+    # maximum distance between grouped posts, None for the grouper's default
+    distance_threshold: float | None = None
+
 
 class NewsGrouper(SubclassRegistrar, ABC):
     """Abstract base class for news groupers."""
 
     name: str
     description: str
+    # identifies the summarization method in summary cache keys, groupers overriding
+    # summarize_posts should use their own value
+    summarizer = "gemini"
 
     @classmethod
     def group_posts(
-        cls, posts: list[Post], gemini_client: GeminiClient
+        cls,
+        posts: list[Post],
+        gemini_client: GeminiClient,
+        on_stage: Callable[[str], None] | None = None,
+        options: GroupingOptions | None = None,
     ) -> list[Post | PostGroup]:
-        """Group posts based on some criteria.
+        """Group posts based on some criteria. Groups are summarized concurrently.
 
         :param posts: The list of posts to group.
         :param gemini_client: The Gemini client to use for API calls.
+        :param on_stage: Called with "grouping" and "summarizing" when these stages start.
+        :param options: Options of the grouping, defaults are used if None.
         :return: A list of grouped posts.
         """
-        groups = cls._get_groups(posts, gemini_client)
-        result = []
-        for group_posts in groups:
-            if len(group_posts) == 1:
-                result.append(group_posts[0])
-            else:
-                summary = cls.summarize_posts(group_posts, gemini_client)
-                result.append(PostGroup(posts=group_posts, summary=summary))
+        groups, summarized_groups = cls.group_posts_progressively(
+            posts, gemini_client, on_stage, options=options
+        )
+        result: list[Post | PostGroup] = [
+            group_posts[0] if len(group_posts) == 1 else PostGroup(group_posts, "")
+            for group_posts in groups
+        ]
+        for i, group in summarized_groups:
+            result[i] = group  # type: ignore
         return result
 
+    @classmethod
+    def group_posts_progressively(
+        cls,
+        posts: list[Post],
+        gemini_client: GeminiClient,
+        on_stage: Callable[[str], None] | None = None,
+        stream_summaries: bool = False,
+        options: GroupingOptions | None = None,
+    ) -> tuple[list[list[Post]], Iterator[tuple[int, PostGroup | str]]]:
+        """Group posts and summarize the groups lazily, so groups can be shown before their
+        summaries are ready.
+
+        :param posts: The list of posts to group.
+        :param gemini_client: The Gemini client to use for API calls.
+        :param on_stage: Called with "grouping" and "summarizing" when these stages start.
+        :param stream_summaries: Whether to also yield text chunks of summaries as they are
+            generated, before the summarized group.
+        :param options: Options of the grouping, defaults are used if None.
+        :return: The groups, where each group is a list of posts, and an iterator of indexes of
+            groups with more than one post and their summarized groups (or summary chunks if
+            ``stream_summaries`` is set), in the order summaries become ready. Cached summaries
+            come first.
+        """
+        if on_stage:
+            on_stage("grouping")
+        with timed("group"):
+            groups = list(
+                cls._get_groups(posts, gemini_client, options or GroupingOptions())
+            )
+        return groups, cls._summarize_groups(
+            groups, gemini_client, on_stage, stream_summaries
+        )
+
+    @classmethod
+    def _summarize_groups(
+        cls,
+        groups: list[list[Post]],
+        gemini_client: GeminiClient,
+        on_stage: Callable[[str], None] | None = None,
+        stream_summaries: bool = False,
+    ) -> Iterator[tuple[int, PostGroup | str]]:
+        """Summarize groups with more than one post, reusing cached summaries of groups with the
+        same posts.
+
+        :param groups: The groups of posts.
+        :param gemini_client: The Gemini client to use for API calls.
+        :param on_stage: Called with "summarizing" before the first summary is generated.
+        :param stream_summaries: Whether to yield text chunks of generated summaries.
+        :return: An iterator of indexes of groups and summarized groups or summary chunks in the
+            order of completion.
+        """
+        if on_stage:
+            on_stage("summarizing")
+        cache = gemini_client.summary_cache
+        multi_post_groups = [i for i, group in enumerate(groups) if len(group) > 1]
+        missing = []
+        for i in multi_post_groups:
+            cached = cache.get(groups[i], cls.summarizer) if cache else None
+            if cached is None:
+                missing.append(i)
+            else:
+                yield (
+                    i,
+                    PostGroup(
+                        posts=cached.order_posts(groups[i]), summary=cached.summary
+                    ),
+                )
+        if cache and multi_post_groups:
+            logger.info(
+                "Reused %d of %d cached summaries",
+                len(multi_post_groups) - len(missing),
+                len(multi_post_groups),
+            )
+        count("groups", len(multi_post_groups))
+        count("summaries_cached", len(multi_post_groups) - len(missing))
+        count("summaries_generated", len(missing))
+
+        def summarized(i: int, summary: str) -> PostGroup:
+            if cache:
+                cache.set(groups[i], cls.summarizer, summary)
+            return PostGroup(posts=groups[i], summary=summary)
+
+        if not stream_summaries:
+            summaries = gemini_client.map_as_completed(
+                lambda i: cls.summarize_posts(groups[i], gemini_client), missing
+            )
+            with timed("summarize"):
+                for j, summary in summaries:
+                    yield missing[j], summarized(missing[j], summary)
+            return
+
+        chunks: dict[int, list[str]] = {}
+        streams = gemini_client.interleave_streams(
+            lambda i: cls.summarize_posts_stream(groups[i], gemini_client), missing
+        )
+        for j, chunk in streams:
+            i = missing[j]
+            if chunk is None:
+                yield i, summarized(i, "".join(chunks.pop(i, [])))
+            else:
+                chunks.setdefault(i, []).append(chunk)
+                yield i, chunk
+
     @classmethod
     def summarize_posts(cls, posts: list[Post], gemini_client: GeminiClient) -> str:
         """Summarize a list of posts. The default implementation uses Gemini API.
@@ -42,15 +171,32 @@ class NewsGrouper(SubclassRegistrar, ABC):
         """
         return gemini_client.summarize_posts(posts)
 
+    @classmethod
+    def summarize_posts_stream(
+        cls, posts: list[Post], gemini_client: GeminiClient
+    ) -> Iterator[str]:
+        """Summarize a list of posts, yielding the summary in chunks as it is generated. The
+        default implementation streams from Gemini API.
+
+        :param posts: The list of posts to summarize.
+        :param gemini_client: The Gemini client to use for API calls.
+        :return: An iterator of chunks of the summary.
+        """
+        return gemini_client.summarize_posts_stream(posts)
+
     @classmethod
     @abstractmethod
     def _get_groups(
-        cls, posts: list[Post], gemini_client: GeminiClient
+        cls,
+        posts: list[Post],
+        gemini_client: GeminiClient,
+        options: GroupingOptions,
     ) -> Iterable[list[Post]]:
         """Abstract method to get groups of posts.
 
         :param posts: The list of posts to group.
         :param gemini_client: The Gemini client to use for API calls.
+        :param options: Options of the grouping.
         :return: A list of groups, where each group is a list of posts.
         """
         ...
@@ -0,0 +1,47 @@
+"""In-memory cluster assignments kept between groupings of the same profile, so a refresh only
+has to place posts which are new since the previous grouping."""
+
+import hashlib
+import json
+from dataclasses import dataclass
+
+from news_grouper.api.common.lru_cache import LRUCache
+from news_grouper.api.common.models import Post
+
+MAX_CLUSTERING_STATES = 256
+
+
+@dataclass
+class ClusteringState:
+    # cluster label of every post by its key from post_key
+    labels: dict[str, int]
+    # number of posts clustered by the last full clustering
+    clustered_posts: int
+    # posts added or removed since the last full clustering
+    changed_posts: int = 0
+
+
+class ClusteringStateStore(LRUCache[str, ClusteringState]):
+    """Thread-safe LRU store of clustering states keyed by grouper and profile."""
+
+    def __init__(self, max_entries: int = MAX_CLUSTERING_STATES):
+        super().__init__(max_entries)
+
+
+clustering_states = ClusteringStateStore()
+
+
+def post_key(post: Post) -> str:
+    """Identify a post between groupings by its link and content.
+
+    >>> post_key(Post("Title", "Body", None, "Author", "https://example.com/1"))[:16]
+    'b6dcd08858f81f90'
+    """
+    content = json.dumps([post.link, post.author, post.body], ensure_ascii=False)
+    return hashlib.sha256(content.encode()).hexdigest()
+
+
+if __name__ == "__main__":
+    import doctest
+
+    doctest.testmod()
@@ -0,0 +1,162 @@
+"""Memory-efficient cosine distances between embeddings for clustering.
+
+Embeddings are L2-normalized once into a float32 matrix, so cosine distance is one minus a dot
+product. Distances are computed in blocks of rows and written either into a condensed upper
+triangle or into a sparse graph of the pairs within a distance threshold, so the dense NxN matrix
+is never materialized.
+"""
+
+from collections.abc import Iterator, Sequence
+
+import numpy as np
+from scipy import sparse
+
+# number of distances computed at once, 2**22 float32 values take 16 MiB
+BLOCK_SIZE = 2**22
+
+
+def normalize_embeddings(embeddings: Sequence[Sequence[float]]) -> np.ndarray:
+    """Copy embeddings into a float32 matrix of unit-length rows. Zero vectors stay zero.
+
+    >>> normalize_embeddings([[3.0, 4.0], [0.0, 0.0]])
+    array([[0.6, 0.8],
+           [0. , 0. ]], dtype=float32)
+    """
+    normalized = np.empty(
+        (len(embeddings), len(embeddings[0]) if len(embeddings) else 0),
+        dtype=np.float32,
+    )
+    for i, embedding in enumerate(embeddings):
+        normalized[i] = embedding
+    norms = np.linalg.norm(normalized, axis=1, keepdims=True)
+    np.divide(normalized, norms, out=normalized, where=norms > 0)
+    return normalized
+
+
+def dense_cosine_distances(normalized: np.ndarray) -> np.ndarray:
+    """Compute the full float32 matrix of cosine distances between rows, which is the fastest
+    form for a few hundred rows.
+
+    :param normalized: Matrix of unit-length rows from ``normalize_embeddings``.
+    :return: Square matrix of distances.
+    """
+    return _block_distances(normalized, 0, len(normalized))
+
+
+def condensed_cosine_distances(normalized: np.ndarray) -> np.ndarray:
+    """Compute cosine distances of all pairs of rows in the condensed form of
+    ``scipy.spatial.distance.pdist``.
+
+    The result is float64 because scipy's linkage would copy any other dtype.
+
+    :param normalized: Matrix of unit-length rows from ``normalize_embeddings``.
+    :return: Array where the distance between rows i < j is at index
+        ``n * i - i * (i + 1) // 2 + j - i - 1``.
+
+    >>> condensed_cosine_distances(normalize_embeddings([[1, 0], [0, 1], [1, 1]])).round(3)
+    array([1.   , 0.293, 0.293])
+    """
+    n = len(normalized)
+    condensed = np.empty(n * (n - 1) // 2, dtype=np.float64)
+    for start, stop in _row_blocks(n):
+        distances = _block_distances(normalized, start, stop)
+        # the upper triangle of rows start..stop is contiguous in the condensed form
+        rows = np.arange(stop - start)[:, np.newaxis]
+        columns = np.arange(n - start)[np.newaxis, :]
+        condensed[_condensed_offset(n, start) : _condensed_offset(n, stop)] = distances[
+            columns > rows
+        ]
+    return condensed
+
+
+def cosine_radius_neighbors(
+    normalized: np.ndarray, max_distance: float, inclusive: bool = True
+) -> sparse.csr_matrix:
+    """Find all pairs of rows within a cosine distance.
+
+    :param normalized: Matrix of unit-length rows from ``normalize_embeddings``.
+    :param max_distance: The maximum distance between neighbors.
+    :param inclusive: Whether rows exactly ``max_distance`` apart are neighbors.
+    :return: Symmetric sparse matrix of distances between neighbors. Distances of zero are stored
+        explicitly, so stored entries are exactly the neighbors, and every row is its own
+        neighbor.
+
+    >>> graph = cosine_radius_neighbors(
+    ...     normalize_embeddings([[1, 0], [1, 0.1], [0, 1]]), max_distance=0.1
+    ... )
+    >>> graph.nonzero()
+    (array([0, 1], dtype=int32), array([1, 0], dtype=int32))
+    """
+    n = len(normalized)
+    rows, columns, values = [], [], []
+    for start, stop in _row_blocks(n):
+        distances = _block_distances(normalized, start, stop)
+        within = distances <= max_distance if inclusive else distances < max_distance
+        block_rows, block_columns = np.nonzero(within)
+        upper = block_columns > block_rows
+        block_rows, block_columns = block_rows[upper], block_columns[upper]
+        rows.append(block_rows + start)
+        columns.append(block_columns + start)
+        values.append(distances[block_rows, block_columns])
+    upper_rows = np.concatenate(rows) if rows else np.empty(0, dtype=np.intp)
+    upper_columns = np.concatenate(columns) if columns else np.empty(0, dtype=np.intp)
+    upper_values = np.concatenate(values) if values else np.empty(0, dtype=np.float32)
+    diagonal = np.arange(n)
+    return sparse.csr_matrix(
+        (
+            np.concatenate([upper_values, upper_values, np.zeros(n, np.float32)]),
+            (
+                np.concatenate([upper_rows, upper_columns, diagonal]),
+                np.concatenate([upper_columns, upper_rows, diagonal]),
+            ),
+        ),
+        shape=(n, n),
+    )
+
+
+def iter_cosine_distances(
+    normalized: np.ndarray, indices: np.ndarray
+) -> Iterator[np.ndarray]:
+    """Compute distances between some rows and every row, a block of rows at a time.
+
+    :param normalized: Matrix of unit-length rows from ``normalize_embeddings``.
+    :param indices: The indices of rows to compute distances for.
+    :return: Iterator of arrays of distances from each of the rows to every row, in order.
+
+    >>> embeddings = normalize_embeddings([[1, 0], [0, 1], [1, 1]])
+    >>> [distances.round(3) for distances in iter_cosine_distances(embeddings, [2])]
+    [array([0.293, 0.293, 0.   ], dtype=float32)]
+    """
+    for start, stop in _row_blocks(len(indices), len(normalized)):
+        distances = normalized[indices[start:stop]] @ normalized.T
+        np.subtract(1, distances, out=distances)
+        np.maximum(distances, 0, out=distances)
+        yield from distances
+
+
+def _row_blocks(n: int, columns: int | None = None) -> Iterator[tuple[int, int]]:
+    """Split n rows of ``columns`` distances, n by default, into blocks with at most about
+    ``BLOCK_SIZE`` distances each."""
+    rows_per_block = max(BLOCK_SIZE // max(n if columns is None else columns, 1), 1)
+    for start in range(0, n, rows_per_block):
+        yield start, min(start + rows_per_block, n)
+
+
+def _block_distances(normalized: np.ndarray, start: int, stop: int) -> np.ndarray:
+    """Compute distances between rows start..stop and rows start..n."""
+    distances = normalized[start:stop] @ normalized[start:].T
+    np.subtract(1, distances, out=distances)
+    # rounding errors can make distances of equal vectors slightly negative
+    np.maximum(distances, 0, out=distances)
+    return distances
+
+
+def _condensed_offset(n: int, i: int) -> int:
+    """Get the index of the first distance of row i in the condensed form."""
+    return n * i - i * (i + 1) // 2
+
+
+if __name__ == "__main__":
+    import doctest
+
+    doctest.testmod()
@@ -1,38 +1,130 @@
 import itertools
+import logging
 from abc import abstractmethod
 from collections import defaultdict
 from collections.abc import Iterable
 
 import numpy as np
-from sklearn.cluster import DBSCAN, AgglomerativeClustering
-from sklearn.metrics.pairwise import cosine_distances
+from scipy.cluster.hierarchy import fcluster, linkage
+from scipy.sparse.csgraph import connected_components
+from sklearn.cluster import DBSCAN
+from sklearn.neighbors import sort_graph_by_row_values
 
+from news_grouper.api.common.metrics import count, timed
 from news_grouper.api.common.models import Post
-from news_grouper.api.news_grouping.news_groupers.abstract_grouper import NewsGrouper
+from news_grouper.api.news_grouping.news_groupers.abstract_grouper import (
+    GroupingOptions,
+    NewsGrouper,
+)
+from news_grouper.api.news_grouping.news_groupers.clustering_state import (
+    ClusteringState,
+    clustering_states,
+    post_key,
+)
+from news_grouper.api.news_grouping.news_groupers.distances import (
+    condensed_cosine_distances,
+    cosine_radius_neighbors,
+    dense_cosine_distances,
+    iter_cosine_distances,
+    normalize_embeddings,
+)
 from news_grouper.api.news_grouping.news_groupers.gemini import GeminiClient
+from news_grouper.api.news_grouping.news_groupers.linkage_cache import (
+    LinkageTree,
+    embeddings_key,
+    linkage_trees,
+)
+from news_grouper.api.news_grouping.news_groupers.near_duplicates import (
+    near_duplicate_clusters,
+)
+
+# number of posts from which DBSCAN on the sparse neighbors graph is as fast as on the dense
+# distance matrix while taking a fraction of its memory, see benchmarks/dbscan_neighbors.py
+SPARSE_NEIGHBORS_MIN_POSTS = 1000
+# distance at which linkage trees of separate components are joined, above any cosine distance
+COMPONENTS_DISTANCE = 2.0
+
+logger = logging.getLogger(__name__)
 
 
 class EmbeddingsGrouper(NewsGrouper):
     """Abstract base class for groupers that use embeddings."""
 
+    # posts added or removed since the last full clustering, as a fraction of the posts it
+    # clustered, above which incremental clustering clusters all posts again
+    max_drift = 0.25
+    # estimated Jaccard similarity of word shingles from which posts are near-duplicates which
+    # share the embedding of one of them, None disables collapsing near-duplicates
+    near_duplicate_similarity: float | None = 0.8
+
     @classmethod
     def _get_groups(
-        cls, posts: list[Post], gemini_client: GeminiClient
+        cls,
+        posts: list[Post],
+        gemini_client: GeminiClient,
+        options: GroupingOptions,
     ) -> Iterable[list[Post]]:
-        """Group posts based on their embeddings.
+        """Group posts based on their embeddings. If ``options.state_key`` is given, posts are
+        clustered incrementally, reusing the clusters of the previous grouping with the same key.
+
+        Near-duplicates are collapsed into their first post before computing embeddings and
+        added to its group afterwards.
 
         :param posts: The list of posts to group.
         :param gemini_client: The Gemini client to use for API calls.
+        :param options: Options of the grouping.
         :return: A list of groups, where each group is a list of posts.
         """
-        embeddings, posts_with_failed_embeddings, posts_with_successful_embeddings = (
-            cls._computes_embeddings(posts, gemini_client)
-        )
-        labels = cls._cluster_embeddings(np.stack(embeddings))
+        with timed("near_duplicates"):
+            duplicates = cls._collapse_near_duplicates(posts)
+        representatives = [group[0] for group in duplicates.values()]
+        with timed("embed"):
+            (
+                embeddings,
+                posts_with_failed_embeddings,
+                posts_with_successful_embeddings,
+            ) = cls._computes_embeddings(representatives, gemini_client)
+        with timed("cluster"):
+            if not embeddings:
+                labels = np.empty(0, dtype=np.intp)
+            elif options.state_key is None:
+                labels = cls._cluster_embeddings(
+                    normalize_embeddings(embeddings), options.distance_threshold
+                )
+            else:
+                labels = cls._cluster_incrementally(
+                    normalize_embeddings(embeddings),
+                    posts_with_successful_embeddings,
+                    options.state_key,
+                    options.distance_threshold,
+                )
         groups = cls._labels_to_groups(labels, posts_with_successful_embeddings)
         return itertools.chain(
-            groups.values(), [[post] for post in posts_with_failed_embeddings]
+            (
+                [duplicate for post in group for duplicate in duplicates[id(post)]]
+                for group in groups.values()
+            ),
+            (duplicates[id(post)] for post in posts_with_failed_embeddings),
+        )
+
+    @classmethod
+    def _collapse_near_duplicates(cls, posts: list[Post]) -> dict[int, list[Post]]:
+        """Find near-duplicate bodies of posts, e.g. reposts of the same wire story.
+
+        :param posts: The posts.
+        :return: Near-duplicates of every post which represents them, including the post itself,
+            keyed by the ``id`` of that post, in the order of posts.
+        """
+        if cls.near_duplicate_similarity is None:
+            return {id(post): [post] for post in posts}
+        clusters = near_duplicate_clusters(
+            [post.body for post in posts], cls.near_duplicate_similarity
         )
+        if len(clusters) < len(posts):
+            logger.info("Collapsed %d near-duplicate posts", len(posts) - len(clusters))
+        return {
+            id(posts[cluster[0]]): [posts[i] for i in cluster] for cluster in clusters
+        }
 
     @classmethod
     def _computes_embeddings(
@@ -46,16 +138,39 @@ class EmbeddingsGrouper(NewsGrouper):
             - A list of posts for which embedding computation failed.
             - A list of posts for which embedding computation succeeded. Here ith post corresponds to ith embedding.
         """
+        cache = gemini_client.embedding_cache
+        cached = cache.get_many(post.body for post in posts) if cache else {}
+        # embed every distinct body once
+        missing = list(
+            {post.body: post for post in posts if post.body not in cached}.values()
+        )
+        computed = {
+            post.body: embedding
+            for post, embedding in zip(
+                missing, gemini_client.compute_embeddings(missing), strict=True
+            )
+            if embedding is not None
+        }
         embeddings = []
         posts_with_failed_embeddings = []
         posts_with_successful_embeddings = []
         for post in posts:
-            embedding = gemini_client.compute_embedding(post)
+            embedding = cached.get(post.body) or computed.get(post.body)
             if embedding is not None:
                 embeddings.append(embedding)
                 posts_with_successful_embeddings.append(post)
             else:
                 posts_with_failed_embeddings.append(post)
+        if cache and computed:
+            cache.set_many(computed)
+        count("embeddings_computed", len(computed))
+        count("embeddings_failed", len(posts_with_failed_embeddings))
+        logger.info(
+            "Embeddings: %d from cache, %d computed, %d failed",
+            len(cached),
+            len(computed),
+            len(posts_with_failed_embeddings),
+        )
         return (
             embeddings,
             posts_with_failed_embeddings,
@@ -76,12 +191,91 @@ class EmbeddingsGrouper(NewsGrouper):
             groups[label].append(posts[i])
         return groups
 
+    @classmethod
+    def _cluster_incrementally(
+        cls,
+        embeddings: np.ndarray,
+        posts: list[Post],
+        state_key: str,
+        threshold: float | None = None,
+    ) -> np.ndarray:
+        """Cluster embeddings, keeping the clusters of posts from the previous grouping with the
+        same key and assigning only new posts with ``_assign_embeddings``.
+
+        The cost is proportional to the number of new posts instead of all posts. Clusters aren't
+        split when their posts leave the time range and new posts don't regroup older ones as a
+        full clustering would, so all posts are clustered again once the posts added or removed
+        since the last full clustering exceed ``max_drift`` of the posts it clustered.
+
+        :param embeddings: Float32 matrix of L2-normalized embeddings to cluster.
+        :param posts: The posts of the embeddings.
+        :param state_key: The key of the previous grouping, e.g. the profile.
+        :param threshold: The distance threshold of the grouper or None for its default.
+        :return: Array where ith element is the cluster label for the ith embedding.
+        """
+        key = f"{cls.name}:{threshold}:{state_key}"
+        keys = [post_key(post) for post in posts]
+        state = clustering_states.get(key)
+        if state is not None:
+            known = np.array([k in state.labels for k in keys], dtype=bool)
+            removed = len(state.labels.keys() - set(keys))
+            changed = state.changed_posts + int((~known).sum()) + removed
+            if known.any() and changed <= cls.max_drift * state.clustered_posts:
+                labels = np.empty(len(keys), dtype=np.intp)
+                labels[known] = [
+                    state.labels[k] for k in itertools.compress(keys, known)
+                ]
+                labels = cls._assign_embeddings(embeddings, labels, known, threshold)
+                clustering_states.set(
+                    key,
+                    ClusteringState(
+                        dict(zip(keys, labels.tolist(), strict=True)),
+                        clustered_posts=state.clustered_posts,
+                        changed_posts=changed,
+                    ),
+                )
+                logger.info(
+                    "Incrementally clustered %d new posts, %d removed",
+                    len(keys) - int(known.sum()),
+                    removed,
+                )
+                return labels
+        labels = cls._cluster_embeddings(embeddings, threshold)
+        clustering_states.set(
+            key,
+            ClusteringState(
+                dict(zip(keys, labels.tolist(), strict=True)), clustered_posts=len(keys)
+            ),
+        )
+        return labels
+
     @classmethod
     @abstractmethod
-    def _cluster_embeddings(cls, embeddings: np.ndarray) -> np.ndarray:
+    def _cluster_embeddings(
+        cls, embeddings: np.ndarray, threshold: float | None = None
+    ) -> np.ndarray:
         """Abstract method to cluster embeddings.
 
-        :param embeddings: Array of embeddings to cluster.
+        :param embeddings: Float32 matrix of L2-normalized embeddings to cluster.
+        :param threshold: The distance threshold of the grouper or None for its default.
+        :return: Array where ith element is the cluster label for the ith embedding.
+        """
+
+    @classmethod
+    @abstractmethod
+    def _assign_embeddings(
+        cls,
+        embeddings: np.ndarray,
+        labels: np.ndarray,
+        assigned: np.ndarray,
+        threshold: float | None = None,
+    ) -> np.ndarray:
+        """Abstract method to add embeddings to existing clusters or new ones, one at a time.
+
+        :param embeddings: Float32 matrix of L2-normalized embeddings.
+        :param labels: Array of cluster labels, valid only where ``assigned`` is set.
+        :param assigned: Boolean array of embeddings which already have a cluster.
+        :param threshold: The distance threshold of the grouper or None for its default.
         :return: Array where ith element is the cluster label for the ith embedding.
         """
 
@@ -94,22 +288,115 @@ class EmbeddingsAgglomerativeGrouper(EmbeddingsGrouper):
         "Better for grouping same news. Converts posts into embeddings using Gemini API, "
         "groups them using DBSCAN and writes summaries using Gemini API."
     )
+    distance_threshold = 0.17
 
     @classmethod
-    def _cluster_embeddings(cls, embeddings: np.ndarray) -> np.ndarray:
-        """Cluster embeddings using Agglomerative Clustering.
+    def _cluster_embeddings(
+        cls, embeddings: np.ndarray, threshold: float | None = None
+    ) -> np.ndarray:
+        """Cluster embeddings using Agglomerative Clustering with complete linkage by cutting
+        their cached linkage tree at the threshold, which takes linear time.
 
-        :param embeddings: Array of embeddings to cluster.
+        :param embeddings: Float32 matrix of L2-normalized embeddings to cluster.
+        :param threshold: The distance threshold or None for ``distance_threshold``.
         :return: Array where ith element is the cluster label for the ith embedding.
         """
-        distance_matrix = cosine_distances(embeddings)
-        clustering = AgglomerativeClustering(
-            n_clusters=None,  # type: ignore
-            distance_threshold=0.17,
-            linkage="complete",
-            metric="precomputed",
-        )
-        return clustering.fit_predict(distance_matrix)
+        if threshold is None:
+            threshold = cls.distance_threshold
+        tree = cls._linkage_tree(embeddings, threshold).tree
+        if tree is None:
+            return np.zeros(len(embeddings), dtype=np.intp)
+        # clusters are merged while their distance is below the threshold
+        labels = fcluster(tree, np.nextafter(threshold, 0), criterion="distance")
+        return labels.astype(np.intp) - 1
+
+    @classmethod
+    def _linkage_tree(cls, embeddings: np.ndarray, threshold: float) -> LinkageTree:
+        """Get the complete linkage tree of embeddings which can be cut at the threshold, from
+        the cache if it was built for the same embeddings with at least this threshold.
+
+        Clusters can't contain posts which are at least the threshold apart, so every cluster
+        lies within a connected component of the graph of closer pairs. Components are linked
+        separately, so only distances within components are computed in full, and their trees are
+        joined above any distance between embeddings.
+
+        :param embeddings: Float32 matrix of L2-normalized embeddings.
+        :param threshold: The highest distance threshold at which the tree will be cut.
+        :return: The tree of embeddings.
+        """
+        key = embeddings_key(embeddings)
+        cached = linkage_trees.get(key)
+        if cached is not None and cached.max_distance >= threshold:
+            return cached
+        n = len(embeddings)
+        neighbors = cosine_radius_neighbors(embeddings, threshold, inclusive=False)
+        n_components, components = connected_components(neighbors, directed=False)
+        order = np.argsort(components, kind="stable")
+        sizes = np.bincount(components, minlength=n_components)
+        tree = np.empty((max(n - 1, 0), 4), dtype=np.float64)
+        row = 0
+        roots = []
+        for indices in np.split(order, np.cumsum(sizes)[:-1]):
+            if len(indices) == 1:
+                roots.append(indices[0])
+                continue
+            component_tree = linkage(
+                condensed_cosine_distances(embeddings[indices]), method="complete"
+            )
+            merges = len(component_tree)
+            # ids of the component's embeddings and clusters in the tree of all embeddings
+            ids = np.concatenate([indices, n + row + np.arange(merges)])
+            tree[row : row + merges, :2] = ids[component_tree[:, :2].astype(np.intp)]
+            tree[row : row + merges, 2:] = component_tree[:, 2:]
+            row += merges
+            roots.append(n + row - 1)
+        cluster, count = roots[0], sizes[0]
+        for root, size in zip(roots[1:], sizes[1:], strict=True):
+            count += size
+            tree[row] = cluster, root, COMPONENTS_DISTANCE, count
+            cluster = n + row
+            row += 1
+        cached = LinkageTree(threshold, tree if n > 1 else None)
+        linkage_trees.set(key, cached)
+        return cached
+
+    @classmethod
+    def _assign_embeddings(
+        cls,
+        embeddings: np.ndarray,
+        labels: np.ndarray,
+        assigned: np.ndarray,
+        threshold: float | None = None,
+    ) -> np.ndarray:
+        """Add every unassigned embedding to the cluster with the closest farthest post, which is
+        the complete linkage distance, if it is below the threshold, otherwise to a new cluster.
+
+        :param embeddings: Float32 matrix of L2-normalized embeddings.
+        :param labels: Array of cluster labels, valid only where ``assigned`` is set.
+        :param assigned: Boolean array of embeddings which already have a cluster.
+        :param threshold: The distance threshold or None for ``distance_threshold``.
+        :return: Array where ith element is the cluster label for the ith embedding.
+        """
+        if threshold is None:
+            threshold = cls.distance_threshold
+        labels, assigned = labels.copy(), assigned.copy()
+        next_label = int(labels[assigned].max()) + 1
+        new = np.flatnonzero(~assigned)
+        for i, all_distances in zip(
+            new, iter_cosine_distances(embeddings, new), strict=True
+        ):
+            distances = all_distances[assigned]
+            farthest = np.full(next_label, np.inf, dtype=np.float32)
+            farthest[labels[assigned]] = 0
+            np.maximum.at(farthest, labels[assigned], distances)
+            closest = int(farthest.argmin())
+            if farthest[closest] < threshold:
+                labels[i] = closest
+            else:
+                labels[i] = next_label
+                next_label += 1
+            assigned[i] = True
+        return labels
 
 
 class EmbeddingsDBSCANGrouper(EmbeddingsGrouper):
@@ -120,14 +407,73 @@ class EmbeddingsDBSCANGrouper(EmbeddingsGrouper):
         "Better for grouping related news. Converts posts into embeddings using Gemini API, groups"
         "them using DBSCAN and writes summaries using Gemini API."
     )
+    eps = 0.17
+    # "dense" clusters the full distance matrix, "sparse" the graph of neighbors within eps,
+    # "auto" uses the sparse graph from SPARSE_NEIGHBORS_MIN_POSTS posts on
+    neighbors_mode = "auto"
 
     @classmethod
-    def _cluster_embeddings(cls, embeddings: np.ndarray) -> np.ndarray:
-        """Cluster embeddings using DBSCAN.
+    def _cluster_embeddings(
+        cls, embeddings: np.ndarray, threshold: float | None = None
+    ) -> np.ndarray:
+        """Cluster embeddings using DBSCAN on distances chosen by ``neighbors_mode``.
 
-        :param embeddings: Array of embeddings to cluster.
+        The sparse graph of neighbors within ``eps`` takes memory proportional to the number of
+        neighbors instead of N², and DBSCAN only visits the neighbors instead of scanning the full
+        matrix. The dense matrix is slightly faster for small inputs.
+
+        :param embeddings: Float32 matrix of L2-normalized embeddings to cluster.
+        :param threshold: The maximum distance between neighbors or None for ``eps``.
         :return: Array where ith element is the cluster label for the ith embedding.
         """
-        distance_matrix = cosine_distances(embeddings)
-        clustering = DBSCAN(eps=0.17, min_samples=1, metric="precomputed")
-        return clustering.fit_predict(distance_matrix)
+        if threshold is None:
+            threshold = cls.eps
+        clustering = DBSCAN(eps=threshold, min_samples=1, metric="precomputed")
+        if cls.neighbors_mode == "dense" or (
+            cls.neighbors_mode == "auto"
+            and len(embeddings) < SPARSE_NEIGHBORS_MIN_POSTS
+        ):
+            return clustering.fit_predict(dense_cosine_distances(embeddings))
+        neighbors = sort_graph_by_row_values(
+            cosine_radius_neighbors(embeddings, threshold),
+            copy=False,
+            warn_when_not_sorted=False,
+        )
+        return clustering.fit_predict(neighbors)
+
+    @classmethod
+    def _assign_embeddings(
+        cls,
+        embeddings: np.ndarray,
+        labels: np.ndarray,
+        assigned: np.ndarray,
+        threshold: float | None = None,
+    ) -> np.ndarray:
+        """Add every unassigned embedding to the cluster of its neighbors within the threshold,
+        merging the clusters it connects like DBSCAN with one minimum sample would, or to a new
+        cluster if it has no neighbors.
+
+        :param embeddings: Float32 matrix of L2-normalized embeddings.
+        :param labels: Array of cluster labels, valid only where ``assigned`` is set.
+        :param assigned: Boolean array of embeddings which already have a cluster.
+        :param threshold: The maximum distance between neighbors or None for ``eps``.
+        :return: Array where ith element is the cluster label for the ith embedding.
+        """
+        if threshold is None:
+            threshold = cls.eps
+        labels, assigned = labels.copy(), assigned.copy()
+        next_label = int(labels[assigned].max()) + 1
+        new = np.flatnonzero(~assigned)
+        for i, all_distances in zip(
+            new, iter_cosine_distances(embeddings, new), strict=True
+        ):
+            distances = all_distances[assigned]
+            neighbor_labels = np.unique(labels[assigned][distances <= threshold])
+            if len(neighbor_labels):
+                labels[i] = neighbor_labels[0]
+                labels[assigned & np.isin(labels, neighbor_labels)] = neighbor_labels[0]
+            else:
+                labels[i] = next_label
+                next_label += 1
+            assigned[i] = True
+        return labels
@@ -1,20 +1,37 @@
+import hashlib
 import json
 import logging
-from typing import Callable
+import queue
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Iterable, Iterator
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from contextlib import AbstractContextManager, ExitStack, nullcontext
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import TYPE_CHECKING, Callable, TypeVar
 
 from google import genai
 from google.genai import errors as genai_errors
 from google.genai import types
 from tenacity import (
+    RetryCallState,
     RetryError,
     before_sleep_log,
     retry,
-    retry_if_exception_type,
+    retry_if_exception,
     stop_after_attempt,
-    wait_fixed,
+    wait_exponential_jitter,
 )
+from tenacity.wait import wait_base
 
 from news_grouper.api.common.models import Post
+from news_grouper.api.news_grouping.news_groupers.rate_limiter import RateLimiter
+
+if TYPE_CHECKING:
+    from news_grouper.api.news_grouping.embedding_cache import EmbeddingCache
+    from news_grouper.api.news_grouping.summary_cache import SummaryCache
 
 GEMINI_SUMMARY_PROMPT_TEMPLATE = (
     "You are given group of posts with similar semantic meaning. Your goal is to write condensed summary of "
@@ -28,6 +45,10 @@ GEMINI_SUMMARY_PROMPT_TEMPLATE = (
     "\nInput:"
     "\n{}"
 )
+# bump when the prompt changes to invalidate cached summaries
+GEMINI_SUMMARY_PROMPT_VERSION = 1
+# summaries which end with this message are not cached
+SUMMARY_FAILED_MESSAGE = "Failed to generate summary."
 SUMMARY_MODEL = "gemini-2.5-flash-lite-preview-06-17"
 TOP_P = 0.5
 TEMPERATURE = 0.5
@@ -36,20 +57,101 @@ THINKING_BUDGET = 0
 EMBEDDING_MODEL = "gemini-embedding-001"
 EMBEDDING_TASK_TYPE = "SEMANTIC_SIMILARITY"
 EMBEDDING_LENGTH = 3072
+# maximum number of contents in a single embed_content request
+EMBEDDING_BATCH_SIZE = 100
 
-RETRY_WAIT_SECONDS = 2
+RETRY_INITIAL_WAIT_SECONDS = 1
+RETRY_MAX_WAIT_SECONDS = 30
 RETRY_ATTEMPTS = 5
+# client errors which are worth retrying, other 4xx errors fail immediately
+RETRYABLE_CLIENT_ERROR_CODES = frozenset({408, 429})
+
+# maximum number of requests one client sends at the same time
+MAX_CONCURRENCY = 8
+# pooled clients, which keep their connections open between requests
+MAX_POOLED_CLIENTS = 64
+CLIENT_IDLE_TIMEOUT_SECONDS = 600
 
 logger = logging.getLogger(__name__)
 
+ItemT = TypeVar("ItemT")
+ResultT = TypeVar("ResultT")
+
+
+def _is_retryable(exception: BaseException) -> bool:
+    """Check whether the failed request may succeed if it is sent again."""
+    if isinstance(exception, GeminiResponseError | genai_errors.ServerError):
+        return True
+    if isinstance(exception, genai_errors.ClientError):
+        return exception.code in RETRYABLE_CLIENT_ERROR_CODES
+    return False
+
+
+def _retry_after_seconds(exception: BaseException) -> float | None:
+    """Get the delay requested by the API in the Retry-After header or RetryInfo error details.
+
+    >>> error = genai_errors.ClientError(
+    ...     429, {"error": {"details": [{"retryDelay": "12s"}]}}
+    ... )
+    >>> _retry_after_seconds(error)
+    12.0
+    >>> _retry_after_seconds(genai_errors.ClientError(429, {})) is None
+    True
+    """
+    headers = getattr(getattr(exception, "response", None), "headers", None)
+    retry_after = headers.get("retry-after") if headers else None
+    if retry_after:
+        try:
+            return max(float(retry_after), 0)
+        except ValueError:
+            pass
+        try:
+            retry_at = parsedate_to_datetime(retry_after)
+        except (TypeError, ValueError):
+            retry_at = None
+        if retry_at is not None:
+            if retry_at.tzinfo is None:
+                retry_at = retry_at.replace(tzinfo=timezone.utc)
+            return max((retry_at - datetime.now(timezone.utc)).total_seconds(), 0)
+    details = getattr(exception, "details", None)
+    error = details.get("error") if isinstance(details, dict) else None
+    for detail in error.get("details", []) if isinstance(error, dict) else []:
+        delay = detail.get("retryDelay") if isinstance(detail, dict) else None
+        if isinstance(delay, str) and delay.endswith("s"):
+            try:
+                return max(float(delay[:-1]), 0)
+            except ValueError:
+                pass
+    return None
+
 
-def _retry_decorator(
-    wait_seconds: int = RETRY_WAIT_SECONDS, attempts: int = RETRY_ATTEMPTS
-) -> Callable:
+class _WaitRetryAfter(wait_base):
+    """Wait for the delay requested by the API or use the fallback strategy if none is given."""
+
+    def __init__(self, fallback: wait_base, max_wait: float):
+        self.fallback = fallback
+        self.max_wait = max_wait
+
+    def __call__(self, retry_state: RetryCallState) -> float:
+        exception = retry_state.outcome.exception() if retry_state.outcome else None
+        delay = _retry_after_seconds(exception) if exception else None
+        if delay is None:
+            return self.fallback(retry_state)
+        return min(delay, self.max_wait)
+
+
+def _retry_decorator(attempts: int = RETRY_ATTEMPTS) -> Callable:
+    """Retry transient failures (429, 408, 5xx, empty responses) with exponential backoff and
+    jitter, honoring Retry-After. Other errors are raised immediately."""
     return retry(
-        retry=retry_if_exception_type((genai_errors.ClientError, GeminiResponseError)),
+        retry=retry_if_exception(_is_retryable),
         before_sleep=before_sleep_log(logger, logging.WARNING),
-        wait=wait_fixed(wait_seconds),
+        wait=_WaitRetryAfter(
+            wait_exponential_jitter(
+                initial=RETRY_INITIAL_WAIT_SECONDS, max=RETRY_MAX_WAIT_SECONDS
+            ),
+            max_wait=RETRY_MAX_WAIT_SECONDS,
+        ),
         stop=stop_after_attempt(attempts),
     )
 
@@ -66,6 +168,14 @@ def _create_summarization_prompt(posts: list[Post]) -> str:
     return prompt
 
 
+def _summary_config() -> types.GenerateContentConfig:
+    return types.GenerateContentConfig(
+        thinking_config=types.ThinkingConfig(thinking_budget=THINKING_BUDGET),
+        temperature=TEMPERATURE,
+        top_p=TOP_P,
+    )
+
+
 class GeminiResponseError(Exception):
     """Custom exception for Gemini API response errors."""
 
@@ -79,8 +189,121 @@ class GeminiEmptyEmbeddingError(GeminiResponseError):
 
 
 class GeminiClient:
-    def __init__(self, api_key: str):
+    def __init__(
+        self,
+        api_key: str,
+        embedding_cache: "EmbeddingCache | None" = None,
+        max_concurrency: int = MAX_CONCURRENCY,
+        rate_limiter: RateLimiter | None = None,
+        summary_cache: "SummaryCache | None" = None,
+    ):
         self.gemini_client = genai.Client(api_key=api_key)
+        self.embedding_cache = embedding_cache
+        self.summary_cache = summary_cache
+        self.max_concurrency = max_concurrency
+        self.rate_limiter = rate_limiter
+
+    def _request_slot(self) -> AbstractContextManager:
+        """Wait for the rate limiter shared by all clients with the same API key, if any."""
+        return self.rate_limiter.request() if self.rate_limiter else nullcontext()
+
+    def map_concurrently(
+        self, func: Callable[[ItemT], ResultT], items: Iterable[ItemT]
+    ) -> list[ResultT]:
+        """Apply a function which calls Gemini API to items using at most ``max_concurrency`` threads.
+
+        :param func: The function to apply.
+        :param items: The items to apply the function to.
+        :return: The results in the order of items.
+        """
+        items = list(items)
+        if len(items) <= 1 or self.max_concurrency <= 1:
+            return [func(item) for item in items]
+        with ThreadPoolExecutor(
+            max_workers=min(self.max_concurrency, len(items)),
+            thread_name_prefix="gemini",
+        ) as executor:
+            return list(executor.map(func, items))
+
+    def map_as_completed(
+        self, func: Callable[[ItemT], ResultT], items: Iterable[ItemT]
+    ) -> Iterator[tuple[int, ResultT]]:
+        """Apply a function which calls Gemini API to items concurrently like ``map_concurrently``,
+        yielding results as soon as they are ready.
+
+        Items which haven't started yet are cancelled if the iterator is closed early.
+
+        :param func: The function to apply.
+        :param items: The items to apply the function to.
+        :return: An iterator of pairs of item index and result in the order of completion.
+        """
+        items = list(items)
+        if len(items) <= 1 or self.max_concurrency <= 1:
+            for i, item in enumerate(items):
+                yield i, func(item)
+            return
+        executor = ThreadPoolExecutor(
+            max_workers=min(self.max_concurrency, len(items)),
+            thread_name_prefix="gemini",
+        )
+        try:
+            futures = {executor.submit(func, item): i for i, item in enumerate(items)}
+            for future in as_completed(futures):
+                yield futures[future], future.result()
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def interleave_streams(
+        self, func: Callable[[ItemT], Iterable[ResultT]], items: Iterable[ItemT]
+    ) -> Iterator[tuple[int, ResultT | None]]:
+        """Consume streams returned by a function which calls Gemini API for each item, using at
+        most ``max_concurrency`` threads, and yield their chunks as soon as they arrive.
+
+        Streams which haven't started yet are cancelled and running streams are closed if the
+        iterator is closed early.
+
+        :param func: The function which returns the stream of an item.
+        :param items: The items to apply the function to.
+        :return: An iterator of pairs of item index and chunk. The chunk is None when the stream of
+            the item ended. Exceptions raised by streams are re-raised.
+        """
+        items = list(items)
+        if not items:
+            return
+        chunks: queue.Queue[tuple[int, ResultT | None, BaseException | None]] = (
+            queue.Queue()
+        )
+        stopped = threading.Event()
+
+        def consume(i: int, item: ItemT) -> None:
+            try:
+                for chunk in func(item):
+                    if stopped.is_set():
+                        return
+                    chunks.put((i, chunk, None))
+            except BaseException as e:
+                chunks.put((i, None, e))
+            else:
+                chunks.put((i, None, None))
+
+        executor = ThreadPoolExecutor(
+            max_workers=max(min(self.max_concurrency, len(items)), 1),
+            thread_name_prefix="gemini",
+        )
+        try:
+            for i, item in enumerate(items):
+                executor.submit(consume, i, item)
+            finished = 0
+            while finished < len(items):
+                i, chunk, error = chunks.get()
+                if error is not None:
+                    raise error
+                if chunk is None:
+                    finished += 1
+                yield i, chunk
+        finally:
+            stopped.set()
+            executor.shutdown(wait=False, cancel_futures=True)
 
     def summarize_posts(self, posts: list[Post]) -> str:
         """Summarize a list of posts using Gemini API.
@@ -91,22 +314,73 @@ class GeminiClient:
         prompt = _create_summarization_prompt(posts)
         try:
             return self._generate_content_with_retry(prompt)
-        except RetryError as e:
-            logger.error("Failed to generate summary after retries: %s", e)
-            return "Failed to generate summary."
+        except (RetryError, genai_errors.APIError) as e:
+            logger.error("Failed to generate summary: %s", e)
+            return SUMMARY_FAILED_MESSAGE
+
+    def summarize_posts_stream(self, posts: list[Post]) -> Iterator[str]:
+        """Summarize a list of posts using Gemini API, yielding text chunks as they are generated.
+
+        Failures before the first chunk are retried like in ``summarize_posts``. A failure after
+        it can't be retried without repeating text, so the summary ends with the failure message.
+
+        :param posts: The list of posts to summarize.
+        :return: An iterator of chunks of the summary.
+        """
+        prompt = _create_summarization_prompt(posts)
+        try:
+            first_chunk, chunks, slot = self._start_content_stream_with_retry(prompt)
+        except (RetryError, genai_errors.APIError) as e:
+            logger.error("Failed to generate summary: %s", e)
+            yield SUMMARY_FAILED_MESSAGE
+            return
+        with slot:
+            yield first_chunk
+            try:
+                for chunk in chunks:
+                    if chunk.text:
+                        yield chunk.text
+            except genai_errors.APIError as e:
+                logger.error("Summary stream was interrupted: %s", e)
+                yield "\n" + SUMMARY_FAILED_MESSAGE
+
+    @_retry_decorator()
+    def _start_content_stream_with_retry(
+        self, prompt: str
+    ) -> tuple[str, Iterator[types.GenerateContentResponse], ExitStack]:
+        """Start streaming content using Gemini API and wait for the first chunk with retry logic.
+
+        :return: The text of the first chunk, the iterator of the remaining chunks and the exit
+            stack holding the request slot, which has to be closed when the stream is consumed.
+        """
+        slot = ExitStack()
+        slot.enter_context(self._request_slot())
+        try:
+            chunks = iter(
+                self.gemini_client.models.generate_content_stream(
+                    model=SUMMARY_MODEL,
+                    contents=prompt,
+                    config=_summary_config(),
+                )
+            )
+            for chunk in chunks:
+                if chunk.text:
+                    return chunk.text, chunks, slot
+            raise GeminiEmptyTextError("Empty response text")
+        except BaseException as e:
+            # let the rate limiter see the error, e.g. to back off on 429
+            slot.__exit__(type(e), e, e.__traceback__)
+            raise
 
     @_retry_decorator()
     def _generate_content_with_retry(self, prompt: str) -> str:
         """Generate content using Gemini API with retry logic."""
-        response = self.gemini_client.models.generate_content(
-            model=SUMMARY_MODEL,
-            contents=prompt,
-            config=types.GenerateContentConfig(
-                thinking_config=types.ThinkingConfig(thinking_budget=THINKING_BUDGET),
-                temperature=TEMPERATURE,
-                top_p=TOP_P,
-            ),
-        )
+        with self._request_slot():
+            response = self.gemini_client.models.generate_content(
+                model=SUMMARY_MODEL,
+                contents=prompt,
+                config=_summary_config(),
+            )
         if response.text is None:
             raise GeminiEmptyTextError("Empty response text")
         return response.text
@@ -119,18 +393,146 @@ class GeminiClient:
         """
         try:
             return self._embed_content_with_retry(post.body)
-        except RetryError as e:
-            logger.error("Failed to compute embedding after retries: %s", e)
+        except (RetryError, genai_errors.APIError) as e:
+            logger.error("Failed to compute embedding: %s", e)
             return None
 
+    def compute_embeddings(self, posts: list[Post]) -> list[list[float] | None]:
+        """Compute embeddings for posts using batched Gemini API requests.
+
+        Posts are split into chunks of ``EMBEDDING_BATCH_SIZE`` which are sent concurrently. If a
+        whole batch fails, its posts are embedded one by one. Posts which got an empty embedding in a batch response
+        are retried one by one as well.
+
+        :param posts: The posts to compute embeddings for.
+        :return: A list where ith element is the embedding of the ith post or None if failed.
+        """
+        batches = [
+            posts[start : start + EMBEDDING_BATCH_SIZE]
+            for start in range(0, len(posts), EMBEDDING_BATCH_SIZE)
+        ]
+        return [
+            embedding
+            for batch_embeddings in self.map_concurrently(
+                self._compute_embeddings_batch, batches
+            )
+            for embedding in batch_embeddings
+        ]
+
+    def _compute_embeddings_batch(self, batch: list[Post]) -> list[list[float] | None]:
+        """Compute embeddings for a single batch, falling back to one request per post."""
+        try:
+            batch_embeddings = self._embed_contents_with_retry(
+                [post.body for post in batch]
+            )
+        except (RetryError, genai_errors.APIError) as e:
+            logger.warning(
+                "Failed to compute batch of %d embeddings, retrying one by one: %s",
+                len(batch),
+                e,
+            )
+            batch_embeddings = [None] * len(batch)
+        return [
+            embedding if embedding is not None else self.compute_embedding(post)
+            for post, embedding in zip(batch, batch_embeddings, strict=True)
+        ]
+
+    @_retry_decorator()
+    def _embed_contents_with_retry(
+        self, contents: list[str]
+    ) -> list[list[float] | None]:
+        """Compute embeddings for a batch of contents using Gemini API with retry logic.
+
+        :return: A list where ith element is the embedding of the ith content or None if the
+            response contains an empty embedding for it.
+        """
+        with self._request_slot():
+            response = self.gemini_client.models.embed_content(
+                model=EMBEDDING_MODEL,
+                contents=contents,  # type: ignore
+                config=types.EmbedContentConfig(task_type=EMBEDDING_TASK_TYPE),
+            )
+        if not response.embeddings or len(response.embeddings) != len(contents):
+            raise GeminiEmptyEmbeddingError(
+                "Number of embeddings in response doesn't match number of contents"
+            )
+        return [embedding.values or None for embedding in response.embeddings]
+
     @_retry_decorator()
     def _embed_content_with_retry(self, content: str) -> list[float]:
         """Compute the embedding for content using Gemini API with retry logic."""
-        response = self.gemini_client.models.embed_content(
-            model=EMBEDDING_MODEL,
-            contents=content,
-            config=types.EmbedContentConfig(task_type=EMBEDDING_TASK_TYPE),
-        )
+        with self._request_slot():
+            response = self.gemini_client.models.embed_content(
+                model=EMBEDDING_MODEL,
+                contents=content,
+                config=types.EmbedContentConfig(task_type=EMBEDDING_TASK_TYPE),
+            )
         if not response.embeddings or not response.embeddings[0].values:
             raise GeminiEmptyEmbeddingError("Empty embeddings in response")
         return response.embeddings[0].values
+
+
+class GeminiClientPool:
+    """Thread-safe LRU pool of Gemini clients keyed by API key, so requests with the same key
+    reuse a client and its open connections instead of connecting again.
+
+    Clients unused for ``idle_timeout`` seconds and the least recently used clients above
+    ``max_clients`` are evicted. Evicted clients aren't closed, because long requests may still
+    use them, so their connections are closed once they are garbage collected.
+    """
+
+    def __init__(
+        self,
+        max_clients: int = MAX_POOLED_CLIENTS,
+        idle_timeout: float = CLIENT_IDLE_TIMEOUT_SECONDS,
+    ):
+        self.max_clients = max_clients
+        self.idle_timeout = idle_timeout
+        # last use and client by the hash of the API key, least recently used first
+        self._clients: OrderedDict[str, tuple[float, GeminiClient]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, api_key: str, create: Callable[[], GeminiClient]) -> GeminiClient:
+        """Get the pooled client of the API key or create one.
+
+        :param api_key: The Gemini API key.
+        :param create: Creates a client with the API key if none is pooled.
+        :return: The client.
+        """
+        key = hashlib.sha256(api_key.encode()).hexdigest()
+        client = self._get_pooled(key)
+        if client is not None:
+            return client
+        # clients are created outside of the lock, so a client created concurrently for the
+        # same key is kept and the new one is dropped
+        created = create()
+        with self._lock:
+            entry = self._clients.get(key)
+            client = entry[1] if entry else created
+            self._clients[key] = (time.monotonic(), client)
+            self._clients.move_to_end(key)
+            self._evict()
+        return client
+
+    def _get_pooled(self, key: str) -> GeminiClient | None:
+        with self._lock:
+            self._evict()
+            entry = self._clients.get(key)
+            if entry is None:
+                return None
+            self._clients[key] = (time.monotonic(), entry[1])
+            self._clients.move_to_end(key)
+            return entry[1]
+
+    def _evict(self) -> None:
+        """Evict idle and least recently used clients, the lock must be held."""
+        now = time.monotonic()
+        while self._clients and (
+            len(self._clients) > self.max_clients
+            or now - next(iter(self._clients.values()))[0] > self.idle_timeout
+        ):
+            self._clients.popitem(last=False)
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._clients)
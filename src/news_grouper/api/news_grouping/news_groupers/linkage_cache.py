@@ -0,0 +1,53 @@
+"""In-memory cache of complete linkage trees of embedding sets, so grouping the same posts with a
+different distance threshold only cuts the cached tree."""
+
+import hashlib
+from dataclasses import dataclass
+
+import numpy as np
+
+from news_grouper.api.common.lru_cache import LRUCache
+
+MAX_CACHED_TREES = 64
+
+
+@dataclass
+class LinkageTree:
+    """Complete linkage tree of embeddings which is exact up to ``max_distance``, so it can be
+    cut at any lower distance threshold."""
+
+    max_distance: float
+    # linkage matrix in the format of scipy.cluster.hierarchy.linkage, None for one embedding
+    tree: np.ndarray | None
+
+
+class LinkageCache(LRUCache[str, LinkageTree]):
+    """Thread-safe LRU cache of linkage trees keyed by the digest of embeddings from
+    ``embeddings_key``."""
+
+    def __init__(self, max_entries: int = MAX_CACHED_TREES):
+        super().__init__(max_entries)
+
+
+linkage_trees = LinkageCache()
+
+
+def embeddings_key(embeddings: np.ndarray) -> str:
+    """Get the digest of embeddings, which changes with their values and order.
+
+    >>> embeddings = np.eye(2, dtype=np.float32)
+    >>> embeddings_key(embeddings) == embeddings_key(embeddings.copy())
+    True
+    >>> embeddings_key(embeddings) == embeddings_key(embeddings[::-1])
+    False
+    """
+    digest = hashlib.sha256()
+    digest.update(str(embeddings.shape).encode())
+    digest.update(np.ascontiguousarray(embeddings).data)
+    return digest.hexdigest()
+
+
+if __name__ == "__main__":
+    import doctest
+
+    doctest.testmod()
@@ -0,0 +1,141 @@
+"""Cheap local detection of near-duplicate texts, e.g. wire stories republished by several sources,
+with MinHash signatures of word shingles and locality-sensitive hashing.
+
+Near-duplicates are collapsed before computing embeddings, so every repost doesn't cost an API
+call and a row in the distance matrix.
+"""
+
+import hashlib
+import re
+from collections import defaultdict
+
+import numpy as np
+
+SHINGLE_SIZE = 3
+# MinHash functions, split into LSH bands of rows; texts become candidates when all rows of any
+# band are equal, which is likely from a Jaccard similarity of about (1 / BANDS) ** (1 / ROWS)
+BANDS = 16
+ROWS = 4
+# MinHash values are below 2**32, so this value marks signatures of texts without words
+NO_WORDS = 2**32
+# shingles hashed at once, every shingle takes BANDS * ROWS * 8 bytes
+CHUNK_SHINGLES = 2**16
+
+# multiply-shift hash functions ((a * x + b) mod 2**64) >> 32 with odd a
+_rng = np.random.default_rng(0)
+_A = _rng.integers(0, 2**63, size=(BANDS * ROWS, 1), dtype=np.uint64) * 2 + 1
+_B = _rng.integers(0, 2**63, size=(BANDS * ROWS, 1), dtype=np.uint64)
+_WORD = re.compile(r"\w+")
+_SHINGLE_MULTIPLIER = np.uint64(1099511628211)
+
+
+def near_duplicate_clusters(texts: list[str], min_similarity: float) -> list[list[int]]:
+    """Cluster texts whose estimated Jaccard similarity of word shingles is at least
+    ``min_similarity``. Texts without words are never near-duplicates.
+
+    :param texts: The texts to cluster.
+    :param min_similarity: The minimum similarity of near-duplicates between 0 and 1.
+    :return: Lists of indices of texts in every cluster in ascending order, ordered by their first
+        index.
+
+    >>> near_duplicate_clusters(
+    ...     [
+    ...         "The central bank raised its key rate by half a point on Tuesday",
+    ...         "Stocks fell sharply after the announcement",
+    ...         "The central bank raised its key rate by half a point on Tuesday.",
+    ...     ],
+    ...     min_similarity=0.8,
+    ... )
+    [[0, 2], [1]]
+    """
+    signatures = minhash_signatures(texts)
+    parents = list(range(len(texts)))
+
+    def find(i: int) -> int:
+        while parents[i] != i:
+            parents[i] = parents[parents[i]]
+            i = parents[i]
+        return i
+
+    with_words = np.flatnonzero(signatures[:, 0] != NO_WORDS)
+    for band in range(BANDS):
+        rows = np.ascontiguousarray(
+            signatures[with_words, band * ROWS : (band + 1) * ROWS]
+        ).view(f"V{ROWS * 8}")[:, 0]
+        _, buckets, sizes = np.unique(rows, return_inverse=True, return_counts=True)
+        shared = np.flatnonzero(sizes[buckets] > 1)
+        order = shared[np.argsort(buckets[shared], kind="stable")]
+        boundaries = np.flatnonzero(np.diff(buckets[order])) + 1
+        for members in np.split(with_words[order], boundaries):
+            if not len(members):
+                continue
+            # the share of equal MinHash values estimates the Jaccard similarity, every pair of
+            # the bucket is compared, since members may be similar to each other but not to the
+            # first one
+            member_signatures = signatures[members]
+            for offset, i in enumerate(members[:-1], 1):
+                similarities = (
+                    member_signatures[offset:] == member_signatures[offset - 1]
+                ).mean(axis=1)
+                root = find(int(i))
+                for j in members[offset:][similarities >= min_similarity]:
+                    parents[find(int(j))] = root
+
+    clusters = defaultdict(list)
+    for i in range(len(texts)):
+        clusters[find(i)].append(i)
+    return sorted(clusters.values())
+
+
+def minhash_signatures(texts: list[str]) -> np.ndarray:
+    """Compute MinHash signatures of word shingles of texts.
+
+    :param texts: The texts.
+    :return: Matrix with a row of ``BANDS * ROWS`` MinHash values for every text. Rows of texts
+        without words are filled with ``NO_WORDS``.
+    """
+    signatures = np.full((len(texts), BANDS * ROWS), NO_WORDS, dtype=np.uint64)
+    hashes = [_shingle_hashes(text) for text in texts]
+    chunk: list[int] = []
+    chunk_shingles = 0
+    for i, text_hashes in enumerate(hashes):
+        if len(text_hashes):
+            chunk.append(i)
+            chunk_shingles += len(text_hashes)
+        if chunk and (chunk_shingles >= CHUNK_SHINGLES or i == len(hashes) - 1):
+            values = _A * np.concatenate([hashes[j] for j in chunk]) + _B
+            values >>= np.uint64(32)
+            starts = np.cumsum([0] + [len(hashes[j]) for j in chunk[:-1]])
+            signatures[chunk] = np.minimum.reduceat(values, starts, axis=1).T
+            chunk, chunk_shingles = [], 0
+    return signatures
+
+
+def _shingle_hashes(text: str) -> np.ndarray:
+    """Hash every run of ``SHINGLE_SIZE`` words of the lowercased text, or all words of shorter
+    texts, into 32 bits. Hashes are the same in every process, unlike ``hash`` of strings."""
+    words = _WORD.findall(text.lower())
+    word_hashes = np.fromiter(map(_word_hash, words), dtype=np.uint64, count=len(words))
+    shingles = max(len(words) - SHINGLE_SIZE + 1, 1 if words else 0)
+    hashes = word_hashes[:shingles].copy()
+    for offset in range(1, min(SHINGLE_SIZE, len(words))):
+        # multiplication wraps around, which is fine for hashing
+        hashes *= _SHINGLE_MULTIPLIER
+        hashes += word_hashes[offset : offset + shingles]
+    return hashes >> np.uint64(32)
+
+
+def _word_hash(word: str) -> int:
+    """Hash the word into 64 bits.
+
+    >>> _word_hash("bridge")
+    2793564478624239598
+    """
+    digest = hashlib.blake2b(word.encode(), digest_size=8).digest()
+    return int.from_bytes(digest, "little")
+
+
+if __name__ == "__main__":
+    import doctest
+
+    doctest.testmod()
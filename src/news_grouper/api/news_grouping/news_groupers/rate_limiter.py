@@ -0,0 +1,129 @@
+"""Process-wide rate limiting of Gemini API requests per API key."""
+
+import hashlib
+import threading
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+
+from news_grouper.api.common.lru_cache import LRUCache
+
+MAX_LIMITERS = 1024
+
+
+class RateLimiter:
+    """Token bucket limiting the request rate combined with an AIMD limit of concurrent requests.
+
+    The concurrency limit grows by one after ``limit`` successful requests (additive increase)
+    and halves when the API responds with 429 (multiplicative decrease), so parallel requests of
+    all users sharing an API key adapt to the quota of that key.
+
+    >>> limiter = RateLimiter(requests_per_minute=600, burst=10, max_concurrency=8)
+    >>> with limiter.request():
+    ...     pass
+    >>> limiter.concurrency_limit
+    8.0
+    >>> limiter.release(throttled=True)
+    >>> limiter.concurrency_limit
+    4.0
+    """
+
+    def __init__(
+        self,
+        requests_per_minute: float,
+        burst: int,
+        max_concurrency: int,
+        min_concurrency: int = 1,
+    ):
+        if requests_per_minute <= 0:
+            raise ValueError("Request rate must be positive")
+        self.rate = requests_per_minute / 60
+        self.burst = burst
+        self.max_concurrency = max_concurrency
+        self.min_concurrency = min_concurrency
+        self.concurrency_limit = float(max_concurrency)
+        self.in_flight = 0
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+        self._condition = threading.Condition()
+
+    def acquire(self) -> None:
+        """Block until a request may be sent."""
+        with self._condition:
+            while True:
+                self._refill()
+                if self.in_flight < int(self.concurrency_limit) and self._tokens >= 1:
+                    self._tokens -= 1
+                    self.in_flight += 1
+                    return
+                timeout = None
+                if self._tokens < 1:
+                    timeout = (1 - self._tokens) / self.rate
+                self._condition.wait(timeout)
+
+    def release(self, throttled: bool = False) -> None:
+        """Release the slot of a finished request and adjust the concurrency limit.
+
+        :param throttled: Whether the API rejected the request because of rate limits.
+        """
+        with self._condition:
+            self.in_flight = max(self.in_flight - 1, 0)
+            if throttled:
+                self.concurrency_limit = max(
+                    self.concurrency_limit / 2, float(self.min_concurrency)
+                )
+            else:
+                self.concurrency_limit = min(
+                    self.concurrency_limit + 1 / self.concurrency_limit,
+                    float(self.max_concurrency),
+                )
+            self._condition.notify_all()
+
+    @contextmanager
+    def request(self) -> Iterator[None]:
+        """Hold a request slot for the duration of the block.
+
+        An exception with ``code`` 429 raised inside the block counts as throttling.
+        """
+        self.acquire()
+        throttled = False
+        try:
+            yield
+        except Exception as e:
+            throttled = getattr(e, "code", None) == 429
+            raise
+        finally:
+            self.release(throttled)
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self._tokens = min(self._tokens + (now - self._updated) * self.rate, self.burst)
+        self._updated = now
+
+
+_limiters = LRUCache[str, RateLimiter](MAX_LIMITERS)
+
+
+def get_rate_limiter(
+    api_key: str, requests_per_minute: float, burst: int, max_concurrency: int
+) -> RateLimiter:
+    """Get the limiter shared by all requests in the process which use the API key.
+
+    :param api_key: The Gemini API key.
+    :param requests_per_minute: The maximum request rate for the key.
+    :param burst: The maximum number of requests sent at once after idling.
+    :param max_concurrency: The upper bound of the adaptive concurrency limit.
+    :return: The rate limiter of the key.
+    """
+    key = hashlib.sha256(api_key.encode()).hexdigest()
+    return _limiters.update(
+        key,
+        lambda limiter: limiter
+        or RateLimiter(requests_per_minute, burst, max_concurrency),
+    )
+
+
+if __name__ == "__main__":
+    import doctest
+
+    doctest.testmod()
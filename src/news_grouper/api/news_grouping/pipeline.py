@@ -0,0 +1,343 @@
+"""The news pipeline shared by the synchronous news endpoint and grouping jobs: fetch posts of a
+profile, group them and summarize the groups."""
+
+import logging
+from collections.abc import Callable, Iterator
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import cast
+
+from flask import current_app
+
+from news_grouper.api.auth.models import User
+from news_grouper.api.common.metrics import count, timed
+from news_grouper.api.common.models import Post, PostGroup
+from news_grouper.api.news_grouping.deduplication import deduplicate_posts
+from news_grouper.api.news_grouping.embedding_cache import get_embedding_cache
+from news_grouper.api.news_grouping.news_groupers import GroupingOptions, NewsGrouper
+from news_grouper.api.news_grouping.news_groupers.gemini import (
+    GeminiClient,
+    GeminiClientPool,
+)
+from news_grouper.api.news_grouping.news_groupers.rate_limiter import (
+    get_rate_limiter,
+)
+from news_grouper.api.news_grouping.schemas import (
+    FailedSourceSchema,
+    PostGroupSchema,
+    PostSchema,
+)
+from news_grouper.api.news_grouping.summary_cache import get_summary_cache
+from news_grouper.api.news_sources.fetching import SourceFetchFailure
+from news_grouper.api.news_sources.ingestion import load_stored_posts
+from news_grouper.api.news_sources.post_buckets import (
+    fetch_posts_by_buckets,
+    get_post_bucket_cache,
+)
+from news_grouper.api.profiles.models import Profile
+
+# stages reported to the on_stage callback, in order
+STAGES = ("fetching", "grouping", "summarizing")
+STREAM_FAILED_MESSAGE = "Failed to group news, please try again later."
+
+logger = logging.getLogger(__name__)
+
+
+class NoPostsError(Exception):
+    """Raised when none of the profile's sources returned posts."""
+
+
+@dataclass
+class ProfilePosts:
+    posts: list[Post]
+    failed_sources: list[SourceFetchFailure]
+    profile_id: int | None = None
+    # number of copies of posts merged by deduplication
+    duplicates_removed: int = 0
+
+
+def get_news(
+    user: User,
+    profile: Profile,
+    grouper_name: str,
+    from_datetime: datetime,
+    to_datetime: datetime | None,
+    on_stage: Callable[[str], None] | None = None,
+    distance_threshold: float | None = None,
+) -> dict:
+    """Fetch posts of the profile's sources and group them with the chosen grouper.
+
+    :param user: The owner of the profile whose API key is used.
+    :param profile: The profile to get news for.
+    :param grouper_name: The name of the grouper.
+    :param from_datetime: The start of the time range of posts.
+    :param to_datetime: The end of the time range of posts or None for now.
+    :param on_stage: Called with the name of each stage from ``STAGES`` when it starts.
+    :param distance_threshold: The distance threshold of the grouper or None for its default.
+    :return: The news matching ``NewsResponseSchema``.
+    :raises NoPostsError: If no posts were found.
+    """
+    if on_stage:
+        on_stage("fetching")
+    profile_posts = fetch_profile_posts(profile, from_datetime, to_datetime)
+    grouper = NewsGrouper.get_grouper_by_name(grouper_name)
+    grouped_results = grouper.group_posts(
+        profile_posts.posts,
+        get_gemini_client(user),
+        on_stage=on_stage,
+        options=grouping_options(profile_posts, distance_threshold),
+    )
+    individual_posts = []
+    groups = []
+    for item in grouped_results:
+        if isinstance(item, PostGroup):
+            groups.append(PostGroupSchema().dump(item))
+        elif isinstance(item, Post):
+            individual_posts.append(PostSchema().dump(item))
+
+    return {
+        "post_groups": groups,
+        "posts": individual_posts,
+        "failed_sources": profile_posts.failed_sources,
+        "duplicates_removed": profile_posts.duplicates_removed,
+    }
+
+
+def stream_news(
+    user: User,
+    profile_posts: ProfilePosts,
+    grouper_name: str,
+    stream_summaries: bool = False,
+    distance_threshold: float | None = None,
+) -> Iterator[dict]:
+    """Group posts with the chosen grouper, yielding news as soon as each part is ready.
+
+    Right after grouping, a "post" event is yielded for every post which is not grouped and a
+    "group" event with ``summary`` set to None for every group. Then a "summary" event with the
+    summarized group follows for every group as soon as its summary is ready. If
+    ``stream_summaries`` is set, "summary_chunk" events with parts of the summary text precede it.
+    The last event is "done" with the failed sources and the number of removed duplicates. If
+    grouping or summarizing fails, the exception is logged and the last event is "error" with a
+    message instead, so clients can tell it from a dropped connection.
+
+    :param user: The user whose API key is used.
+    :param profile_posts: The posts fetched with ``fetch_profile_posts``.
+    :param grouper_name: The name of the grouper.
+    :param stream_summaries: Whether to send summaries as they are generated.
+    :param distance_threshold: The distance threshold of the grouper or None for its default.
+    :return: An iterator of events, dictionaries with ``type`` and event data.
+    """
+    try:
+        yield from _news_events(
+            user, profile_posts, grouper_name, stream_summaries, distance_threshold
+        )
+    except Exception:
+        logger.exception("Streaming news failed")
+        yield {"type": "error", "message": STREAM_FAILED_MESSAGE}
+
+
+def _news_events(
+    user: User,
+    profile_posts: ProfilePosts,
+    grouper_name: str,
+    stream_summaries: bool,
+    distance_threshold: float | None,
+) -> Iterator[dict]:
+    grouper = NewsGrouper.get_grouper_by_name(grouper_name)
+    groups, summarized_groups = grouper.group_posts_progressively(
+        profile_posts.posts,
+        get_gemini_client(user),
+        stream_summaries=stream_summaries,
+        options=grouping_options(profile_posts, distance_threshold),
+    )
+    for i, group_posts in enumerate(groups):
+        if len(group_posts) == 1:
+            yield {"type": "post", "post": PostSchema().dump(group_posts[0])}
+        else:
+            yield {
+                "type": "group",
+                "group_id": i,
+                "posts": PostSchema(many=True).dump(group_posts),
+                "summary": None,
+            }
+    for i, group in summarized_groups:
+        if isinstance(group, str):
+            yield {"type": "summary_chunk", "group_id": i, "text": group}
+        else:
+            summary = cast(dict, PostGroupSchema().dump(group))
+            yield {"type": "summary", "group_id": i, **summary}
+    yield {
+        "type": "done",
+        "failed_sources": FailedSourceSchema(many=True).dump(
+            profile_posts.failed_sources
+        ),
+        "duplicates_removed": profile_posts.duplicates_removed,
+    }
+
+
+def replay_news(news: dict) -> Iterator[dict]:
+    """Yield the events of ``stream_news`` for news which are ready, e.g. cached news, without
+    "summary_chunk" events.
+
+    :param news: The news serialized with ``NewsResponseSchema``.
+    :return: An iterator of events, dictionaries with ``type`` and event data.
+    """
+    for post in news["posts"]:
+        yield {"type": "post", "post": post}
+    for i, group in enumerate(news["post_groups"]):
+        yield {"type": "group", "group_id": i, "posts": group["posts"], "summary": None}
+    for i, group in enumerate(news["post_groups"]):
+        yield {"type": "summary", "group_id": i, **group}
+    yield {
+        "type": "done",
+        "failed_sources": news["failed_sources"],
+        "duplicates_removed": news["duplicates_removed"],
+    }
+
+
+def collect_news(
+    events: Iterator[dict], on_done: Callable[[dict], object]
+) -> Iterator[dict]:
+    """Pass events of ``stream_news`` through and collect the news they make up.
+
+    :param events: The events.
+    :param on_done: Called with the news matching ``NewsResponseSchema`` before the "done" event
+        is passed through. Not called if the stream ends with an error.
+    :return: An iterator of the events.
+    """
+    posts = []
+    groups = {}
+    for event in events:
+        if event["type"] == "post":
+            posts.append(event["post"])
+        elif event["type"] == "summary":
+            groups[event["group_id"]] = {
+                "summary": event["summary"],
+                "posts": event["posts"],
+            }
+        elif event["type"] == "done":
+            on_done(
+                {
+                    "post_groups": [groups[i] for i in sorted(groups)],
+                    "posts": posts,
+                    "failed_sources": event["failed_sources"],
+                    "duplicates_removed": event["duplicates_removed"],
+                }
+            )
+        yield event
+
+
+def fetch_profile_posts(
+    profile: Profile, from_datetime: datetime, to_datetime: datetime | None
+) -> ProfilePosts:
+    """Get posts of the profile's sources from the database or their feeds, merging copies of
+    the same post from several sources. Feeds are fetched only from the hour of their previous
+    fetch, earlier posts come from the post bucket cache.
+
+    :param profile: The profile to get posts for.
+    :param from_datetime: The start of the time range of posts.
+    :param to_datetime: The end of the time range of posts or None for now.
+    :return: The posts and sources which failed.
+    :raises NoPostsError: If no posts were found.
+    """
+    config = current_app.config
+    with timed("load"):
+        stored = load_stored_posts(
+            profile.news_sources,
+            from_datetime,
+            to_datetime,
+            max_age=timedelta(minutes=config["POSTS_MAX_AGE_MINUTES"]),
+            retention=timedelta(days=config["POSTS_RETENTION_DAYS"]),
+        )
+    with timed("fetch"):
+        fetch_result = fetch_posts_by_buckets(
+            stored.missing_sources,
+            from_datetime,
+            to_datetime,
+            get_post_bucket_cache(),
+            max_workers=config["NEWS_FETCH_MAX_WORKERS"],
+            source_timeout=config["NEWS_FETCH_SOURCE_TIMEOUT_SECONDS"],
+            total_timeout=config["NEWS_FETCH_TOTAL_TIMEOUT_SECONDS"],
+        )
+    all_posts = stored.posts + fetch_result.posts
+    count("sources", len(profile.news_sources))
+    count(
+        "sources_fetched",
+        len(stored.missing_sources) - len(fetch_result.failed_sources),
+    )
+    count("sources_failed", len(fetch_result.failed_sources))
+    count("posts", len(all_posts))
+
+    if not all_posts:
+        raise NoPostsError("No posts found from any source")
+    with timed("deduplicate"):
+        deduplicated = deduplicate_posts(all_posts)
+    count("duplicates", deduplicated.removed)
+    if deduplicated.removed:
+        logger.info(
+            "Removed %d duplicates of %d posts", deduplicated.removed, len(all_posts)
+        )
+    return ProfilePosts(
+        deduplicated.posts,
+        fetch_result.failed_sources,
+        profile.id,
+        duplicates_removed=deduplicated.removed,
+    )
+
+
+def grouping_options(
+    profile_posts: ProfilePosts, distance_threshold: float | None = None
+) -> GroupingOptions:
+    """Get options of grouping the profile's posts.
+
+    :param profile_posts: The posts of the profile.
+    :param distance_threshold: The distance threshold of the grouper or None for its default.
+    :return: The options, with the key under which groupers keep clusters of the profile's posts
+        between requests if incremental grouping is enabled.
+    """
+    state_key = None
+    if (
+        current_app.config["INCREMENTAL_GROUPING"]
+        and profile_posts.profile_id is not None
+    ):
+        state_key = str(profile_posts.profile_id)
+    return GroupingOptions(state_key=state_key, distance_threshold=distance_threshold)
+
+
+def get_gemini_client(user: User) -> GeminiClient:
+    """Get the pooled Gemini client of the user's API key which shares caches and rate limits of
+    the app, creating it on first use.
+
+    :param user: The user whose API key is used.
+    :return: The Gemini client.
+    """
+    config = current_app.config
+    return get_gemini_client_pool().get(
+        user.api_key,
+        lambda: GeminiClient(
+            api_key=user.api_key,
+            embedding_cache=get_embedding_cache(),
+            max_concurrency=config["GEMINI_MAX_CONCURRENCY"],
+            rate_limiter=get_rate_limiter(
+                user.api_key,
+                requests_per_minute=config["GEMINI_REQUESTS_PER_MINUTE"],
+                burst=config["GEMINI_REQUESTS_BURST"],
+                max_concurrency=config["GEMINI_MAX_CONCURRENCY"],
+            )
+            if config["GEMINI_REQUESTS_PER_MINUTE"] > 0
+            else None,
+            summary_cache=get_summary_cache(),
+        ),
+    )
+
+
+def get_gemini_client_pool() -> GeminiClientPool:
+    """Get the Gemini client pool of the current app, creating it on first use."""
+    pool = current_app.extensions.get("gemini_client_pool")
+    if pool is None:
+        pool = GeminiClientPool(
+            max_clients=current_app.config["GEMINI_CLIENT_POOL_SIZE"],
+            idle_timeout=current_app.config["GEMINI_CLIENT_IDLE_MINUTES"] * 60,
+        )
+        current_app.extensions["gemini_client_pool"] = pool
+    return pool
@@ -1,24 +1,40 @@
+import json
+import logging
+from collections.abc import Iterator
 from datetime import datetime
 
 from apiflask import APIBlueprint, abort
+from flask import Response, request, stream_with_context, url_for
 from flask_jwt_extended import get_jwt_identity, jwt_required
+from werkzeug.http import quote_etag
 
 from news_grouper.api import db
 from news_grouper.api.auth.models import User
-from news_grouper.api.common.models import Post, PostGroup
+from news_grouper.api.common.metrics import (
+    PipelineMetrics,
+    collect_metrics,
+    count,
+    timed,
+)
+from news_grouper.api.common.schemas import LocationHeader
+from news_grouper.api.news_grouping import pipeline
+from news_grouper.api.news_grouping.jobs import submit_job
+from news_grouper.api.news_grouping.models import GroupingJob
+from news_grouper.api.news_grouping.news_cache import get_news_cache, news_key
 from news_grouper.api.news_grouping.news_groupers import NewsGrouper
-from news_grouper.api.news_grouping.news_groupers.gemini import GeminiClient
 from news_grouper.api.news_grouping.schemas import (
     GrouperOutSchema,
+    GroupingJobOutSchema,
     NewsInSchema,
     NewsResponseSchema,
-    PostGroupSchema,
-    PostSchema,
+    NewsStreamInSchema,
 )
 from news_grouper.api.profiles.models import Profile
 
 grouping = APIBlueprint("grouping", __name__, url_prefix="/api", tag="Grouping")
 
+logger = logging.getLogger(__name__)
+
 
 @grouping.get("/groupers")
 @grouping.output(GrouperOutSchema(many=True))
@@ -31,9 +47,184 @@ def get_groupers():
 @jwt_required()
 @grouping.input(NewsInSchema, location="query")
 @grouping.output(NewsResponseSchema)
-@grouping.doc(security=["jwt_access_token"])
+@grouping.doc(
+    security=["jwt_access_token"],
+    description="News of the same view are cached for a few minutes unless some sources or "
+    "summaries failed, and the cache is bypassed once the profile's sources change. The "
+    "response has a strong ETag, requests with a matching If-None-Match header get 304. The "
+    "Server-Timing header has the duration of every stage of the pipeline and counters such "
+    "as fetched sources, posts, computed embeddings and generated summaries.",
+    responses={304: {"description": "News didn't change since the given ETag"}},
+)
 def get_news(profile_id, query_data):
     """Get news with the chosen grouper"""
+    user, profile, from_datetime, to_datetime = _parse_news_request(
+        profile_id, query_data
+    )
+    cache = get_news_cache()
+    key = _news_key(profile, query_data, from_datetime, to_datetime)
+    with collect_metrics() as metrics:
+        try:
+            with timed("total"):
+                cached = cache.get(key)
+                if cached is not None:
+                    count("cached")
+                else:
+                    cached = cache.set(
+                        key,
+                        pipeline.get_news(
+                            user,
+                            profile,
+                            query_data["grouper"],
+                            from_datetime,
+                            to_datetime,
+                            distance_threshold=query_data.get("distance_threshold"),
+                        ),
+                    )
+        except pipeline.NoPostsError as e:
+            abort(400, message=str(e))
+        finally:
+            logger.info(
+                "news profile=%d grouper=%r %s",
+                profile.id,
+                query_data["grouper"],
+                metrics.log_fields(),
+            )
+    headers = {
+        "ETag": quote_etag(cached.etag),
+        # browsers revalidate cached news with If-None-Match before reusing them
+        "Cache-Control": "private, no-cache",
+        "Server-Timing": metrics.server_timing(),
+    }
+    if request.if_none_match.contains(cached.etag):
+        return Response(status=304, headers=headers)
+    return cached.news, 200, headers
+
+
+@grouping.get("/profiles/<int:profile_id>/news/stream")
+@jwt_required()
+@grouping.input(NewsStreamInSchema, location="query")
+@grouping.doc(
+    security=["jwt_access_token"],
+    description="News are cached like news of the synchronous endpoint and shared with it. "
+    "Cached news are replayed without summary_chunk events and have a strong ETag, requests "
+    "with a matching If-None-Match header get 304. The Server-Timing header has the durations "
+    "of stages before the first event, all metrics are logged when the stream ends.",
+    responses={
+        200: {
+            "description": "News events as NDJSON lines or, if requested with the Accept "
+            "header, as Server-Sent Events. Posts and unsummarized groups are sent as soon as "
+            'grouping finishes ("post" and "group" events), then each summary is sent when it is '
+            'ready ("summary" events), and the "done" event ends the stream. If grouping or '
+            'summarizing fails, the "error" event with a message ends it instead. With '
+            'stream_summaries, "summary_chunk" events carry parts of summaries as they are '
+            "generated.",
+            "content": {"application/x-ndjson": {}, "text/event-stream": {}},
+        },
+        304: {"description": "News didn't change since the given ETag"},
+    },
+)
+def stream_news(profile_id, query_data):
+    """Stream news with the chosen grouper as groups become ready"""
+    user, profile, from_datetime, to_datetime = _parse_news_request(
+        profile_id, query_data
+    )
+    cache = get_news_cache()
+    key = _news_key(profile, query_data, from_datetime, to_datetime)
+    with collect_metrics() as metrics:
+        cached = cache.get(key)
+        if cached is not None:
+            count("cached")
+            events = pipeline.replay_news(cached.news)
+        else:
+            try:
+                profile_posts = pipeline.fetch_profile_posts(
+                    profile, from_datetime, to_datetime
+                )
+            except pipeline.NoPostsError as e:
+                abort(400, message=str(e))
+            events = pipeline.collect_news(
+                pipeline.stream_news(
+                    user,
+                    profile_posts,
+                    query_data["grouper"],
+                    stream_summaries=query_data["stream_summaries"],
+                    distance_threshold=query_data.get("distance_threshold"),
+                ),
+                lambda news: cache.set(key, news),
+            )
+
+    mimetype = request.accept_mimetypes.best_match(
+        ["application/x-ndjson", "text/event-stream"], default="application/x-ndjson"
+    )
+    headers = {
+        "Cache-Control": "private, no-cache",
+        "Vary": "Accept",
+        # disable buffering of proxies, so events reach clients immediately
+        "X-Accel-Buffering": "no",
+        "Server-Timing": metrics.server_timing(),
+    }
+    if cached is not None:
+        # both formats of the same news are different representations
+        etag = f"{cached.etag}-{'sse' if mimetype == 'text/event-stream' else 'ndjson'}"
+        headers["ETag"] = quote_etag(etag)
+        if request.if_none_match.contains(etag):
+            return Response(status=304, headers=headers)
+    events = _logged_events(events, metrics, profile.id, query_data["grouper"])
+    if mimetype == "text/event-stream":
+        body = (
+            f"event: {event['type']}\ndata: {json.dumps(event)}\n\n" for event in events
+        )
+    else:
+        body = (json.dumps(event) + "\n" for event in events)
+    return Response(stream_with_context(body), mimetype=mimetype, headers=headers)
+
+
+@grouping.post("/profiles/<int:profile_id>/news/jobs")
+@jwt_required()
+@grouping.input(NewsInSchema)
+@grouping.output(GroupingJobOutSchema, status_code=202, headers=LocationHeader)
+@grouping.doc(security=["jwt_access_token"])
+def submit_news_job(profile_id, json_data):
+    """Submit a job which gets news with the chosen grouper in the background"""
+    user_id = get_jwt_identity()
+    profile = Profile.query.filter_by(id=profile_id, user_id=user_id).first_or_404()
+    if not profile.news_sources:
+        abort(400, message="No news sources configured for current profile")
+    for field in ("from_datetime", "to_datetime"):
+        if json_data.get(field):
+            try:
+                datetime.fromisoformat(json_data[field])
+            except ValueError:
+                abort(400, message=f"Invalid {field}")
+
+    job = submit_job(
+        int(user_id),
+        profile.id,
+        json_data["grouper"],
+        json_data["from_datetime"],
+        json_data.get("to_datetime"),
+        distance_threshold=json_data.get("distance_threshold"),
+    )
+    headers = {"Location": url_for("grouping.get_news_job", job_id=job.id)}
+    return _job_response(job), 202, headers
+
+
+@grouping.get("/news/jobs/<int:job_id>")
+@jwt_required()
+@grouping.output(GroupingJobOutSchema)
+@grouping.doc(security=["jwt_access_token"])
+def get_news_job(job_id):
+    """Get the progress of a news job and its news once it succeeded"""
+    user_id = get_jwt_identity()
+    job = GroupingJob.query.filter_by(id=job_id, user_id=user_id).first_or_404()
+    return _job_response(job)
+
+
+def _parse_news_request(
+    profile_id: int, query_data: dict
+) -> tuple[User, Profile, datetime, datetime | None]:
+    """Get the user and their profile with sources, aborting otherwise, and the time range."""
     user_id = get_jwt_identity()
     user = db.session.get(User, int(user_id))
 
@@ -41,30 +232,56 @@ def get_news(profile_id, query_data):
     if not profile.news_sources:
         abort(400, message="No news sources configured for current profile")
 
-    all_posts = []
-    from_datetime = datetime.fromisoformat(query_data.get("from_datetime"))
+    from_datetime = datetime.fromisoformat(query_data["from_datetime"])
     to_datetime = (
-        datetime.fromisoformat(query_data.get("to_datetime"))
+        datetime.fromisoformat(query_data["to_datetime"])
         if query_data.get("to_datetime")
         else None
     )
-    for source in profile.news_sources:
-        posts = source.parser.get_posts(source.link, from_datetime, to_datetime)
-        all_posts.extend(posts)
-
-    if not all_posts:
-        abort(400, message="No posts found from any source")
-
-    gemini_client = GeminiClient(api_key=user.api_key)
-
-    grouper = NewsGrouper.get_grouper_by_name(query_data["grouper"])
-    grouped_results = grouper.group_posts(all_posts, gemini_client)
-    individual_posts = []
-    groups = []
-    for item in grouped_results:
-        if isinstance(item, PostGroup):
-            groups.append(PostGroupSchema().dump(item))
-        elif isinstance(item, Post):
-            individual_posts.append(PostSchema().dump(item))
-
-    return {"post_groups": groups, "posts": individual_posts}
+    return user, profile, from_datetime, to_datetime  # type: ignore
+
+
+def _news_key(
+    profile: Profile,
+    query_data: dict,
+    from_datetime: datetime,
+    to_datetime: datetime | None,
+) -> str:
+    return news_key(
+        profile.id,
+        profile.news_sources,
+        query_data["grouper"],
+        from_datetime,
+        to_datetime,
+        query_data.get("distance_threshold"),
+    )
+
+
+def _logged_events(
+    events: Iterator[dict], metrics: PipelineMetrics, profile_id: int, grouper: str
+) -> Iterator[dict]:
+    """Keep collecting metrics of a news request while its events are streamed and log them
+    when the stream ends."""
+    with collect_metrics(metrics):
+        try:
+            yield from events
+        finally:
+            logger.info(
+                "news stream profile=%d grouper=%r %s",
+                profile_id,
+                grouper,
+                metrics.log_fields(),
+            )
+
+
+def _job_response(job: GroupingJob) -> dict:
+    return {
+        "id": job.id,
+        "status": job.status,
+        "stage": job.stage,
+        "error": job.error,
+        "created": job.created,
+        "started": job.started,
+        "finished": job.finished,
+        "result": json.loads(job.result) if job.result else None,
+    }
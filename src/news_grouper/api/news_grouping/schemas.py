@@ -1,6 +1,6 @@
 from apiflask import Schema
-from apiflask.fields import List, Nested, String
-from apiflask.validators import OneOf
+from apiflask.fields import Boolean, DateTime, Float, Integer, List, Nested, String
+from apiflask.validators import OneOf, Range
 
 from news_grouper.api.news_grouping.news_groupers import NewsGrouper
 
@@ -18,6 +18,23 @@ class NewsInSchema(Schema):
     )
     from_datetime = String(required=True)
     to_datetime = String()
+    distance_threshold = Float(
+        validate=Range(min=0, max=2, min_inclusive=False),
+        metadata={
+            "description": "Maximum cosine distance between grouped posts of embeddings "
+            "groupers, lower values give smaller groups. Defaults to the grouper's threshold"
+        },
+    )
+
+
+class NewsStreamInSchema(NewsInSchema):
+    stream_summaries = Boolean(
+        load_default=False,
+        metadata={
+            "description": "Send summaries in chunks as they are generated "
+            '("summary_chunk" events)'
+        },
+    )
 
 
 class PostSchema(Schema):
@@ -26,6 +43,10 @@ class PostSchema(Schema):
     author = String()
     published_time = String()
     link = String()
+    other_authors = List(
+        String(),
+        metadata={"description": "Authors of copies of the post from other sources"},
+    )
 
 
 class PostGroupSchema(Schema):
@@ -33,6 +54,43 @@ class PostGroupSchema(Schema):
     posts = List(Nested(PostSchema))
 
 
+class FailedSourceSchema(Schema):
+    source_id = Integer()
+    name = String()
+    link = String()
+    reason = String()
+
+
 class NewsResponseSchema(Schema):
     post_groups = List(Nested(PostGroupSchema))
     posts = List(Nested(PostSchema))
+    failed_sources = List(
+        Nested(FailedSourceSchema),
+        metadata={"description": "Sources which failed or timed out while fetching"},
+    )
+    duplicates_removed = Integer(
+        metadata={
+            "description": "Number of copies of posts from several sources merged"
+        }
+    )
+
+
+class GroupingJobOutSchema(Schema):
+    id = Integer()
+    status = String(metadata={"enum": ["pending", "running", "succeeded", "failed"]})
+    stage = String(
+        allow_none=True,
+        metadata={
+            "description": "Current stage of a running job or the stage in which a job "
+            "failed: fetching, grouping or summarizing"
+        },
+    )
+    error = String(allow_none=True)
+    created = DateTime()
+    started = DateTime(allow_none=True)
+    finished = DateTime(allow_none=True)
+    result = Nested(
+        NewsResponseSchema,
+        allow_none=True,
+        metadata={"description": "News of a succeeded job"},
+    )
@@ -0,0 +1,175 @@
+"""Cache of group summaries keyed by the set of posts in the group."""
+
+import hashlib
+import json
+import logging
+import time
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+
+import sqlalchemy as sa
+from flask import current_app
+
+from news_grouper.api import db
+from news_grouper.api.common.lru_cache import LRUCache
+from news_grouper.api.common.models import Post, insert_ignoring_conflicts
+from news_grouper.api.news_grouping.models import SummaryCacheEntry
+from news_grouper.api.news_grouping.news_groupers.gemini import (
+    GEMINI_SUMMARY_PROMPT_VERSION,
+    SUMMARY_FAILED_MESSAGE,
+    SUMMARY_MODEL,
+)
+from news_grouper.api.news_sources.models import as_utc
+
+PRUNE_INTERVAL_SECONDS = 3600
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class CachedSummary:
+    summary: str
+    # content hashes of posts in the order they were numbered in the prompt
+    post_hashes: list[str]
+
+    def order_posts(self, posts: list[Post]) -> list[Post]:
+        """Order posts of the group as they were summarized, so post ids cited in the summary
+        refer to the same posts."""
+        positions = {post_hash: i for i, post_hash in enumerate(self.post_hashes)}
+        return sorted(posts, key=lambda post: positions.get(post_content_hash(post), 0))
+
+
+class SummaryCache:
+    """Cache of summaries keyed by the hash of the sorted content hashes of group posts, the summary
+    model, the prompt version and the summarizer.
+
+    Entries live in a process-wide LRU of at most ``max_entries`` summaries which expire after
+    ``ttl``. If ``persistent`` is set, summaries are also stored in the database so they survive
+    restarts and are shared between processes.
+    """
+
+    def __init__(self, ttl: timedelta, max_entries: int, persistent: bool = False):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.persistent = persistent
+        self._summaries = LRUCache[str, CachedSummary](max_entries, ttl)
+        self._last_prune = time.monotonic()
+
+    def get(self, posts: list[Post], summarizer: str) -> CachedSummary | None:
+        """Get the cached summary of a group.
+
+        :param posts: The posts of the group in any order.
+        :param summarizer: The name of the summarization method.
+        :return: The cached summary or None if there is none.
+        """
+        key = summary_key(posts, summarizer)
+        cached = self._summaries.get(key)
+        if cached is not None or not self.persistent:
+            return cached
+        row = db.session.get(SummaryCacheEntry, key)
+        if row is None or as_utc(row.created) < datetime.now(timezone.utc) - self.ttl:
+            return None
+        cached = CachedSummary(row.summary, json.loads(row.post_hashes))
+        age = (datetime.now(timezone.utc) - as_utc(row.created)).total_seconds()
+        self._summaries.set(key, cached, stored_at=time.monotonic() - age)
+        return cached
+
+    def set(self, posts: list[Post], summarizer: str, summary: str) -> None:
+        """Store the summary of a group. Failed and interrupted summaries are not cached.
+
+        :param posts: The posts of the group in the order they were summarized.
+        :param summarizer: The name of the summarization method.
+        :param summary: The summary of the posts.
+        """
+        if summary.endswith(SUMMARY_FAILED_MESSAGE):
+            return
+        key = summary_key(posts, summarizer)
+        cached = CachedSummary(summary, [post_content_hash(post) for post in posts])
+        self._summaries.set(key, cached)
+        if not self.persistent:
+            return
+        insert_ignoring_conflicts(
+            db.session,
+            SummaryCacheEntry,
+            [
+                {
+                    "key": key,
+                    "summary": summary,
+                    "post_hashes": json.dumps(cached.post_hashes),
+                }
+            ],
+        )
+        db.session.commit()
+        if time.monotonic() - self._last_prune > PRUNE_INTERVAL_SECONDS:
+            self.prune()
+
+    def prune(self) -> int:
+        """Evict expired summaries and summaries exceeding the maximum number of entries from the
+        database.
+
+        :return: The number of evicted entries.
+        """
+        self._last_prune = time.monotonic()
+        cutoff = datetime.now(timezone.utc) - self.ttl
+        deleted = db.session.execute(
+            sa.delete(SummaryCacheEntry).where(SummaryCacheEntry.created < cutoff)
+        ).rowcount  # type: ignore
+        oldest_kept = db.session.scalar(
+            sa.select(SummaryCacheEntry.created)
+            .order_by(SummaryCacheEntry.created.desc())
+            .offset(self.max_entries)
+            .limit(1)
+        )
+        if oldest_kept is not None:
+            deleted += db.session.execute(
+                sa.delete(SummaryCacheEntry).where(
+                    SummaryCacheEntry.created <= oldest_kept
+                )
+            ).rowcount  # type: ignore
+        db.session.commit()
+        if deleted:
+            logger.info("Evicted %d cached summaries", deleted)
+        return deleted
+
+
+def get_summary_cache() -> SummaryCache:
+    """Get the summary cache of the current app, creating it on first use."""
+    cache = current_app.extensions.get("summary_cache")
+    if cache is None:
+        cache = SummaryCache(
+            ttl=timedelta(hours=current_app.config["SUMMARY_CACHE_TTL_HOURS"]),
+            max_entries=current_app.config["SUMMARY_CACHE_MAX_ENTRIES"],
+            persistent=current_app.config["SUMMARY_CACHE_PERSISTENT"],
+        )
+        current_app.extensions["summary_cache"] = cache
+    return cache
+
+
+def post_content_hash(post: Post) -> str:
+    """Get the hash of the post's content which is used for summarization."""
+    payload = json.dumps([post.author, post.body], ensure_ascii=False)
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+def summary_key(posts: list[Post], summarizer: str) -> str:
+    """Get the cache key of the group's summary, which doesn't depend on the order of posts.
+
+    >>> from datetime import datetime
+    >>> first, second = (
+    ...     Post(title="", body=body, published_time=datetime.now(), author="", link="")
+    ...     for body in ("first", "second")
+    ... )
+    >>> summary_key([first, second], "gemini") == summary_key([second, first], "gemini")
+    True
+    >>> summary_key([first, second], "gemini") == summary_key([first], "gemini")
+    False
+    """
+    payload = json.dumps(
+        [
+            sorted(post_content_hash(post) for post in posts),
+            SUMMARY_MODEL,
+            GEMINI_SUMMARY_PROMPT_VERSION,
+            summarizer,
+        ]
+    )
+    return hashlib.sha256(payload.encode()).hexdigest()
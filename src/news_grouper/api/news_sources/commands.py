@@ -0,0 +1,50 @@
+import time
+from datetime import datetime, timedelta, timezone
+
+import click
+from flask import current_app
+from flask.cli import AppGroup
+
+from news_grouper.api.news_sources.ingestion import ingest_feeds, prune_posts
+
+posts_cli = AppGroup("posts", help="Ingest posts from news sources into the database.")
+
+
+@posts_cli.command("ingest")
+@click.option(
+    "--interval",
+    type=float,
+    default=None,
+    help="Keep running and repeat ingestion every INTERVAL seconds.",
+)
+def ingest(interval: float | None) -> None:
+    """Fetch posts from all distinct feeds and store them in the database."""
+    config = current_app.config
+    retention = timedelta(days=config["POSTS_RETENTION_DAYS"])
+    while True:
+        started = time.monotonic()
+        report = ingest_feeds(
+            retention,
+            max_workers=config["NEWS_FETCH_MAX_WORKERS"],
+            source_timeout=config["NEWS_FETCH_SOURCE_TIMEOUT_SECONDS"],
+            total_timeout=config["NEWS_FETCH_TOTAL_TIMEOUT_SECONDS"],
+        )
+        deleted = prune_posts(datetime.now(timezone.utc) - retention)
+        click.echo(
+            f"Ingested {report.feeds} feeds in {time.monotonic() - started:.1f}s: "
+            f"{report.posts_inserted} new, {report.posts_updated} updated, "
+            f"{deleted} pruned posts, {len(report.failed_feeds)} failed feeds"
+        )
+        for failure in report.failed_feeds:
+            click.echo(f"  {failure.link}: {failure.reason}", err=True)
+        if interval is None:
+            break
+        time.sleep(max(interval - (time.monotonic() - started), 0))
+
+
+@posts_cli.command("prune")
+def prune() -> None:
+    """Delete posts older than the retention period."""
+    retention = timedelta(days=current_app.config["POSTS_RETENTION_DAYS"])
+    deleted = prune_posts(datetime.now(timezone.utc) - retention)
+    click.echo(f"Deleted {deleted} posts")
@@ -0,0 +1,141 @@
+"""Concurrent fetching of posts from news sources."""
+
+from __future__ import annotations
+
+import logging
+import time
+from collections.abc import Iterable, Mapping
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import TYPE_CHECKING
+
+from news_grouper.api.common.metrics import in_current_context
+from news_grouper.api.common.models import Post
+from news_grouper.api.news_sources.news_parsers import NewsParser
+
+if TYPE_CHECKING:
+    from news_grouper.api.news_sources.models import NewsSource
+
+MAX_WORKERS = 16
+SOURCE_TIMEOUT_SECONDS = 15.0
+TOTAL_TIMEOUT_SECONDS = 30.0
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class SourceFetchFailure:
+    source_id: int
+    name: str
+    link: str
+    reason: str
+
+
+@dataclass
+class FetchResult:
+    posts_by_source: dict[int, list[Post]] = field(default_factory=dict)
+    failed_sources: list[SourceFetchFailure] = field(default_factory=list)
+
+    @property
+    def posts(self) -> list[Post]:
+        return [post for posts in self.posts_by_source.values() for post in posts]
+
+
+@dataclass
+class _FetchJob:
+    """Snapshot of a source which is safe to hand over to a worker thread."""
+
+    source_id: int
+    name: str
+    link: str
+    parser: type[NewsParser]
+    started: float | None = None
+
+    def failure(self, reason: str) -> SourceFetchFailure:
+        return SourceFetchFailure(self.source_id, self.name, self.link, reason)
+
+
+def fetch_posts(
+    sources: Iterable[NewsSource],
+    from_datetime: datetime,
+    to_datetime: datetime | None,
+    max_workers: int = MAX_WORKERS,
+    source_timeout: float = SOURCE_TIMEOUT_SECONDS,
+    total_timeout: float = TOTAL_TIMEOUT_SECONDS,
+    from_datetimes: Mapping[int, datetime] | None = None,
+) -> FetchResult:
+    """Fetch posts from all sources in parallel using a bounded thread pool.
+
+    Every source gets ``source_timeout`` seconds from the moment its worker starts, and the whole
+    stage gets ``total_timeout`` seconds. Sources which fail or miss a deadline are reported in
+    the result instead of failing the whole fetch. Python threads can't be killed, so a hung
+    worker is abandoned and finishes in the background.
+
+    :param sources: The news sources to fetch posts from.
+    :param from_datetime: The start date and time for fetching posts.
+    :param to_datetime: The end date and time for fetching posts. If None, fetch posts till the current time.
+    :param max_workers: The maximum number of sources fetched at the same time.
+    :param source_timeout: The deadline in seconds for a single source.
+    :param total_timeout: The deadline in seconds for the whole fetch stage.
+    :param from_datetimes: The start date and time for fetching posts of sources by their ids,
+        overriding ``from_datetime``.
+    :return: The posts of all sources which were fetched in time and the list of failed sources.
+    """
+    # ORM objects must not leave the request thread, so read everything needed upfront
+    jobs = [
+        _FetchJob(source.id, source.name, source.link, source.parser)
+        for source in sources
+    ]
+    result = FetchResult()
+    if not jobs:
+        return result
+
+    @in_current_context
+    def run(job: _FetchJob) -> list[Post]:
+        job.started = time.monotonic()
+        start = (from_datetimes or {}).get(job.source_id, from_datetime)
+        return job.parser.get_posts(job.link, start, to_datetime)
+
+    deadline = time.monotonic() + total_timeout
+    executor = ThreadPoolExecutor(
+        max_workers=min(max_workers, len(jobs)), thread_name_prefix="news-fetch"
+    )
+    pending: dict[Future[list[Post]], _FetchJob] = {
+        executor.submit(run, job): job for job in jobs
+    }
+    try:
+        while pending:
+            now = time.monotonic()
+            if now >= deadline:
+                break
+            timeout = deadline - now
+            for job in pending.values():
+                if job.started is not None:
+                    timeout = min(timeout, job.started + source_timeout - now)
+            done, _ = wait(
+                pending, timeout=max(timeout, 0), return_when=FIRST_COMPLETED
+            )
+            for future in done:
+                job = pending.pop(future)
+                try:
+                    result.posts_by_source[job.source_id] = future.result()
+                except Exception as e:
+                    logger.exception("Failed to fetch posts from %s", job.link)
+                    result.failed_sources.append(job.failure(f"Error: {e}"))
+            now = time.monotonic()
+            for future, job in list(pending.items()):
+                if job.started is not None and now - job.started >= source_timeout:
+                    del pending[future]
+                    logger.warning("Fetching posts from %s timed out", job.link)
+                    result.failed_sources.append(
+                        job.failure(f"Timed out after {source_timeout:g} seconds")
+                    )
+        for job in pending.values():
+            logger.warning("Fetching posts from %s exceeded fetch budget", job.link)
+            result.failed_sources.append(
+                job.failure(f"Total fetch budget of {total_timeout:g} seconds exceeded")
+            )
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
+    return result
@@ -0,0 +1,205 @@
+"""Ingestion of posts from all news sources into the database and reading them back."""
+
+import logging
+from collections.abc import Iterable
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+
+import sqlalchemy as sa
+
+from news_grouper.api import db
+from news_grouper.api.common.models import Post
+from news_grouper.api.news_sources.fetching import SourceFetchFailure, fetch_posts
+from news_grouper.api.news_sources.models import (
+    IngestedFeed,
+    NewsSource,
+    StoredPost,
+    as_utc,
+)
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class IngestionReport:
+    feeds: int = 0
+    posts_inserted: int = 0
+    posts_updated: int = 0
+    failed_feeds: list[SourceFetchFailure] = field(default_factory=list)
+
+
+@dataclass
+class StoredPostsResult:
+    posts: list[Post] = field(default_factory=list)
+    # sources without fresh ingested posts which have to be fetched live
+    missing_sources: list[NewsSource] = field(default_factory=list)
+
+
+def ingest_feeds(
+    retention: timedelta,
+    max_workers: int,
+    source_timeout: float,
+    total_timeout: float,
+) -> IngestionReport:
+    """Fetch posts from every distinct feed and upsert them into the post table.
+
+    A feed is a distinct pair of parser name and source link, so a feed added to many profiles
+    is fetched only once.
+
+    :param retention: How far back from now posts are ingested.
+    :param max_workers: The maximum number of feeds fetched at the same time.
+    :param source_timeout: The deadline in seconds for a single feed.
+    :param total_timeout: The deadline in seconds for fetching all feeds.
+    :return: The report with the number of ingested posts and failed feeds.
+    """
+    now = datetime.now(timezone.utc)
+    sources = _distinct_feed_sources()
+    result = fetch_posts(
+        sources,
+        now - retention,
+        None,
+        max_workers=max_workers,
+        source_timeout=source_timeout,
+        total_timeout=total_timeout,
+    )
+    failures = {failure.source_id: failure for failure in result.failed_sources}
+    report = IngestionReport(feeds=len(sources), failed_feeds=result.failed_sources)
+    for source in sources:
+        feed = _get_or_create_feed(source.parser_name, source.link)
+        if source.id in failures:
+            feed.last_error = failures[source.id].reason
+            continue
+        inserted, updated = _upsert_posts(
+            source.parser_name, source.link, result.posts_by_source[source.id]
+        )
+        report.posts_inserted += inserted
+        report.posts_updated += updated
+        feed.last_ingested = now
+        feed.last_error = None
+    db.session.commit()
+    return report
+
+
+def prune_posts(older_than: datetime) -> int:
+    """Delete posts published before the given time.
+
+    :param older_than: Posts published before this time are deleted.
+    :return: The number of deleted posts.
+    """
+    result = db.session.execute(
+        sa.delete(StoredPost).where(
+            StoredPost.published_time < older_than.astimezone(timezone.utc)
+        )
+    )
+    db.session.commit()
+    return result.rowcount  # type: ignore
+
+
+def load_stored_posts(
+    sources: Iterable[NewsSource],
+    from_datetime: datetime,
+    to_datetime: datetime | None,
+    max_age: timedelta,
+    retention: timedelta,
+) -> StoredPostsResult:
+    """Load posts of sources whose feeds were ingested recently using a range query.
+
+    :param sources: The news sources to load posts for.
+    :param from_datetime: The start date and time of posts.
+    :param to_datetime: The end date and time of posts. If None, load posts till the current time.
+    :param max_age: Feeds ingested longer ago than this are considered stale.
+    :param retention: How far back from now posts are ingested. Posts of earlier time ranges
+        aren't stored, so all sources are missing.
+    :return: The stored posts and the sources which have no fresh ingested posts.
+    """
+    sources = list(sources)
+    result = StoredPostsResult()
+    now = datetime.now(timezone.utc)
+    if (
+        max_age <= timedelta(0)
+        or not sources
+        or from_datetime.astimezone(timezone.utc) < now - retention
+    ):
+        result.missing_sources = sources
+        return result
+    fresh_after = now - max_age
+    feeds = IngestedFeed.query.filter(
+        IngestedFeed.link.in_({source.link for source in sources})
+    )
+    fresh_feeds = {
+        (feed.parser_name, feed.link)
+        for feed in feeds
+        if feed.last_ingested and as_utc(feed.last_ingested) >= fresh_after
+    }
+    for source in sources:
+        if (source.parser_name, source.link) not in fresh_feeds:
+            result.missing_sources.append(source)
+    if not fresh_feeds:
+        return result
+    query = sa.select(StoredPost).where(
+        sa.tuple_(StoredPost.parser_name, StoredPost.source_link).in_(fresh_feeds),
+        StoredPost.published_time >= from_datetime.astimezone(timezone.utc),
+    )
+    if to_datetime:
+        query = query.where(
+            StoredPost.published_time <= to_datetime.astimezone(timezone.utc)
+        )
+    query = query.order_by(StoredPost.published_time)
+    result.posts = [post.to_post() for post in db.session.scalars(query)]
+    return result
+
+
+def _distinct_feed_sources() -> list[NewsSource]:
+    """Get one source for every distinct pair of parser name and link."""
+    sources = {}
+    for source in NewsSource.query.order_by(NewsSource.id):
+        sources.setdefault((source.parser_name, source.link), source)
+    return list(sources.values())
+
+
+def _get_or_create_feed(parser_name: str, link: str) -> IngestedFeed:
+    feed = IngestedFeed.query.filter_by(parser_name=parser_name, link=link).first()
+    if feed is None:
+        feed = IngestedFeed(parser_name=parser_name, link=link)  # type: ignore
+        db.session.add(feed)
+    return feed
+
+
+def _upsert_posts(
+    parser_name: str, source_link: str, posts: list[Post]
+) -> tuple[int, int]:
+    """Insert new posts of the feed and update the already stored ones.
+
+    :return: The number of inserted and updated posts.
+    """
+    posts_by_link = {post.link: post for post in posts}
+    existing = {
+        stored.link: stored
+        for stored in StoredPost.query.filter(
+            StoredPost.parser_name == parser_name,
+            StoredPost.source_link == source_link,
+            StoredPost.link.in_(posts_by_link),
+        )
+    }
+    inserted = updated = 0
+    for link, post in posts_by_link.items():
+        stored = existing.get(link)
+        if stored is None:
+            stored = StoredPost(parser_name=parser_name, source_link=source_link)  # type: ignore
+            db.session.add(stored)
+            inserted += 1
+        elif (stored.title, stored.body, stored.author) != (
+            post.title,
+            post.body,
+            post.author,
+        ):
+            updated += 1
+        else:
+            continue
+        stored.link = link
+        stored.title = post.title
+        stored.body = post.body
+        stored.author = post.author
+        stored.published_time = post.published_time.astimezone(timezone.utc)
+    logger.info("Ingested %s: %d new, %d updated posts", source_link, inserted, updated)
+    return inserted, updated
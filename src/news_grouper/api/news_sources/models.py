@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+from datetime import datetime, timezone
 from typing import TYPE_CHECKING
 
 import sqlalchemy as sa
@@ -7,7 +8,7 @@ from flask_sqlalchemy.query import Query
 from sqlalchemy import orm as so
 
 from news_grouper.api import db
-from news_grouper.api.common.models import TimestampMixin
+from news_grouper.api.common.models import Post, TimestampMixin
 from news_grouper.api.news_sources.news_parsers import NewsParser
 
 if TYPE_CHECKING:
@@ -41,3 +42,69 @@ class NewsSource(TimestampMixin, db.Model):
     @classmethod
     def query_users_source(cls, user_id: int, source_id: int) -> Query:
         return cls.query.filter(cls.profile.has(user_id=user_id), cls.id == source_id)
+
+
+class StoredPost(TimestampMixin, db.Model):
+    """Post ingested from a feed. Posts are unique per feed by their link."""
+
+    __tablename__ = "post"
+    __table_args__ = (
+        sa.UniqueConstraint("parser_name", "source_link", "link"),
+        sa.Index(
+            "ix_post_source_published", "parser_name", "source_link", "published_time"
+        ),
+    )
+
+    id: so.Mapped[int] = so.mapped_column(primary_key=True)
+    parser_name: so.Mapped[str] = so.mapped_column(sa.String(256))
+    source_link: so.Mapped[str] = so.mapped_column(sa.Text())
+    link: so.Mapped[str] = so.mapped_column(sa.Text())
+    title: so.Mapped[str] = so.mapped_column(sa.Text())
+    body: so.Mapped[str] = so.mapped_column(sa.Text())
+    author: so.Mapped[str] = so.mapped_column(sa.Text())
+    published_time: so.Mapped[datetime] = so.mapped_column(sa.DateTime(timezone=True))
+
+    def __repr__(self):
+        return (
+            f"StoredPost(id={self.id!r}, parser_name={self.parser_name!r}, "
+            f"source_link={self.source_link!r}, link={self.link!r})"
+        )
+
+    def to_post(self) -> Post:
+        return Post(
+            title=self.title,
+            body=self.body,
+            published_time=as_utc(self.published_time),
+            author=self.author,
+            link=self.link,
+        )
+
+
+class IngestedFeed(db.Model):
+    """Ingestion state of a distinct feed, i.e. a pair of parser name and source link."""
+
+    __table_args__ = (sa.UniqueConstraint("parser_name", "link"),)
+
+    id: so.Mapped[int] = so.mapped_column(primary_key=True)
+    parser_name: so.Mapped[str] = so.mapped_column(sa.String(256))
+    link: so.Mapped[str] = so.mapped_column(sa.Text())
+    last_ingested: so.Mapped[datetime | None] = so.mapped_column(
+        sa.DateTime(timezone=True)
+    )
+    last_error: so.Mapped[str | None] = so.mapped_column(sa.Text())
+
+    def __repr__(self):
+        return (
+            f"IngestedFeed(id={self.id!r}, parser_name={self.parser_name!r}, "
+            f"link={self.link!r}, last_ingested={self.last_ingested!r})"
+        )
+
+
+def as_utc(value: datetime) -> datetime:
+    """Attach UTC to datetimes loaded from databases which don't store timezones (e.g. SQLite).
+
+    All datetimes are stored in UTC, so naive values can be safely treated as UTC.
+    """
+    if value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value
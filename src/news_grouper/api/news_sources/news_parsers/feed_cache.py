@@ -0,0 +1,76 @@
+"""In-memory cache of parsed feeds with HTTP validators for conditional GET requests."""
+
+from dataclasses import dataclass
+from urllib.parse import urlsplit, urlunsplit
+
+from feedparser import FeedParserDict
+
+from news_grouper.api.common.lru_cache import LRUCache
+
+MAX_CACHED_FEEDS = 512
+DEFAULT_PORTS = {"http": 80, "https": 443}
+
+
+@dataclass
+class CachedFeed:
+    feed: FeedParserDict
+    etag: str | None = None
+    modified: str | None = None
+
+
+class FeedCache:
+    """Thread-safe LRU cache of parsed feeds keyed by normalized URL."""
+
+    def __init__(self, max_entries: int = MAX_CACHED_FEEDS):
+        self._feeds = LRUCache[str, CachedFeed](max_entries)
+
+    def get(self, url: str) -> CachedFeed | None:
+        """Get the cached feed for the URL.
+
+        :param url: The URL of the feed.
+        :return: The cached feed or None if the feed is not cached.
+        """
+        return self._feeds.get(normalize_url(url))
+
+    def set(self, url: str, cached: CachedFeed) -> None:
+        """Cache the feed for the URL, evicting the least recently used feed if the cache is full.
+
+        :param url: The URL of the feed.
+        :param cached: The parsed feed with its validators.
+        """
+        self._feeds.set(normalize_url(url), cached)
+
+    def clear(self) -> None:
+        self._feeds.clear()
+
+
+def normalize_url(url: str) -> str:
+    """Normalize the URL so that equivalent feed URLs share a cache entry.
+
+    >>> normalize_url("HTTPS://Example.COM:443/feed#latest")
+    'https://example.com/feed'
+    >>> normalize_url("http://example.com")
+    'http://example.com/'
+    >>> normalize_url("http://example.com:8080/rss?format=Atom")
+    'http://example.com:8080/rss?format=Atom'
+    """
+    parts = urlsplit(url.strip())
+    scheme = parts.scheme.lower()
+    netloc = (parts.hostname or "").lower()
+    if parts.port and parts.port != DEFAULT_PORTS.get(scheme):
+        netloc = f"{netloc}:{parts.port}"
+    if parts.username:
+        credentials = parts.username
+        if parts.password:
+            credentials += f":{parts.password}"
+        netloc = f"{credentials}@{netloc}"
+    return urlunsplit((scheme, netloc, parts.path or "/", parts.query, ""))
+
+
+feed_cache = FeedCache()
+
+
+if __name__ == "__main__":
+    import doctest
+
+    doctest.testmod()
@@ -0,0 +1,176 @@
+"""Engines converting HTML of feed entries to plain text.
+
+Every engine gives the text of ``BeautifulSoup(content, "lxml").get_text()`` after replacing every
+``<br>`` with a newline, the text of a whole document also gets a newline appended to every
+``<p>``. Text of scripts, styles, templates, ruby annotations and comments is skipped like
+BeautifulSoup does.
+
+``LxmlTextExtractor`` walks the lxml tree and collects texts and tails of elements directly, so it
+doesn't build a BeautifulSoup tree for every entry and is used by parsers by default.
+``BeautifulSoupTextExtractor`` is the reference implementation.
+"""
+
+from abc import ABC, abstractmethod
+from collections.abc import Iterable
+
+from bs4 import BeautifulSoup
+from lxml import etree  # pyright: ignore[reportAttributeAccessIssue]
+
+from news_grouper.api.common.subclass_registrar import SubclassRegistrar
+
+# BeautifulSoup keeps strings of these tags as separate string types which get_text skips
+SKIPPED_TAGS = frozenset({"script", "style", "template", "rt", "rp"})
+
+
+class TextExtractor(SubclassRegistrar, ABC):
+    """Abstract base class for engines converting HTML to text."""
+
+    name: str
+
+    @classmethod
+    @abstractmethod
+    def extract_text(cls, content: str) -> str:
+        """Get the text of a HTML document.
+
+        :param content: The HTML.
+        :return: The text without leading and trailing whitespace.
+        """
+        ...
+
+    @classmethod
+    @abstractmethod
+    def extract_selected_texts(
+        cls, content: str, classes: Iterable[str], tags: Iterable[str]
+    ) -> list[str]:
+        """Get texts of elements of a HTML document which have one of the classes or tags.
+
+        :param content: The HTML.
+        :param classes: The classes of elements to select.
+        :param tags: The tags of elements to select.
+        :return: The texts of selected elements in document order. An element nested in another
+            selected element is a part of both texts.
+        """
+        ...
+
+
+class LxmlTextExtractor(TextExtractor):
+    """Extract text by walking the lxml tree.
+
+    >>> LxmlTextExtractor.extract_text("<p>First<br>line</p><p>Second <b>line</b></p>")
+    'First\\nline\\nSecond line'
+    >>> LxmlTextExtractor.extract_selected_texts(
+    ...     '<div class="text">Text</div><blockquote>Quote</blockquote><div>Other</div>',
+    ...     classes=["text"],
+    ...     tags=["blockquote"],
+    ... )
+    ['Text', 'Quote']
+    """
+
+    name = "lxml"
+
+    @classmethod
+    def extract_text(cls, content: str) -> str:
+        root = cls._parse(content)
+        if root is None:
+            return ""
+        return cls._text(root, paragraph_newlines=True).strip()
+
+    @classmethod
+    def extract_selected_texts(
+        cls, content: str, classes: Iterable[str], tags: Iterable[str]
+    ) -> list[str]:
+        root = cls._parse(content)
+        if root is None:
+            return []
+        conditions = [
+            f"contains(concat(' ', normalize-space(@class), ' '), ' {class_} ')"
+            for class_ in classes
+        ]
+        conditions.extend(f"self::{tag}" for tag in tags)
+        if not conditions:
+            return []
+        return [
+            cls._text(element, paragraph_newlines=False)
+            for element in root.xpath(f"//*[{' or '.join(conditions)}]")
+        ]
+
+    @classmethod
+    def _parse(cls, content: str) -> etree._Element | None:
+        """Parse a HTML document.
+
+        lxml refuses strings with an XML encoding declaration, so the content is parsed as UTF-8
+        bytes, like BeautifulSoup does, and declared encodings are ignored.
+
+        :param content: The HTML.
+        :return: The root element or None if the document is empty.
+        """
+        return etree.HTML(content.encode(), etree.HTMLParser(encoding="utf-8"))
+
+    @classmethod
+    def _text(cls, root: etree._Element, paragraph_newlines: bool) -> str:
+        """Get the text of the element's subtree without its tail.
+
+        :param root: The element.
+        :param paragraph_newlines: Whether to append a newline to every ``<p>``.
+        :return: The text.
+        """
+        parts = []
+        skipped = sum(1 for ancestor in root.iterancestors(*SKIPPED_TAGS))
+        events = etree.iterwalk(root, events=("start", "end", "comment", "pi"))
+        for event, element in events:
+            tag = element.tag
+            if event == "start":
+                if tag == "br":
+                    parts.append("\n")
+                elif tag in SKIPPED_TAGS:
+                    skipped += 1
+                elif not skipped and element.text:
+                    parts.append(element.text)
+                continue
+            if tag == "p" and paragraph_newlines:
+                parts.append("\n")
+            elif tag in SKIPPED_TAGS:
+                skipped -= 1
+            if not skipped and element.tail and element is not root:
+                parts.append(element.tail)
+        return "".join(parts)
+
+
+class BeautifulSoupTextExtractor(TextExtractor):
+    """Extract text from a BeautifulSoup tree.
+
+    >>> BeautifulSoupTextExtractor.extract_text("<p>First<br>line</p><p>Second <b>line</b></p>")
+    'First\\nline\\nSecond line'
+    """
+
+    name = "BeautifulSoup"
+
+    @classmethod
+    def extract_text(cls, content: str) -> str:
+        soup = cls._soup(content)
+        for p in soup.find_all("p"):
+            p.append(soup.new_string("\n"))  # type: ignore
+        return soup.get_text().strip()
+
+    @classmethod
+    def extract_selected_texts(
+        cls, content: str, classes: Iterable[str], tags: Iterable[str]
+    ) -> list[str]:
+        selectors = [*(f".{class_}" for class_ in classes), *tags]
+        if not selectors:
+            return []
+        elements = cls._soup(content).css.select(", ".join(selectors))
+        return [element.get_text() for element in elements]
+
+    @classmethod
+    def _soup(cls, content: str) -> BeautifulSoup:
+        soup = BeautifulSoup(content, features="lxml")
+        for br in soup.find_all("br"):
+            br.replace_with(soup.new_string("\n"))
+        return soup
+
+
+if __name__ == "__main__":
+    import doctest
+
+    doctest.testmod()
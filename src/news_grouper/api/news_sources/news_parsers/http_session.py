@@ -0,0 +1,67 @@
+"""Pooled HTTP session of the app used by news parsers."""
+
+import threading
+
+import requests
+from flask import current_app
+from requests.adapters import HTTPAdapter
+
+USER_AGENT = "News Grouper"
+
+_session_lock = threading.Lock()
+
+
+def get_session() -> requests.Session:
+    """Get the shared session of the current app, creating it on first use.
+
+    Connections are kept alive and reused between requests. Requests to a host which already
+    has ``HTTP_POOL_CONNECTIONS_PER_HOST`` active connections wait for a free connection.
+    """
+    session = current_app.extensions.get("http_session")
+    if session is None:
+        with _session_lock:
+            session = current_app.extensions.get("http_session")
+            if session is None:
+                session = _create_session(
+                    pool_hosts=current_app.config["HTTP_POOL_HOSTS"],
+                    pool_connections_per_host=current_app.config[
+                        "HTTP_POOL_CONNECTIONS_PER_HOST"
+                    ],
+                )
+                current_app.extensions["http_session"] = session
+    return session
+
+
+def _create_session(
+    pool_hosts: int, pool_connections_per_host: int
+) -> requests.Session:
+    session = requests.Session()
+    adapter = HTTPAdapter(
+        pool_connections=pool_hosts,
+        pool_maxsize=pool_connections_per_host,
+        pool_block=True,
+    )
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    session.headers.update(
+        {"User-Agent": USER_AGENT, "Accept-Encoding": "gzip, deflate"}
+    )
+    return session
+
+
+def get(url: str, headers: dict[str, str] | None = None) -> requests.Response:
+    """Send a GET request through the shared session with the timeouts of the current app.
+
+    :param url: The URL to request.
+    :param headers: Additional request headers.
+    :return: The response.
+    :raises requests.RequestException: If the request fails or times out.
+    """
+    return get_session().get(
+        url,
+        headers=headers,
+        timeout=(
+            current_app.config["HTTP_CONNECT_TIMEOUT_SECONDS"],
+            current_app.config["HTTP_READ_TIMEOUT_SECONDS"],
+        ),
+    )
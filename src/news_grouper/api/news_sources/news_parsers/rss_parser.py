@@ -1,13 +1,26 @@
 import calendar
 import logging
+from collections.abc import Iterable, Iterator
 from datetime import datetime, timezone
 
 import feedparser
 import requests
-from bs4 import BeautifulSoup
 
+from news_grouper.api.common.metrics import timed
 from news_grouper.api.common.models import Post
+from news_grouper.api.news_sources.news_parsers import http_session
 from news_grouper.api.news_sources.news_parsers.abstract_parser import NewsParser
+from news_grouper.api.news_sources.news_parsers.feed_cache import (
+    CachedFeed,
+    feed_cache,
+)
+from news_grouper.api.news_sources.news_parsers.html_text import (
+    LxmlTextExtractor,
+    TextExtractor,
+)
+
+NOT_MODIFIED_STATUS = 304
+EARLY_STOP_ENTRIES = 5
 
 
 class RSSFeedParser(NewsParser):
@@ -18,6 +31,10 @@ class RSSFeedParser(NewsParser):
     name = "RSS Feed"
     description = "Parses RSS feeds from various sources. Supports RSS 0.9x, RSS 1.0, RSS 2.0, CDF, Atom 0.3, and Atom 1.0 feeds"
     link_hint = "RSS feed URL"
+    text_extractor: type[TextExtractor] = LxmlTextExtractor
+    # consecutive entries older than the range after which the rest of the feed is skipped,
+    # None to always check all entries
+    early_stop_entries: int | None = EARLY_STOP_ENTRIES
 
     @classmethod
     def get_posts(
@@ -33,26 +50,106 @@ class RSSFeedParser(NewsParser):
         :param to_datetime: The end date and time for fetching posts. If None, fetch posts till the current time.
         :return: A list of Post objects containing the parsed posts.
         """
-        feed = feedparser.parse(link)
+        feed = cls.fetch_feed(link)
         posts = []
-        for entry in feed.entries:
-            body = cls.extract_body(entry)
-            if not body:
-                continue
-            published_time = cls.extract_published_time(entry)
+        with timed("extract"):
+            dated_entries = cls.dated_entries(feed.entries)
+            for entry, published_time in cls.entries_in_range(
+                dated_entries, from_datetime, to_datetime
+            ):
+                body = cls.extract_body(entry)
+                if not body:
+                    continue
+                post = Post(
+                    title=cls.extract_title(entry),
+                    body=body,
+                    published_time=published_time,
+                    author=cls.extract_author(feed, entry),
+                    link=cls.extract_link(entry),
+                )
+                posts.append(post)
+        return posts
+
+    @classmethod
+    def dated_entries(
+        cls, entries: Iterable[feedparser.FeedParserDict]
+    ) -> Iterator[tuple[feedparser.FeedParserDict, datetime]]:
+        """Pair entries with their published time lazily, before anything else is extracted.
+
+        :param entries: The entries of the feed.
+        :return: An iterator of entries with their published time.
+        """
+        for entry in entries:
+            yield entry, cls.extract_published_time(entry)
+
+    @classmethod
+    def entries_in_range(
+        cls,
+        dated_entries: Iterable[tuple[feedparser.FeedParserDict, datetime]],
+        from_datetime: datetime,
+        to_datetime: datetime | None,
+    ) -> Iterator[tuple[feedparser.FeedParserDict, datetime]]:
+        """Filter entries published within the date range.
+
+        Most feeds list entries newest first, so once ``early_stop_entries`` consecutive entries
+        are older than ``from_datetime`` and each of them is not newer than the previous one,
+        the rest of the feed is skipped. An older entry followed by a newer one, like a pinned
+        post or a feed listing oldest entries first, restarts the count.
+
+        :param dated_entries: The entries with their published time.
+        :param from_datetime: The start date and time for fetching posts.
+        :param to_datetime: The end date and time for fetching posts. If None, fetch posts till the current time.
+        :return: An iterator of entries within the range with their published time.
+        """
+        older_in_order = 0
+        previous_time = None
+        for entry, published_time in dated_entries:
             if published_time < from_datetime:
+                in_order = previous_time is not None and published_time <= previous_time
+                older_in_order = older_in_order + 1 if in_order else 1
+                previous_time = published_time
+                if cls.early_stop_entries and older_in_order >= cls.early_stop_entries:
+                    return
                 continue
+            older_in_order = 0
+            previous_time = published_time
             if to_datetime and published_time > to_datetime:
                 continue
-            post = Post(
-                title=cls.extract_title(entry),
-                body=body,
-                published_time=published_time,
-                author=cls.extract_author(feed, entry),
-                link=cls.extract_link(entry),
-            )
-            posts.append(post)
-        return posts
+            yield entry, published_time
+
+    @classmethod
+    def fetch_feed(cls, link: str) -> feedparser.FeedParserDict:
+        """Download the feed through the shared HTTP session and parse it.
+
+        The request carries the validators of the cached feed, so an unchanged feed is neither
+        downloaded nor parsed again.
+
+        :param link: The link to the RSS feed.
+        :return: The parsed feed.
+        :raises requests.RequestException: If the feed can't be downloaded.
+        """
+        cached = feed_cache.get(link)
+        headers = {}
+        if cached and cached.etag:
+            headers["If-None-Match"] = cached.etag
+        if cached and cached.modified:
+            headers["If-Modified-Since"] = cached.modified
+        with timed("download"):
+            response = http_session.get(link, headers=headers)
+        if cached and response.status_code == NOT_MODIFIED_STATUS:
+            return cached.feed
+        response.raise_for_status()
+        response_headers = {
+            key.lower(): value for key, value in response.headers.items()
+        }
+        response_headers.setdefault("content-location", response.url)
+        with timed("parse_feed"):
+            feed = feedparser.parse(response.content, response_headers=response_headers)
+        etag = response.headers.get("ETag")
+        modified = response.headers.get("Last-Modified")
+        if etag or modified:
+            feed_cache.set(link, CachedFeed(feed, etag, modified))
+        return feed
 
     @classmethod
     def extract_link(cls, entry):
@@ -84,21 +181,14 @@ class RSSFeedParser(NewsParser):
     def check_source_link(cls, link: str) -> bool:
         """Check if the source link is valid."""
         try:
-            response = requests.get(
-                link, timeout=10, headers={"User-Agent": "News Grouper"}
-            )
+            response = http_session.get(link)
             return response.status_code == 200
         except requests.RequestException:
             return False
 
     @classmethod
     def extract_text(cls, content):
-        soup = BeautifulSoup(content, features="lxml")
-        for br in soup.find_all("br"):
-            br.replace_with(soup.new_string("\n"))
-        for p in soup.find_all("p"):
-            p.append(soup.new_string("\n"))  # type: ignore
-        return soup.get_text().strip()
+        return cls.text_extractor.extract_text(content)
 
 
 if __name__ == "__main__":
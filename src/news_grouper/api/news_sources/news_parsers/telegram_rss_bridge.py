@@ -1,7 +1,5 @@
 from datetime import datetime
 
-from bs4 import BeautifulSoup
-
 from news_grouper.api.common.models import Post
 from news_grouper.api.news_sources.news_parsers import RSSFeedParser
 
@@ -58,11 +56,10 @@ class TelegramRSSBridgeParser(RSSFeedParser):
 
     @classmethod
     def extract_text(cls, content):
-        soup = BeautifulSoup(content, features="lxml")
-        for br in soup.find_all("br"):
-            br.replace_with(soup.new_string("\n"))
-        tags = soup.css.select(".tgme_widget_message_text, blockquote")
-        return "\n".join(tag.get_text().strip() for tag in tags)
+        texts = cls.text_extractor.extract_selected_texts(
+            content, classes=["tgme_widget_message_text"], tags=["blockquote"]
+        )
+        return "\n".join(text.strip() for text in texts)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,191 @@
+"""Cache of posts of live-fetched feeds in hourly buckets, so a sliding time range such as "the last
+24 hours" requested every few minutes is assembled from cached buckets and only the posts published
+since the previous fetch are extracted again.
+
+Every fetch of a feed starts at the beginning of the bucket which contained its previous fetch and
+replaces that bucket and all later ones. Earlier buckets are complete and kept as they are, so
+posts published late with an earlier time in the last bucket are still picked up, while edits of
+posts in earlier buckets aren't.
+"""
+
+from collections.abc import Iterable
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+
+from flask import current_app
+
+from news_grouper.api.common.lru_cache import LRUCache
+from news_grouper.api.common.metrics import count
+from news_grouper.api.common.models import Post
+from news_grouper.api.news_sources.fetching import FetchResult, fetch_posts
+from news_grouper.api.news_sources.models import NewsSource, as_utc
+
+BUCKET = timedelta(hours=1)
+
+
+@dataclass
+class FeedBuckets:
+    # posts by the start of the bucket they were published in
+    buckets: dict[datetime, list[Post]]
+    # all posts of the feed published from this bucket start until the fetch are in buckets
+    covered_from: datetime
+    fetched_at: datetime
+
+    def posts(
+        self, from_datetime: datetime, to_datetime: datetime | None
+    ) -> list[Post]:
+        """Get posts of the time range, newest buckets first and posts of a bucket in the order
+        of the feed.
+
+        :param from_datetime: The start of the time range in UTC.
+        :param to_datetime: The end of the time range in UTC or None for all later posts.
+        :return: The posts.
+        """
+        first = bucket_start(from_datetime)
+        return [
+            post
+            for start in sorted(self.buckets, reverse=True)
+            if start >= first and (to_datetime is None or start <= to_datetime)
+            for post in self.buckets[start]
+            if post.published_time >= from_datetime
+            and (to_datetime is None or post.published_time <= to_datetime)
+        ]
+
+
+class PostBucketCache:
+    """Thread-safe LRU cache of buckets of at most ``max_feeds`` feeds, keyed by parser name and
+    link. Buckets older than ``retention`` are dropped."""
+
+    def __init__(self, retention: timedelta, max_feeds: int):
+        self.retention = retention
+        self._feeds = LRUCache[tuple[str, str], FeedBuckets](max_feeds)
+
+    def get(self, parser_name: str, link: str) -> FeedBuckets | None:
+        return self._feeds.get((parser_name, link))
+
+    def update(
+        self,
+        parser_name: str,
+        link: str,
+        fetched_from: datetime,
+        fetched_at: datetime,
+        posts: list[Post],
+    ) -> FeedBuckets:
+        """Replace buckets from the start of a fetch with its posts. Earlier buckets are kept if
+        they are contiguous with the fetch.
+
+        :param parser_name: The name of the feed's parser.
+        :param link: The link of the feed.
+        :param fetched_from: The bucket start from which posts were fetched.
+        :param fetched_at: When the fetch started.
+        :param posts: The fetched posts published from ``fetched_from``.
+        :return: The buckets of the feed.
+        """
+        oldest = bucket_start(fetched_at - self.retention)
+        fetched: dict[datetime, list[Post]] = {}
+        for post in posts:
+            published = post.published_time.astimezone(timezone.utc)
+            fetched.setdefault(bucket_start(published), []).append(post)
+
+        def merge(previous: FeedBuckets | None) -> FeedBuckets:
+            buckets: dict[datetime, list[Post]] = {}
+            covered_from = fetched_from
+            if previous is not None and previous.fetched_at >= fetched_from:
+                buckets = {
+                    start: bucket_posts
+                    for start, bucket_posts in previous.buckets.items()
+                    if oldest <= start < fetched_from
+                }
+                covered_from = min(previous.covered_from, fetched_from)
+            buckets.update(fetched)
+            return FeedBuckets(buckets, max(covered_from, oldest), fetched_at)
+
+        return self._feeds.update((parser_name, link), merge)
+
+
+def get_post_bucket_cache() -> PostBucketCache:
+    """Get the post bucket cache of the current app, creating it on first use."""
+    cache = current_app.extensions.get("post_bucket_cache")
+    if cache is None:
+        cache = PostBucketCache(
+            retention=timedelta(days=current_app.config["POSTS_RETENTION_DAYS"]),
+            max_feeds=current_app.config["POST_BUCKETS_MAX_FEEDS"],
+        )
+        current_app.extensions["post_bucket_cache"] = cache
+    return cache
+
+
+def fetch_posts_by_buckets(
+    sources: Iterable[NewsSource],
+    from_datetime: datetime,
+    to_datetime: datetime | None,
+    cache: PostBucketCache,
+    **fetch_options,
+) -> FetchResult:
+    """Fetch posts of sources like ``fetch_posts``, but get the posts of buckets which were
+    already fetched from the cache and fetch every feed only from the bucket of its previous
+    fetch. Feeds whose time range ended before their previous fetch aren't fetched at all.
+
+    :param sources: The news sources to fetch posts from.
+    :param from_datetime: The start date and time for fetching posts.
+    :param to_datetime: The end date and time for fetching posts. If None, fetch posts till the
+        current time.
+    :param cache: The cache of buckets.
+    :param fetch_options: Options of ``fetch_posts``.
+    :return: The posts of all sources which were cached or fetched in time and the list of failed
+        sources.
+    """
+    sources = list(sources)
+    now = datetime.now(timezone.utc)
+    from_utc = as_utc(from_datetime).astimezone(timezone.utc)
+    to_utc = as_utc(to_datetime).astimezone(timezone.utc) if to_datetime else None
+    feeds: dict[int, FeedBuckets] = {}
+    starts: dict[int, datetime] = {}
+    for source in sources:
+        feed = cache.get(source.parser_name, source.link)
+        start = bucket_start(from_utc)
+        if feed is not None and feed.covered_from <= start:
+            if to_utc is not None and to_utc <= feed.fetched_at:
+                feeds[source.id] = feed
+                continue
+            start = max(start, bucket_start(feed.fetched_at))
+        starts[source.id] = start
+    to_fetch = [source for source in sources if source.id in starts]
+    result = fetch_posts(
+        to_fetch, from_datetime, None, from_datetimes=starts, **fetch_options
+    )
+    for source in to_fetch:
+        if source.id in result.posts_by_source:
+            feeds[source.id] = cache.update(
+                source.parser_name,
+                source.link,
+                starts[source.id],
+                now,
+                result.posts_by_source[source.id],
+            )
+    count("feeds_cached", len(sources) - len(to_fetch))
+    count(
+        "buckets_fetched", sum((now - start) // BUCKET + 1 for start in starts.values())
+    )
+    result.posts_by_source = {
+        source.id: feeds[source.id].posts(from_utc, to_utc)
+        for source in sources
+        if source.id in feeds
+    }
+    return result
+
+
+def bucket_start(value: datetime) -> datetime:
+    """Get the start of the bucket of a UTC datetime.
+
+    >>> bucket_start(datetime(2025, 1, 1, 12, 34, 56, tzinfo=timezone.utc))
+    datetime.datetime(2025, 1, 1, 12, 0, tzinfo=datetime.timezone.utc)
+    """
+    epoch = datetime(1970, 1, 1, tzinfo=timezone.utc)
+    return epoch + (value - epoch) // BUCKET * BUCKET
+
+
+if __name__ == "__main__":
+    import doctest
+
+    doctest.testmod()
@@ -226,3 +226,52 @@ class MockParser2(MockParser):
     name = "mock_parser2"
     description = "Mock parser"
     link_hint = "https://example.com"
+
+
+def make_post(
+    body: str, title: str = "Title", author: str = "Author", link: str | None = None
+) -> Post:
+    """Create a post published now. The link is made from the body unless it's given."""
+    return Post(
+        title=title,
+        body=body,
+        published_time=datetime.now(tz=UTC),
+        author=author,
+        link=link if link is not None else f"https://example.com/{body}",
+    )
+
+
+class FakeGeminiClient:
+    """Fake of GeminiClient which records bodies of posts it embeds and summarizes.
+
+    :param embed: A function which gets the embedding of a post. By default the embedding
+        depends on the length of the post's body.
+    :param summary: The summary of every group.
+    :param embedding_cache: The embedding cache used by groupers.
+    :param summary_cache: The summary cache used by groupers.
+    """
+
+    def __init__(
+        self,
+        embed=None,
+        summary: str = "Summary [1, 2]",
+        embedding_cache=None,
+        summary_cache=None,
+    ):
+        self.embed = embed or (lambda post: [float(len(post.body)), 1.0, 0.5])
+        self.summary = summary
+        self.embedding_cache = embedding_cache
+        self.summary_cache = summary_cache
+        self.embedded: list[str] = []
+        self.summarized: list[list[str]] = []
+
+    def compute_embeddings(self, posts):
+        self.embedded.extend(post.body for post in posts)
+        return [self.embed(post) for post in posts]
+
+    def summarize_posts(self, posts):
+        self.summarized.append([post.body for post in posts])
+        return self.summary
+
+    def map_as_completed(self, func, items):
+        return enumerate(map(func, items))
@@ -0,0 +1,82 @@
+from conftest import make_post
+
+from news_grouper.api.news_grouping.deduplication import (
+    canonical_url,
+    deduplicate_posts,
+)
+
+
+def test_copies_with_same_canonical_link_are_merged():
+    posts = [
+        make_post("Story", link="https://example.com/story", author="Source"),
+        make_post("Other", link="https://example.com/other", author="Source"),
+        make_post(
+            "Story with a teaser",
+            link="https://Example.com/story/?utm_source=aggregator",
+            author="Aggregator",
+        ),
+    ]
+
+    result = deduplicate_posts(posts)
+
+    assert result.removed == 1
+    assert [post.link for post in result.posts] == [
+        "https://example.com/story",
+        "https://example.com/other",
+    ]
+    assert result.posts[0].other_authors == ["Aggregator"]
+    assert result.posts[1].other_authors == []
+
+
+def test_copies_with_same_normalized_body_are_merged():
+    posts = [
+        make_post(
+            "Breaking:  Bridge   opens", link="https://a.example.com/1", author="A"
+        ),
+        make_post(
+            "breaking: bridge opens\n", link="https://b.example.com/2", author="B"
+        ),
+        make_post("breaking: bridge opens", link="https://c.example.com/3", author="A"),
+    ]
+
+    result = deduplicate_posts(posts)
+
+    assert result.removed == 2
+    assert result.posts[0].link == "https://a.example.com/1"
+    assert result.posts[0].other_authors == ["B"]
+
+
+def test_duplicates_are_merged_transitively():
+    posts = [
+        make_post("First", link="https://example.com/1", author="A"),
+        make_post("Second", link="https://example.com/1?fbclid=x", author="B"),
+        make_post("Second", link="https://mirror.example.com/1", author="C"),
+    ]
+
+    result = deduplicate_posts(posts)
+
+    assert result.removed == 2
+    assert result.posts[0].other_authors == ["B", "C"]
+
+
+def test_empty_bodies_and_links_are_not_duplicates():
+    posts = [make_post("", link="", author="A"), make_post("", link="", author="B")]
+
+    assert deduplicate_posts(posts).removed == 0
+
+
+def test_canonical_url_keeps_meaningful_parameters():
+    assert canonical_url("https://example.com/news?id=1&utm_medium=rss") != (
+        canonical_url("https://example.com/news?id=2")
+    )
+
+
+def test_canonical_url_keeps_scheme_subdomains_and_ref_parameter():
+    urls = [
+        "https://example.com/news",
+        "http://example.com/news",
+        "https://www.example.com/news",
+        "https://example.com/news?ref=1",
+    ]
+
+    assert len({canonical_url(url) for url in urls}) == len(urls)
@@ -0,0 +1,141 @@
+import numpy as np
+import pytest
+from scipy.cluster.hierarchy import linkage
+from scipy.spatial.distance import pdist
+from sklearn.cluster import DBSCAN, AgglomerativeClustering
+from sklearn.metrics.pairwise import cosine_distances
+
+from news_grouper.api.news_grouping.news_groupers import (
+    distances,
+    embeddings_groupers,
+)
+from news_grouper.api.news_grouping.news_groupers.distances import (
+    condensed_cosine_distances,
+    cosine_radius_neighbors,
+    normalize_embeddings,
+)
+from news_grouper.api.news_grouping.news_groupers.embeddings_groupers import (
+    EmbeddingsAgglomerativeGrouper,
+    EmbeddingsDBSCANGrouper,
+)
+from news_grouper.api.news_grouping.news_groupers.linkage_cache import linkage_trees
+
+
+@pytest.fixture(autouse=True)
+def small_blocks(monkeypatch):
+    """Split even small inputs into several blocks."""
+    monkeypatch.setattr(distances, "BLOCK_SIZE", 50)
+
+
+@pytest.fixture(autouse=True)
+def empty_linkage_cache():
+    linkage_trees.clear()
+    yield
+    linkage_trees.clear()
+
+
+@pytest.fixture
+def embeddings():
+    """Embeddings of stories with a few posts each, some close to each other."""
+    rng = np.random.default_rng(0)
+    centers = rng.normal(size=(8, 64))
+    posts = centers[rng.integers(0, len(centers), size=60)]
+    return (posts + rng.normal(scale=0.25, size=posts.shape)).tolist()
+
+
+def partition(labels):
+    """Convert labels to a set of clusters, which doesn't depend on label values."""
+    clusters = {}
+    for i, label in enumerate(labels):
+        clusters.setdefault(label, set()).add(i)
+    return {frozenset(cluster) for cluster in clusters.values()}
+
+
+def test_condensed_distances_match_pdist(embeddings):
+    condensed = condensed_cosine_distances(normalize_embeddings(embeddings))
+
+    assert condensed.dtype == np.float64
+    np.testing.assert_allclose(
+        condensed, pdist(np.array(embeddings), "cosine"), atol=1e-6
+    )
+
+
+def test_radius_neighbors_match_thresholded_dense_distances(embeddings):
+    dense = cosine_distances(embeddings)
+    np.fill_diagonal(dense, np.inf)
+
+    graph = cosine_radius_neighbors(normalize_embeddings(embeddings), 0.17)
+
+    assert set(zip(*graph.nonzero(), strict=True)) == set(
+        zip(*np.nonzero(dense <= 0.17), strict=True)
+    )
+
+
+def test_agglomerative_labels_match_dense_clustering(embeddings):
+    expected = AgglomerativeClustering(
+        n_clusters=None,  # type: ignore
+        distance_threshold=0.17,
+        linkage="complete",
+        metric="precomputed",
+    ).fit_predict(cosine_distances(embeddings))
+
+    labels = EmbeddingsAgglomerativeGrouper._cluster_embeddings(
+        normalize_embeddings(embeddings)
+    )
+
+    assert len(partition(expected)) > 1
+    assert partition(labels) == partition(expected)
+
+
+def test_agglomerative_cuts_cached_trees_at_lower_thresholds(embeddings, monkeypatch):
+    normalized = normalize_embeddings(embeddings)
+    EmbeddingsAgglomerativeGrouper._cluster_embeddings(normalized, 0.3)
+
+    def fail(*args, **kwargs):
+        raise AssertionError("linkage computed again")
+
+    monkeypatch.setattr(embeddings_groupers, "linkage", fail)
+    for threshold in (0.1, 0.17, 0.3):
+        expected = AgglomerativeClustering(
+            n_clusters=None,  # type: ignore
+            distance_threshold=threshold,
+            linkage="complete",
+            metric="precomputed",
+        ).fit_predict(cosine_distances(embeddings))
+
+        labels = EmbeddingsAgglomerativeGrouper._cluster_embeddings(
+            normalized, threshold
+        )
+
+        assert partition(labels) == partition(expected)
+
+
+def test_agglomerative_links_again_for_higher_threshold(embeddings, monkeypatch):
+    normalized = normalize_embeddings(embeddings)
+    calls = []
+    monkeypatch.setattr(
+        embeddings_groupers,
+        "linkage",
+        lambda *args, **kwargs: calls.append(args) or linkage(*args, **kwargs),
+    )
+
+    EmbeddingsAgglomerativeGrouper._cluster_embeddings(normalized, 0.1)
+    linked_at_lower_threshold = len(calls)
+    EmbeddingsAgglomerativeGrouper._cluster_embeddings(normalized, 0.3)
+
+    assert len(calls) > linked_at_lower_threshold
+
+
+@pytest.mark.parametrize("neighbors_mode", ["dense", "sparse"])
+def test_dbscan_labels_match_dense_clustering(embeddings, monkeypatch, neighbors_mode):
+    monkeypatch.setattr(EmbeddingsDBSCANGrouper, "neighbors_mode", neighbors_mode)
+    expected = DBSCAN(eps=0.17, min_samples=1, metric="precomputed").fit_predict(
+        cosine_distances(embeddings)
+    )
+
+    labels = EmbeddingsDBSCANGrouper._cluster_embeddings(
+        normalize_embeddings(embeddings)
+    )
+
+    assert len(partition(expected)) > 1
+    assert partition(labels) == partition(expected)
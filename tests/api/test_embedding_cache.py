@@ -0,0 +1,47 @@
+from datetime import timedelta
+
+import pytest
+from conftest import FakeGeminiClient, make_post
+
+from news_grouper.api.common.metrics import collect_metrics
+from news_grouper.api.news_grouping.embedding_cache import EmbeddingCache
+from news_grouper.api.news_grouping.news_groupers import EmbeddingsDBSCANGrouper
+
+
+@pytest.fixture
+def cache(db):
+    return EmbeddingCache(max_age=timedelta(days=1), max_entries=2)
+
+
+def test_embedding_cache_round_trip(cache):
+    cache.set_many({"first": [0.25, 0.5], "second": [1.0, 2.0]})
+
+    with collect_metrics() as metrics:
+        found = cache.get_many(["first", "second", "third"])
+
+    assert found == {"first": [0.25, 0.5], "second": [1.0, 2.0]}
+    assert metrics.counters == {"embedding_cache_hits": 2, "embedding_cache_misses": 1}
+
+
+def test_embedding_cache_evicts_least_recently_used(cache):
+    cache.set_many({"first": [1.0]})
+    cache.set_many({"second": [1.0]})
+    cache.set_many({"third": [1.0]})
+
+    assert cache.prune() == 1
+    assert cache.get_many(["first", "second", "third"]).keys() == {"second", "third"}
+
+
+def test_grouper_computes_only_missing_embeddings(cache):
+    client = FakeGeminiClient(embedding_cache=cache)
+    posts = [make_post("one"), make_post("three"), make_post("one")]
+
+    EmbeddingsDBSCANGrouper._computes_embeddings(posts, client)  # type: ignore
+    embeddings, failed, successful = EmbeddingsDBSCANGrouper._computes_embeddings(
+        [*posts, make_post("eleven")],
+        client,  # type: ignore
+    )
+
+    assert client.embedded == ["one", "three", "eleven"]
+    assert len(embeddings) == len(successful) == 4
+    assert failed == []
@@ -0,0 +1,79 @@
+from types import SimpleNamespace
+
+import feedparser
+
+from news_grouper.api.news_sources.news_parsers import (
+    RSSFeedParser,
+    TelegramRSSBridgeParser,
+    http_session,
+)
+from news_grouper.api.news_sources.news_parsers.feed_cache import (
+    CachedFeed,
+    FeedCache,
+    feed_cache,
+)
+
+FEED = b"""<?xml version="1.0"?>
+<rss version="2.0"><channel><title>Test feed</title>
+<item><title>Post</title><link>https://example.com/1</link><description>Body</description></item>
+</channel></rss>"""
+
+
+def test_feed_cache_evicts_least_recently_used():
+    cache = FeedCache(max_entries=2)
+    cache.set("https://a.com/feed", CachedFeed(feedparser.FeedParserDict()))
+    cache.set("https://b.com/feed", CachedFeed(feedparser.FeedParserDict()))
+    cache.get("HTTPS://A.com:443/feed")
+    cache.set("https://c.com/feed", CachedFeed(feedparser.FeedParserDict()))
+
+    assert cache.get("https://a.com/feed") is not None
+    assert cache.get("https://b.com/feed") is None
+    assert cache.get("https://c.com/feed") is not None
+
+
+def test_fetch_feed_sends_validators_and_reuses_cached_feed(monkeypatch):
+    feed_cache.clear()
+    sent_headers = []
+    full_response = SimpleNamespace(
+        status_code=200,
+        headers={"ETag": '"v1"', "Last-Modified": "Mon, 01 Jan 2024 00:00:00 GMT"},
+        content=FEED,
+        url="https://rss-bridge.org/feed",
+        raise_for_status=lambda: None,
+    )
+    responses = [full_response, SimpleNamespace(status_code=304)]
+
+    def get(link, headers=None):
+        sent_headers.append(headers)
+        return responses.pop(0)
+
+    monkeypatch.setattr(http_session, "get", get)
+
+    first = TelegramRSSBridgeParser.fetch_feed("https://rss-bridge.org/feed")
+    second = RSSFeedParser.fetch_feed("https://rss-bridge.org/feed")
+
+    assert first.feed.title == "Test feed"
+    assert second is first
+    assert sent_headers[0] == {}
+    assert sent_headers[1] == {
+        "If-None-Match": '"v1"',
+        "If-Modified-Since": "Mon, 01 Jan 2024 00:00:00 GMT",
+    }
+    feed_cache.clear()
+
+
+def test_http_session_uses_app_config(app, monkeypatch):
+    monkeypatch.delitem(app.extensions, "http_session", raising=False)
+    monkeypatch.setitem(app.config, "HTTP_POOL_CONNECTIONS_PER_HOST", 3)
+    monkeypatch.setitem(app.config, "HTTP_READ_TIMEOUT_SECONDS", 7)
+    session = http_session.get_session()
+    timeouts = []
+    monkeypatch.setattr(
+        session, "get", lambda url, headers, timeout: timeouts.append(timeout)
+    )
+
+    http_session.get("https://example.com/feed")
+
+    assert http_session.get_session() is session
+    assert session.get_adapter("https://example.com")._pool_maxsize == 3
+    assert timeouts == [(app.config["HTTP_CONNECT_TIMEOUT_SECONDS"], 7)]
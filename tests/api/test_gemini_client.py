@@ -0,0 +1,282 @@
+import threading
+import time
+from types import SimpleNamespace
+
+import pytest
+from conftest import make_post
+from google.genai import errors as genai_errors
+
+from news_grouper.api.news_grouping.news_groupers import gemini
+from news_grouper.api.news_grouping.news_groupers.gemini import GeminiClient
+from news_grouper.api.news_grouping.news_groupers.rate_limiter import RateLimiter
+from news_grouper.api.news_grouping.pipeline import get_gemini_client
+
+
+class FakeModels:
+    """Fake of google-genai models API which embeds text as [len(text)]."""
+
+    def __init__(self, failing_texts=()):
+        self.failing_texts = set(failing_texts)
+        self.embed_calls = []
+
+    def embed_content(self, model, contents, config):
+        self.embed_calls.append(contents)
+        texts = [contents] if isinstance(contents, str) else contents
+        if self.failing_texts.intersection(texts):
+            raise genai_errors.ClientError(400, {"error": {"message": "Bad input"}})
+        return SimpleNamespace(
+            embeddings=[SimpleNamespace(values=[float(len(text))]) for text in texts]
+        )
+
+
+@pytest.fixture
+def sleeps(monkeypatch):
+    """Record retry waits instead of sleeping."""
+    sleeps = []
+    for method in (
+        GeminiClient._embed_content_with_retry,
+        GeminiClient._embed_contents_with_retry,
+        GeminiClient._generate_content_with_retry,
+        GeminiClient._start_content_stream_with_retry,
+    ):
+        monkeypatch.setattr(method.retry, "sleep", sleeps.append)  # type: ignore
+    return sleeps
+
+
+@pytest.fixture
+def client(monkeypatch, sleeps):
+    monkeypatch.setattr(gemini, "EMBEDDING_BATCH_SIZE", 2)
+    client = GeminiClient(api_key="test-key")
+    client.gemini_client = SimpleNamespace(models=FakeModels())  # type: ignore
+    return client
+
+
+def test_compute_embeddings_in_batches(client):
+    posts = [make_post("a" * i) for i in range(1, 6)]
+
+    embeddings = client.compute_embeddings(posts)
+
+    assert embeddings == [[1.0], [2.0], [3.0], [4.0], [5.0]]
+    assert sorted(client.gemini_client.models.embed_calls) == [
+        ["a", "aa"],
+        ["aaa", "aaaa"],
+        ["aaaaa"],
+    ]
+
+
+def test_compute_embeddings_falls_back_to_single_requests(client, monkeypatch):
+    monkeypatch.setattr(client.gemini_client.models, "failing_texts", {"bad"})
+    posts = [make_post("good"), make_post("bad"), make_post("ok")]
+
+    embeddings = client.compute_embeddings(posts)
+
+    assert embeddings == [[4.0], None, [2.0]]
+    # 400 is not retried: one batch request, then one request per post of the failed batch
+    assert sorted(client.gemini_client.models.embed_calls, key=str) == [
+        ["good", "bad"],
+        ["ok"],
+        "bad",
+        "good",
+    ]
+
+
+def test_map_concurrently_keeps_order_and_limits_concurrency(client):
+    client.max_concurrency = 3
+    lock = threading.Lock()
+    in_flight = []
+    max_in_flight = []
+
+    def slow_square(number):
+        with lock:
+            in_flight.append(number)
+            max_in_flight.append(len(in_flight))
+        time.sleep(0.05 * (10 - number))
+        with lock:
+            in_flight.remove(number)
+        return number * number
+
+    start = time.monotonic()
+    results = client.map_concurrently(slow_square, range(10))
+
+    assert results == [number * number for number in range(10)]
+    assert max(max_in_flight) == 3
+    assert time.monotonic() - start < 0.05 * sum(range(1, 11))
+
+
+def test_rate_limited_requests_are_retried_after_requested_delay(client, sleeps):
+    responses = [
+        genai_errors.ClientError(429, {"error": {"details": [{"retryDelay": "7s"}]}}),
+        genai_errors.ServerError(503, {"error": {"message": "Unavailable"}}),
+        SimpleNamespace(text="Summary"),
+    ]
+
+    def generate_content(**kwargs):
+        response = responses.pop(0)
+        if isinstance(response, Exception):
+            raise response
+        return response
+
+    client.gemini_client.models.generate_content = generate_content
+    client.rate_limiter = RateLimiter(
+        requests_per_minute=6000, burst=10, max_concurrency=8
+    )
+
+    assert client.summarize_posts([make_post("a"), make_post("b")]) == "Summary"
+    assert sleeps[0] == 7
+    assert 0 < sleeps[1] <= gemini.RETRY_MAX_WAIT_SECONDS
+    # the 429 halved the concurrency limit of the API key
+    assert client.rate_limiter.concurrency_limit < 5
+    assert client.rate_limiter.in_flight == 0
+
+
+def test_permanent_errors_are_not_retried(client, sleeps):
+    def generate_content(**kwargs):
+        raise genai_errors.ClientError(400, {"error": {"message": "API key not valid"}})
+
+    client.gemini_client.models.generate_content = generate_content
+
+    assert client.summarize_posts([make_post("a")]) == "Failed to generate summary."
+    assert sleeps == []
+
+
+def test_rate_limiter_limits_request_rate():
+    limiter = RateLimiter(requests_per_minute=600, burst=2, max_concurrency=8)
+
+    start = time.monotonic()
+    for _ in range(4):
+        with limiter.request():
+            pass
+
+    # two requests fit into the burst, the other two wait 0.1 seconds each
+    assert time.monotonic() - start >= 0.15
+
+
+def test_rate_limiter_rejects_non_positive_rate():
+    with pytest.raises(ValueError):
+        RateLimiter(requests_per_minute=0, burst=2, max_concurrency=8)
+
+
+def test_zero_requests_per_minute_disables_rate_limiting(app, monkeypatch):
+    monkeypatch.setitem(app.config, "GEMINI_REQUESTS_PER_MINUTE", 0)
+
+    client = get_gemini_client(SimpleNamespace(api_key="unlimited-key"))  # type: ignore
+
+    assert client.rate_limiter is None
+
+
+def test_map_as_completed_yields_results_when_ready(client):
+    def slow_square(number):
+        time.sleep(0.05 * (3 - number))
+        return number * number
+
+    results = list(client.map_as_completed(slow_square, range(3)))
+
+    assert results == [(2, 4), (1, 1), (0, 0)]
+
+
+def make_stream(*chunks):
+    """Create a fake generate_content_stream response, exceptions are raised when reached."""
+    for chunk in chunks:
+        if isinstance(chunk, Exception):
+            raise chunk
+        yield SimpleNamespace(text=chunk)
+
+
+def test_summary_stream_is_retried_before_first_chunk(client, sleeps):
+    streams = [
+        make_stream(
+            genai_errors.ServerError(503, {"error": {"message": "Unavailable"}})
+        ),
+        make_stream("", "Sum", "mary"),
+    ]
+    client.gemini_client.models.generate_content_stream = lambda **kwargs: streams.pop(
+        0
+    )
+    client.rate_limiter = RateLimiter(
+        requests_per_minute=6000, burst=10, max_concurrency=8
+    )
+
+    chunks = list(client.summarize_posts_stream([make_post("a"), make_post("b")]))
+
+    assert chunks == ["Sum", "mary"]
+    assert len(sleeps) == 1
+    assert client.rate_limiter.in_flight == 0
+
+
+def test_summary_stream_is_not_retried_after_first_chunk(client, sleeps):
+    calls = []
+
+    def generate_content_stream(**kwargs):
+        calls.append(kwargs)
+        return make_stream(
+            "Sum", genai_errors.ServerError(503, {"error": {"message": "Unavailable"}})
+        )
+
+    client.gemini_client.models.generate_content_stream = generate_content_stream
+
+    summary = "".join(client.summarize_posts_stream([make_post("a"), make_post("b")]))
+
+    assert summary == "Sum\n" + gemini.SUMMARY_FAILED_MESSAGE
+    assert len(calls) == 1
+    assert sleeps == []
+
+
+def test_interleave_streams_yields_chunks_as_they_arrive(client):
+    def slow_stream(number):
+        for chunk in range(2):
+            time.sleep(0.15 if number == 0 else 0.01)
+            yield (number, chunk)
+
+    results = list(client.interleave_streams(slow_stream, range(2)))
+
+    assert results == [
+        (1, (1, 0)),
+        (1, (1, 1)),
+        (1, None),
+        (0, (0, 0)),
+        (0, (0, 1)),
+        (0, None),
+    ]
+
+
+def test_pool_reuses_clients_and_evicts_idle_ones(monkeypatch):
+    clock = [0.0]
+    monkeypatch.setattr(gemini.time, "monotonic", lambda: clock[0])
+    pool = gemini.GeminiClientPool(max_clients=2, idle_timeout=60)
+
+    def create():
+        return GeminiClient(api_key="key")
+
+    first = pool.get("first", create)
+    assert pool.get("first", create) is first
+    pool.get("second", create)
+    pool.get("third", create)
+    # the least recently used client is evicted above the maximum size
+    assert pool.get("first", create) is not first
+    clock[0] = 120
+    pool.get("fourth", create)
+
+    assert len(pool) == 1
+
+
+def test_pool_keeps_the_first_client_created_concurrently():
+    pool = gemini.GeminiClientPool()
+    barrier = threading.Barrier(2)
+
+    def create():
+        barrier.wait()
+        return GeminiClient(api_key="key")
+
+    clients = []
+    threads = [
+        threading.Thread(target=lambda: clients.append(pool.get("same", create)))
+        for _ in range(2)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert clients[0] is clients[1]
+    assert pool.get("same", create) is clients[0]
+    assert len(pool) == 1
@@ -0,0 +1,156 @@
+import json
+from datetime import UTC, datetime, timedelta
+from typing import ClassVar
+
+import pytest
+from conftest import MockParser
+
+from news_grouper.api.auth.models import User
+from news_grouper.api.news_grouping.jobs import (
+    claim_job,
+    fail_stale_jobs,
+    prune_jobs,
+    run_job,
+    submit_job,
+)
+from news_grouper.api.news_grouping.models import GroupingJob
+from news_grouper.api.news_grouping.news_groupers import NewsGrouper
+from news_grouper.api.news_sources.models import NewsSource
+from news_grouper.api.profiles.models import Profile
+
+
+class StagesRecordingGrouper(NewsGrouper):
+    name = "Test Stages Recording"
+    description = "Keeps every post separate and records stages of the job"
+    stages: ClassVar[list[str]] = []
+
+    @classmethod
+    def _get_groups(cls, posts, gemini_client, options=None):
+        cls.stages.append(db_stage())
+        return [[post] for post in posts]
+
+
+class ThresholdRecordingGrouper(NewsGrouper):
+    name = "Test Threshold Recording"
+    description = "Keeps every post separate and records distance thresholds"
+    thresholds: ClassVar[list[float | None]] = []
+
+    @classmethod
+    def _get_groups(cls, posts, gemini_client, options=None):
+        cls.thresholds.append(options.distance_threshold)  # type: ignore
+        return [[post] for post in posts]
+
+
+class BrokenGrouper(NewsGrouper):
+    name = "Test Broken"
+    description = "Always fails"
+
+    @classmethod
+    def _get_groups(cls, posts, gemini_client, options=None):
+        raise RuntimeError("Broken")
+
+
+class ValueErrorGrouper(NewsGrouper):
+    name = "Test Value Error"
+    description = "Always fails with an error of a library"
+
+    @classmethod
+    def _get_groups(cls, posts, gemini_client, options=None):
+        raise ValueError("Input contains NaN")
+
+
+def db_stage():
+    return GroupingJob.query.one().stage
+
+
+@pytest.fixture
+def profile(db):
+    user = User(
+        password="SecurePassw0rd!",  # noqa: S106
+        first_name="John",
+        last_name="Doe",
+        email="john.doe@example.com",
+        api_key="key",
+    )
+    profile = Profile(name="Profile", description="", user=user)
+    NewsSource(
+        name="Source",
+        link="https://example.com/feed",
+        parser_name=MockParser.name,
+        profile=profile,
+    )
+    db.session.add(user)
+    db.session.commit()
+    return profile
+
+
+def submit(profile, grouper, distance_threshold=None):
+    from_datetime = datetime.now(tz=UTC) - timedelta(hours=1)
+    return submit_job(
+        profile.user_id,
+        profile.id,
+        grouper.name,
+        from_datetime.isoformat(),
+        None,
+        distance_threshold=distance_threshold,
+    )
+
+
+def test_job_runs_pipeline_and_stores_result(profile):
+    job = submit(profile, StagesRecordingGrouper)
+    assert job.status == "pending"
+
+    claimed = claim_job()
+    assert claimed is not None
+    assert claimed.id == job.id
+    assert claimed.status == "running"
+    assert claim_job() is None
+
+    run_job(claimed)
+
+    assert StagesRecordingGrouper.stages == ["grouping"]
+    assert claimed.status == "succeeded"
+    assert claimed.stage is None
+    result = json.loads(claimed.result)  # type: ignore
+    assert [post["body"] for post in result["posts"]] == ["Test body"]
+    assert result["failed_sources"] == []
+
+
+def test_job_groups_with_distance_threshold(profile):
+    submit(profile, ThresholdRecordingGrouper, distance_threshold=0.25)
+
+    run_job(claim_job())  # type: ignore
+
+    assert ThresholdRecordingGrouper.thresholds == [0.25]
+
+
+def test_failed_job_stores_error(profile):
+    submit(profile, BrokenGrouper)
+
+    job = claim_job()
+    run_job(job)  # type: ignore
+
+    assert job.status == "failed"  # type: ignore
+    assert job.stage == "grouping"  # type: ignore
+    assert job.error == "Internal error"  # type: ignore
+    assert job.result is None  # type: ignore
+
+
+def test_value_errors_of_pipeline_are_not_shown(profile):
+    submit(profile, ValueErrorGrouper)
+
+    job = claim_job()
+    run_job(job)  # type: ignore
+
+    assert job.status == "failed"  # type: ignore
+    assert job.error == "Internal error"  # type: ignore
+
+
+def test_stale_and_old_jobs_are_cleaned_up(profile):
+    submit(profile, StagesRecordingGrouper)
+    claim_job()
+
+    assert fail_stale_jobs(datetime.now(tz=UTC) - timedelta(minutes=1)) == 0
+    assert fail_stale_jobs(datetime.now(tz=UTC) + timedelta(minutes=1)) == 1
+    assert prune_jobs(datetime.now(tz=UTC) + timedelta(minutes=1)) == 1
+    assert GroupingJob.query.count() == 0
@@ -0,0 +1,76 @@
+import warnings
+
+import pytest
+from bs4 import XMLParsedAsHTMLWarning
+
+from news_grouper.api.news_sources.news_parsers import TelegramRSSBridgeParser
+from news_grouper.api.news_sources.news_parsers.html_text import (
+    BeautifulSoupTextExtractor,
+    LxmlTextExtractor,
+)
+
+CORPUS = [
+    "",
+    "   ",
+    "Plain text",
+    "<p>First</p><p>Second</p>",
+    "One<br>two<br/>three<br></br>",
+    "<p>Line<br></p>after",
+    "<div>Comment<!-- hidden -->tail</div>",
+    "<p>Code<script>var x = 1;</script> and <style>p {}</style>style</p>",
+    "<ruby>漢<rp>(</rp><rt>kan</rt><rp>)</rp></ruby>字",
+    "<template><p>Template<br>text</p></template>after",
+    "&amp; &lt;tag&gt; &nbsp;&#8212; &unknown;",
+    "<p>Unclosed<p>next <b>bold <i>nested</b> text",
+    "<ul><li>First</li>\n<li>Second</li></ul>",
+    "<?xml version='1.0'?><p>Processing instruction</p>",
+    '<?xml version="1.0" encoding="utf-8"?><p>Declared</p>',
+    '<?xml version="1.0" encoding="iso-8859-1"?><p>Déclaré</p>',
+    '<meta charset="iso-8859-1"><p>Déclaré</p>',
+    "<!DOCTYPE html><html><head><title>Title</title></head><body><p>Body</p></body></html>",
+    "<table><tr><td>1</td><td>2</td></tr></table>",
+    "<pre>  indented\n    code</pre>",
+    "<![CDATA[cdata]]>text",
+    "<textarea>Area</textarea><noscript>No script</noscript>",
+    '<img src="image.png" alt="Image"><a href="https://example.com">Link</a>',
+    "Text with < and > signs & ampersand",
+]
+
+TELEGRAM_CORPUS = [
+    "",
+    '<div class="tgme_widget_message_text">Message<br>text</div>',
+    '<div class="tgme_widget_message_text js-message_text">Message</div>'
+    "<blockquote>Quote</blockquote><div>Footer</div>",
+    '<div class="tgme_widget_message_text">Text <blockquote>nested</blockquote></div>',
+    '<div class="tgme_widget_message_text"><p>Paragraph</p>tail</div>',
+    '<blockquote class="tgme_widget_message_text">Both</blockquote>',
+    '<div class="tgme_widget_message_text_other">Not selected</div>',
+    "<div>No selected elements</div>",
+]
+
+
+@pytest.mark.parametrize("content", CORPUS)
+def test_lxml_text_matches_beautifulsoup(content):
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", XMLParsedAsHTMLWarning)
+        expected = BeautifulSoupTextExtractor.extract_text(content)
+
+    assert LxmlTextExtractor.extract_text(content) == expected
+
+
+@pytest.mark.parametrize("content", TELEGRAM_CORPUS)
+def test_lxml_selected_texts_match_beautifulsoup(content):
+    options = {"classes": ["tgme_widget_message_text"], "tags": ["blockquote"]}
+
+    assert LxmlTextExtractor.extract_selected_texts(
+        content, **options
+    ) == BeautifulSoupTextExtractor.extract_selected_texts(content, **options)
+
+
+def test_telegram_parser_joins_selected_texts():
+    content = (
+        '<div class="tgme_widget_message_text"> Message<br>text </div>'
+        "<blockquote>Quote</blockquote><div>Footer</div>"
+    )
+
+    assert TelegramRSSBridgeParser.extract_text(content) == "Message\ntext\nQuote"
@@ -0,0 +1,107 @@
+import numpy as np
+import pytest
+from conftest import FakeGeminiClient, make_post
+
+from news_grouper.api.news_grouping.news_groupers import GroupingOptions
+from news_grouper.api.news_grouping.news_groupers.clustering_state import (
+    clustering_states,
+)
+from news_grouper.api.news_grouping.news_groupers.embeddings_groupers import (
+    EmbeddingsAgglomerativeGrouper,
+    EmbeddingsDBSCANGrouper,
+)
+
+# unit vectors at these angles in degrees, 10 degrees is a cosine distance of about 0.015
+ANGLES = {"a1": 0, "a2": 10, "a3": 20, "b1": 90, "b2": 100, "c1": 180, "bridge": 45}
+
+
+def angle_embedding(post):
+    angle = np.radians(ANGLES[post.body])
+    return [np.cos(angle), np.sin(angle)]
+
+
+def group_bodies(grouper, bodies, state_key="1"):
+    groups = grouper._get_groups(
+        [make_post(body) for body in bodies],
+        FakeGeminiClient(embed=angle_embedding),  # type: ignore
+        GroupingOptions(state_key=state_key),
+    )
+    return {frozenset(post.body for post in group) for group in groups}
+
+
+@pytest.fixture(autouse=True)
+def states():
+    clustering_states.clear()
+    yield
+    clustering_states.clear()
+
+
+@pytest.fixture
+def full_clusterings(monkeypatch):
+    calls = []
+    for grouper in (EmbeddingsAgglomerativeGrouper, EmbeddingsDBSCANGrouper):
+        cluster = grouper._cluster_embeddings
+
+        def counted(embeddings, threshold=None, cluster=cluster):
+            calls.append(len(embeddings))
+            return cluster(embeddings, threshold)
+
+        monkeypatch.setattr(grouper, "_cluster_embeddings", counted)
+    return calls
+
+
+@pytest.fixture
+def max_drift(monkeypatch):
+    monkeypatch.setattr(EmbeddingsAgglomerativeGrouper, "max_drift", 0.5)
+    monkeypatch.setattr(EmbeddingsDBSCANGrouper, "max_drift", 0.5)
+
+
+@pytest.mark.usefixtures("max_drift")
+def test_new_posts_are_added_to_existing_clusters(full_clusterings):
+    group_bodies(EmbeddingsAgglomerativeGrouper, ["a1", "a2", "b1", "b2"])
+
+    groups = group_bodies(
+        EmbeddingsAgglomerativeGrouper, ["a1", "a2", "b1", "b2", "a3"]
+    )
+
+    assert full_clusterings == [4]
+    assert groups == {frozenset({"a1", "a2", "a3"}), frozenset({"b1", "b2"})}
+
+
+@pytest.mark.usefixtures("max_drift")
+def test_new_posts_far_from_all_clusters_form_new_clusters(full_clusterings):
+    group_bodies(EmbeddingsDBSCANGrouper, ["a1", "a2", "b1", "b2"])
+
+    groups = group_bodies(EmbeddingsDBSCANGrouper, ["a1", "a2", "b1", "b2", "c1"])
+
+    assert full_clusterings == [4]
+    assert frozenset({"c1"}) in groups
+
+
+def test_profiles_keep_separate_clusters(full_clusterings):
+    group_bodies(EmbeddingsDBSCANGrouper, ["a1", "a2"], state_key="1")
+    group_bodies(EmbeddingsDBSCANGrouper, ["b1", "b2"], state_key="2")
+
+    group_bodies(EmbeddingsDBSCANGrouper, ["a1", "a2"], state_key="1")
+
+    assert full_clusterings == [2, 2]
+
+
+def test_drift_above_threshold_clusters_all_posts_again(full_clusterings):
+    group_bodies(EmbeddingsAgglomerativeGrouper, ["a1", "a2", "b1", "b2"])
+
+    group_bodies(EmbeddingsAgglomerativeGrouper, ["a1", "a2", "b1", "b2", "a3"])
+    group_bodies(EmbeddingsAgglomerativeGrouper, ["a2", "b1", "b2", "a3", "c1"])
+
+    # 1 of 4 posts added is within max_drift, 2 more added and 1 removed are not
+    assert full_clusterings == [4, 5]
+
+
+@pytest.mark.usefixtures("max_drift")
+def test_dbscan_merges_clusters_connected_by_new_post(monkeypatch):
+    monkeypatch.setattr(EmbeddingsDBSCANGrouper, "eps", 0.35)
+    group_bodies(EmbeddingsDBSCANGrouper, ["a1", "b1", "c1", "b2"])
+
+    groups = group_bodies(EmbeddingsDBSCANGrouper, ["a1", "b1", "c1", "b2", "bridge"])
+
+    assert groups == {frozenset({"a1", "bridge", "b1", "b2"}), frozenset({"c1"})}
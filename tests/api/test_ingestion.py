@@ -0,0 +1,96 @@
+from datetime import UTC, datetime, timedelta
+
+import pytest
+from conftest import MockParser
+
+from news_grouper.api.auth.models import User
+from news_grouper.api.news_sources.ingestion import (
+    ingest_feeds,
+    load_stored_posts,
+    prune_posts,
+)
+from news_grouper.api.news_sources.models import NewsSource, StoredPost
+from news_grouper.api.profiles.models import Profile
+
+
+@pytest.fixture
+def sources(db):
+    user = User(
+        password="SecurePassw0rd!",  # noqa: S106
+        first_name="John",
+        last_name="Doe",
+        email="john.doe@example.com",
+        api_key="key",
+    )
+    profiles = [
+        Profile(name=f"Profile {i}", description="", user=user) for i in range(2)
+    ]
+    # the same feed in two profiles is ingested once
+    sources = [
+        NewsSource(
+            name="Source",
+            link="https://example.com/feed",
+            parser_name=MockParser.name,
+            profile=profile,
+        )
+        for profile in profiles
+    ]
+    db.session.add(user)
+    db.session.commit()
+    return sources
+
+
+def ingest():
+    return ingest_feeds(
+        timedelta(days=1), max_workers=4, source_timeout=5, total_timeout=5
+    )
+
+
+def test_ingest_feeds_deduplicates_feeds_and_posts(db, sources):
+    first_report = ingest()
+    second_report = ingest()
+
+    assert first_report.feeds == 1
+    assert first_report.posts_inserted == 1
+    assert second_report.posts_inserted == 0
+    assert db.session.query(StoredPost).count() == 1
+
+
+def load(sources, from_datetime, max_age=timedelta(hours=1)):
+    return load_stored_posts(
+        sources, from_datetime, None, max_age, retention=timedelta(days=1)
+    )
+
+
+def test_load_stored_posts_uses_only_fresh_feeds(db, sources):
+    from_datetime = datetime.now(tz=UTC) - timedelta(hours=1)
+    not_ingested = load(sources, from_datetime)
+    ingest()
+
+    stored = load(sources, from_datetime)
+    future = load(sources, datetime.now(tz=UTC) + timedelta(hours=1))
+    disabled = load(sources, from_datetime, max_age=timedelta(0))
+
+    assert not_ingested.posts == []
+    assert not_ingested.missing_sources == sources
+    assert [post.title for post in stored.posts] == ["Test Post"]
+    assert stored.posts[0].published_time.tzinfo is not None
+    assert stored.missing_sources == []
+    assert future.posts == []
+    assert disabled.missing_sources == sources
+
+
+def test_load_stored_posts_fetches_ranges_before_retention_live(db, sources):
+    ingest()
+
+    older = load(sources, datetime.now(tz=UTC) - timedelta(days=2))
+
+    assert older.posts == []
+    assert older.missing_sources == sources
+
+
+def test_prune_posts(db, sources):
+    ingest()
+
+    assert prune_posts(datetime.now(tz=UTC) - timedelta(hours=1)) == 0
+    assert prune_posts(datetime.now(tz=UTC) + timedelta(hours=1)) == 1
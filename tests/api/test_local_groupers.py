@@ -0,0 +1,94 @@
+import pytest
+from conftest import make_post
+
+from news_grouper.api.news_grouping.news_groupers import (
+    GroupingOptions,
+    LocalAgglomerativeGrouper,
+    LocalDBSCANGrouper,
+    NewsGrouper,
+)
+from news_grouper.api.news_grouping.news_groupers.local_groupers import (
+    VECTOR_DIMENSIONS,
+    extractive_summary,
+    local_vectors,
+)
+
+RATES = [
+    "The central bank raised its key interest rate by half a point on Tuesday.",
+    "Central bank hikes interest rate by half a point as inflation stays high.",
+]
+FOOTBALL = [
+    "The national football team won the cup final after a penalty shootout.",
+    "Football: national team wins the cup final on penalties.",
+]
+
+
+class UnusableGeminiClient:
+    embedding_cache = None
+
+    def compute_embeddings(self, posts):
+        raise AssertionError("local groupers must not call Gemini API")
+
+    def summarize_posts(self, posts):
+        raise AssertionError("local groupers must not call Gemini API")
+
+
+@pytest.mark.parametrize("grouper", [LocalAgglomerativeGrouper, LocalDBSCANGrouper])
+def test_posts_are_grouped_without_gemini(grouper):
+    bodies = [RATES[0], FOOTBALL[0], RATES[1], FOOTBALL[1]]
+    posts = [make_post(body, link=str(i)) for i, body in enumerate(bodies)]
+
+    groups = grouper._get_groups(
+        posts,
+        UnusableGeminiClient(),  # type: ignore
+        GroupingOptions(),
+    )
+
+    assert sorted([post.link for post in group] for group in groups) == [
+        ["0", "2"],
+        ["1", "3"],
+    ]
+
+
+def test_local_groupers_are_registered():
+    assert NewsGrouper.get_grouper_by_name("Local DBSCAN") is LocalDBSCANGrouper
+    assert LocalAgglomerativeGrouper.summarizer != NewsGrouper.summarizer
+
+
+def test_many_posts_are_reduced_to_vector_dimensions():
+    texts = [f"{RATES[i % 2]} Update number {i}." for i in range(VECTOR_DIMENSIONS + 1)]
+    texts[-1] = FOOTBALL[0]
+
+    vectors = local_vectors(texts)
+
+    assert vectors.shape == (len(texts), VECTOR_DIMENSIONS)
+    norms = (vectors**2).sum(axis=1) ** 0.5
+    similarities = vectors @ vectors.T / norms[:, None] / norms[None, :]
+    assert similarities[0, 2] > 0.5 > similarities[0, -1]
+
+
+@pytest.mark.parametrize(
+    ("text", "dimensions"), [("Breaking news {}", 2), ("\U0001f525 {}", 1)]
+)
+def test_many_posts_with_few_words_are_vectorized(text, dimensions):
+    texts = [text.format("\U0001f525" * (i % 3)) for i in range(VECTOR_DIMENSIONS + 44)]
+
+    vectors = local_vectors(texts)
+
+    assert vectors.shape == (len(texts), dimensions)
+
+
+def test_summary_cites_posts_with_similar_sentences():
+    posts = [
+        make_post(f"{RATES[0]} Markets fell.", link="1"),
+        make_post(RATES[1], link="2"),
+    ]
+
+    summary = LocalDBSCANGrouper.summarize_posts(
+        posts,
+        UnusableGeminiClient(),  # type: ignore
+    )
+
+    assert summary.startswith(RATES[0])
+    assert "[1, 2]" in summary
+    assert extractive_summary([make_post("", link="1")]) == ""
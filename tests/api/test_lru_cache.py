@@ -0,0 +1,43 @@
+import threading
+import time
+from datetime import timedelta
+
+from news_grouper.api.common.lru_cache import LRUCache
+
+
+def test_least_recently_used_values_are_evicted():
+    cache = LRUCache[str, int](max_entries=2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+
+    assert cache.get("a") == 1
+    assert cache.get("b") is None
+    assert len(cache) == 2
+
+
+def test_values_expire_after_ttl_since_stored():
+    cache = LRUCache[str, int](max_entries=2, ttl=timedelta(minutes=5))
+    cache.set("old", 1, stored_at=time.monotonic() - 600)
+    cache.set("new", 2)
+
+    assert cache.get("old") is None
+    assert cache.get("new") == 2
+    assert len(cache) == 1
+
+
+def test_concurrent_updates_are_not_lost():
+    cache = LRUCache[str, int](max_entries=2)
+
+    def increment():
+        for _ in range(1000):
+            cache.update("counter", lambda value: (value or 0) + 1)
+
+    threads = [threading.Thread(target=increment) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert cache.get("counter") == 4000
@@ -0,0 +1,105 @@
+import numpy as np
+import pytest
+from conftest import FakeGeminiClient, make_post
+
+from news_grouper.api.news_grouping.news_groupers import (
+    EmbeddingsAgglomerativeGrouper,
+    GroupingOptions,
+    near_duplicates,
+)
+from news_grouper.api.news_grouping.news_groupers.near_duplicates import (
+    _shingle_hashes,
+    near_duplicate_clusters,
+)
+
+STORY = (
+    "Officials said on Monday that the new bridge across the river will open to traffic "
+    "next month after three years of construction and several delays caused by flooding"
+)
+REPOST = STORY + " (Reuters)"
+REWRITE = STORY.replace("Monday", "Tuesday").replace("river", "bay")
+OTHER = "The national football team won the final after a penalty shootout"
+
+
+def orthogonal_embedding(post):
+    """Embed every text along its own axis, so only collapsed posts are grouped."""
+    return [float(post.body == text) for text in (STORY, REPOST, REWRITE, OTHER)]
+
+
+def test_near_duplicates_are_clustered():
+    clusters = near_duplicate_clusters(
+        [STORY, OTHER, REPOST, "", ""], min_similarity=0.8
+    )
+
+    assert clusters == [[0, 2], [1], [3], [4]]
+
+
+def test_near_duplicates_are_not_clustered_below_similarity():
+    assert near_duplicate_clusters([STORY, REWRITE], min_similarity=0.9) == [[0], [1]]
+
+
+def test_near_duplicates_of_each_other_are_clustered_in_shared_bucket(monkeypatch):
+    size = near_duplicates.BANDS * near_duplicates.ROWS
+    signatures = np.arange(size, dtype=np.uint64) + np.array(
+        [[0], [100], [200]], np.uint64
+    )
+    # all texts share the first band, the last two also share 3 of 4 rows of other bands
+    signatures[:, : near_duplicates.ROWS] = 0
+    signatures[2, near_duplicates.ROWS :] = signatures[1, near_duplicates.ROWS :]
+    signatures[2, near_duplicates.ROWS :: near_duplicates.ROWS] += 1
+    monkeypatch.setattr(near_duplicates, "minhash_signatures", lambda texts: signatures)
+
+    assert near_duplicate_clusters(["", "", ""], min_similarity=0.7) == [[0], [1, 2]]
+
+
+def test_shingle_hashes_are_the_same_in_every_process():
+    # hash() of strings is salted per process, which would change candidates between workers
+    assert _shingle_hashes("The bridge will open next month").tolist() == [
+        1469666310,
+        346034262,
+        3622293565,
+        843925585,
+    ]
+
+
+def test_near_duplicates_share_one_embedding_and_group():
+    client = FakeGeminiClient(embed=orthogonal_embedding)
+    posts = [
+        make_post(STORY, link="https://a.example.com/1"),
+        make_post(OTHER, link="https://a.example.com/2"),
+        make_post(REPOST, link="https://b.example.com/1"),
+    ]
+
+    groups = EmbeddingsAgglomerativeGrouper._get_groups(
+        posts,
+        client,  # type: ignore
+        GroupingOptions(),
+    )
+
+    assert client.embedded == [STORY, OTHER]
+    assert sorted([post.link for post in group] for group in groups) == [
+        ["https://a.example.com/1", "https://b.example.com/1"],
+        ["https://a.example.com/2"],
+    ]
+
+
+def test_collapsing_can_be_disabled(monkeypatch):
+    monkeypatch.setattr(
+        EmbeddingsAgglomerativeGrouper, "near_duplicate_similarity", None
+    )
+    client = FakeGeminiClient(embed=orthogonal_embedding)
+
+    EmbeddingsAgglomerativeGrouper._get_groups(
+        [make_post(STORY, link="https://a.example.com/1"), make_post(REPOST, link="b")],
+        client,  # type: ignore
+        GroupingOptions(),
+    )
+
+    assert client.embedded == [STORY, REPOST]
+
+
+@pytest.mark.parametrize("body", ["", "Breaking"])
+def test_short_identical_posts_are_collapsed_only_with_words(body):
+    clusters = near_duplicate_clusters([body, body], min_similarity=0.8)
+
+    assert len(clusters) == (2 if not body else 1)
@@ -0,0 +1,195 @@
+import json
+import logging
+from datetime import UTC, datetime, timedelta, timezone
+from types import SimpleNamespace
+
+import pytest
+from conftest import MockParser
+from flask_jwt_extended import create_access_token
+
+from news_grouper.api.auth.models import User
+from news_grouper.api.news_grouping.news_cache import (
+    NewsCache,
+    get_news_cache,
+    news_key,
+)
+from news_grouper.api.news_grouping.news_groupers.gemini import SUMMARY_FAILED_MESSAGE
+from news_grouper.api.news_sources.fetching import SourceFetchFailure
+from news_grouper.api.news_sources.models import NewsSource
+from news_grouper.api.profiles.models import Profile
+
+FROM = datetime(2025, 1, 1, 12, tzinfo=UTC)
+SOURCES = [SimpleNamespace(id=1, parser_name="RSS Feed", link="https://example.com")]
+# the same time range for all requests of the tests, so they hit the cache
+NEWS_FROM = datetime.now(tz=UTC) - timedelta(hours=1)
+
+
+@pytest.fixture
+def profile(db):
+    user = User(
+        password="SecurePassw0rd!",  # noqa: S106
+        first_name="John",
+        last_name="Doe",
+        email="john.doe@example.com",
+        api_key="key",
+    )
+    profile = Profile(name="Profile", description="", user=user)
+    NewsSource(
+        name="Source",
+        link="https://example.com/feed",
+        parser_name=MockParser.name,
+        profile=profile,
+    )
+    db.session.add(user)
+    db.session.commit()
+    get_news_cache().clear()
+    yield profile
+    get_news_cache().clear()
+
+
+def get_news(client, profile, path="news", **headers):
+    token = create_access_token(identity=str(profile.user_id))
+    query = {
+        "grouper": "Local Agglomerative",
+        "from_datetime": NEWS_FROM.isoformat(),
+    }
+    return client.get(
+        f"/api/profiles/{profile.id}/{path}",
+        query_string=query,
+        headers={"Authorization": f"Bearer {token}", **headers},
+    )
+
+
+def is_cached(response):
+    return "cached;desc=1" in response.headers["Server-Timing"].split(", ")
+
+
+def stream_events(response):
+    """Read all events of a streamed response, which runs the rest of the pipeline."""
+    return [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+
+
+def make_news(summary="Summary", failed_sources=()):
+    post = {
+        "title": "Title",
+        "body": "Body",
+        "author": "Author",
+        "published_time": FROM.isoformat(),
+        "link": "https://example.com/1",
+        "other_authors": [],
+    }
+    return {
+        "post_groups": [{"summary": summary, "posts": [post, post]}],
+        "posts": [post],
+        "failed_sources": list(failed_sources),
+        "duplicates_removed": 0,
+    }
+
+
+def test_cached_news_have_stable_etag():
+    cache = NewsCache(ttl=timedelta(minutes=5), max_entries=2)
+
+    stored = cache.set("key", make_news())
+
+    assert cache.get("key") == stored
+    assert (
+        stored.etag == NewsCache(timedelta(minutes=5), 2).set("key", make_news()).etag
+    )
+    assert stored.etag != cache.set("other", make_news("Other summary")).etag
+
+
+def test_failed_news_are_not_cached():
+    cache = NewsCache(ttl=timedelta(minutes=5), max_entries=2)
+    failure = SourceFetchFailure(1, "Source", "https://example.com", "Timeout")
+
+    cache.set("failed source", make_news(failed_sources=[failure]))
+    cache.set("failed summary", make_news(f"Title. {SUMMARY_FAILED_MESSAGE}"))
+
+    assert cache.get("failed source") is None
+    assert cache.get("failed summary") is None
+
+
+def test_news_expire_and_are_evicted():
+    expired = NewsCache(ttl=timedelta(0), max_entries=2)
+    expired.set("key", make_news())
+    cache = NewsCache(ttl=timedelta(minutes=5), max_entries=2)
+    for key in ("a", "b", "c"):
+        cache.set(key, make_news())
+
+    assert expired.get("key") is None
+    assert cache.get("a") is None
+    assert cache.get("c") is not None
+
+
+def test_key_changes_with_sources_but_not_timezone():
+    key = news_key(1, SOURCES, "Grouper", FROM, None)
+    changed_source = [
+        SimpleNamespace(id=1, parser_name="RSS Feed", link="https://b.com")
+    ]
+
+    assert key == news_key(
+        1, SOURCES, "Grouper", FROM.astimezone(timezone(timedelta(hours=2))), None
+    )
+    assert key != news_key(1, changed_source, "Grouper", FROM, None)
+    assert key != news_key(1, [], "Grouper", FROM, None)
+    assert key != news_key(1, SOURCES, "Grouper", FROM, None, distance_threshold=0.3)
+
+
+def test_news_route_answers_cached_news_with_304(client, profile):
+    first = get_news(client, profile)
+    second = get_news(client, profile)
+    revalidated = get_news(client, profile, **{"If-None-Match": first.headers["ETag"]})
+
+    assert first.status_code == 200
+    assert not is_cached(first)
+    assert second.status_code == 200
+    assert second.headers["ETag"] == first.headers["ETag"]
+    assert is_cached(second)
+    assert second.json == first.json
+    assert revalidated.status_code == 304
+    assert is_cached(revalidated)
+
+
+def test_news_cache_is_bypassed_when_sources_change(client, profile, db):
+    first = get_news(client, profile)
+    db.session.add(
+        NewsSource(
+            name="Other",
+            link="https://example.com/other",
+            parser_name=MockParser.name,
+            profile=profile,
+        )
+    )
+    db.session.commit()
+
+    second = get_news(client, profile, **{"If-None-Match": first.headers["ETag"]})
+
+    assert second.status_code == 200
+    assert not is_cached(second)
+
+
+def test_stream_route_shares_cached_news(client, profile, caplog):
+    caplog.set_level(logging.INFO)
+    streamed = get_news(client, profile, path="news/stream")
+    streamed_events = stream_events(streamed)
+    replayed = get_news(client, profile, path="news/stream")
+    replayed_events = stream_events(replayed)
+    synchronous = get_news(client, profile)
+    revalidated = get_news(
+        client,
+        profile,
+        path="news/stream",
+        **{"If-None-Match": replayed.headers["ETag"]},
+    )
+
+    assert "ETag" not in streamed.headers
+    assert not is_cached(streamed)
+    assert [event["type"] for event in streamed_events] == ["post", "done"]
+    assert replayed_events == streamed_events
+    assert is_cached(replayed)
+    assert is_cached(synchronous)
+    assert synchronous.headers["ETag"] != replayed.headers["ETag"]
+    assert revalidated.status_code == 304
+    # metrics of the streamed pipeline are logged when the stream ends
+    assert "news stream" in caplog.text
+    assert "groups=0" in caplog.text
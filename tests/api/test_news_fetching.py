@@ -0,0 +1,93 @@
+import time
+from datetime import UTC, datetime
+from types import SimpleNamespace
+
+from conftest import MockParser
+
+from news_grouper.api.common.metrics import collect_metrics, count, timed
+from news_grouper.api.news_sources.fetching import fetch_posts
+
+
+class SlowParser(MockParser):
+    name = "slow_parser"
+
+    @classmethod
+    def get_posts(cls, link, from_datetime, to_datetime):
+        time.sleep(float(link.rsplit("/", maxsplit=1)[1]))
+        return super().get_posts(link, from_datetime, to_datetime)
+
+
+class FailingParser(MockParser):
+    name = "failing_parser"
+
+    @classmethod
+    def get_posts(cls, link, from_datetime, to_datetime):
+        raise RuntimeError("feed is broken")
+
+
+def make_source(source_id, parser, link):
+    return SimpleNamespace(
+        id=source_id, name=f"Source {source_id}", link=link, parser=parser
+    )
+
+
+def test_fetch_posts_runs_sources_concurrently():
+    sources = [make_source(i, SlowParser, "https://example.com/0.3") for i in range(5)]
+
+    start = time.monotonic()
+    result = fetch_posts(sources, datetime.now(tz=UTC), None)
+
+    assert time.monotonic() - start < 1
+    assert len(result.posts) == 5
+    assert result.failed_sources == []
+
+
+def test_fetch_posts_reports_timed_out_and_failed_sources():
+    sources = [
+        make_source(1, SlowParser, "https://example.com/0"),
+        make_source(2, SlowParser, "https://example.com/2"),
+        make_source(3, FailingParser, "https://example.com/feed"),
+    ]
+
+    start = time.monotonic()
+    result = fetch_posts(sources, datetime.now(tz=UTC), None, source_timeout=0.2)
+
+    assert time.monotonic() - start < 1
+    assert len(result.posts) == 1
+    failed = {failure.source_id: failure.reason for failure in result.failed_sources}
+    assert failed.keys() == {2, 3}
+    assert "Timed out" in failed[2]
+    assert "feed is broken" in failed[3]
+
+
+def test_fetch_posts_respects_total_budget():
+    sources = [make_source(i, SlowParser, "https://example.com/2") for i in range(2)]
+
+    start = time.monotonic()
+    result = fetch_posts(sources, datetime.now(tz=UTC), None, total_timeout=0.2)
+
+    assert time.monotonic() - start < 1
+    assert result.posts == []
+    assert len(result.failed_sources) == 2
+
+
+class TimedParser(MockParser):
+    name = "timed_parser"
+
+    @classmethod
+    def get_posts(cls, link, from_datetime, to_datetime):
+        with timed("extract"):
+            count("extracted")
+            return super().get_posts(link, from_datetime, to_datetime)
+
+
+def test_fetch_posts_records_metrics_of_workers():
+    sources = [make_source(i, TimedParser, "https://example.com") for i in range(3)]
+
+    with collect_metrics() as metrics:
+        fetch_posts(sources, datetime.now(tz=UTC), None)
+    fetch_posts(sources, datetime.now(tz=UTC), None)
+
+    assert metrics.counters == {"extracted": 3}
+    assert list(metrics.durations) == ["extract"]
+    assert "extract;dur=" in metrics.server_timing()
@@ -0,0 +1,179 @@
+import time
+from types import SimpleNamespace
+
+from conftest import make_post
+
+from news_grouper.api.common.metrics import collect_metrics
+from news_grouper.api.news_grouping.news_groupers import NewsGrouper
+from news_grouper.api.news_grouping.news_groupers.gemini import GeminiClient
+from news_grouper.api.news_grouping.pipeline import (
+    STREAM_FAILED_MESSAGE,
+    ProfilePosts,
+    collect_news,
+    replay_news,
+    stream_news,
+)
+from news_grouper.api.news_sources.fetching import SourceFetchFailure
+
+
+class PairsGrouper(NewsGrouper):
+    name = "Test Pairs"
+    description = "Groups posts with the same title"
+
+    @classmethod
+    def _get_groups(cls, posts, gemini_client, options=None):
+        groups = {}
+        for post in posts:
+            groups.setdefault(post.title, []).append(post)
+        return list(groups.values())
+
+    @classmethod
+    def summarize_posts(cls, posts, gemini_client):
+        # the first group takes longest to summarize
+        time.sleep(0.1 if posts[0].title == "slow" else 0)
+        return f"Summary of {posts[0].title}"
+
+    @classmethod
+    def summarize_posts_stream(cls, posts, gemini_client):
+        yield "Summary "
+        yield f"of {posts[0].title}"
+
+
+class FailingGrouper(PairsGrouper):
+    name = "Test Failing Summaries"
+    description = "Groups posts with the same title and fails to summarize them"
+
+    @classmethod
+    def summarize_posts(cls, posts, gemini_client):
+        raise ValueError("Summarizer crashed")
+
+
+def test_stream_news_sends_groups_before_summaries():
+    posts = [
+        make_post("streaming-1", title="slow"),
+        make_post("streaming-2", title="slow"),
+        make_post("streaming-3", title="single"),
+        make_post("streaming-4", title="fast"),
+        make_post("streaming-5", title="fast"),
+    ]
+    failure = SourceFetchFailure(1, "Source", "https://example.com/feed", "Timeout")
+    user = SimpleNamespace(api_key="key")
+
+    events = list(
+        stream_news(user, ProfilePosts(posts, [failure]), PairsGrouper.name)  # type: ignore
+    )
+
+    assert [event["type"] for event in events] == [
+        "group",
+        "post",
+        "group",
+        "summary",
+        "summary",
+        "done",
+    ]
+    assert events[0]["summary"] is None
+    assert [post["body"] for post in events[0]["posts"]] == [
+        "streaming-1",
+        "streaming-2",
+    ]
+    # summaries follow in the order they are ready
+    assert events[3]["group_id"] == 2
+    assert events[3]["summary"] == "Summary of fast"
+    assert events[4]["group_id"] == 0
+    assert events[5]["failed_sources"][0]["reason"] == "Timeout"
+
+
+def test_stream_news_streams_summaries():
+    posts = [make_post(f"chunked-{i}", title="chunked") for i in range(2)]
+    user = SimpleNamespace(api_key="key")
+
+    events = list(
+        stream_news(
+            user, ProfilePosts(posts, []), PairsGrouper.name, stream_summaries=True
+        )  # type: ignore
+    )
+
+    assert [event["type"] for event in events] == [
+        "group",
+        "summary_chunk",
+        "summary_chunk",
+        "summary",
+        "done",
+    ]
+    assert "".join(event["text"] for event in events[1:3]) == "Summary of chunked"
+    assert events[3]["summary"] == "Summary of chunked"
+
+
+def test_stream_news_ends_with_error_event_if_grouper_fails(caplog):
+    posts = [make_post(f"failing-{i}", title="pair") for i in range(2)]
+    user = SimpleNamespace(api_key="key")
+
+    events = list(stream_news(user, ProfilePosts(posts, []), FailingGrouper.name))  # type: ignore
+
+    assert [event["type"] for event in events] == ["group", "error"]
+    assert events[-1]["message"] == STREAM_FAILED_MESSAGE
+    assert "Summarizer crashed" in caplog.text
+
+
+def test_collected_news_are_replayed_in_groups_order():
+    posts = [
+        make_post("replayed-1", title="slow"),
+        make_post("replayed-2", title="slow"),
+        make_post("replayed-3", title="single"),
+        make_post("replayed-4", title="fast"),
+        make_post("replayed-5", title="fast"),
+    ]
+    user = SimpleNamespace(api_key="key")
+    collected = []
+
+    streamed = list(
+        collect_news(
+            stream_news(user, ProfilePosts(posts, []), PairsGrouper.name),  # type: ignore
+            collected.append,
+        )
+    )
+    replayed = list(replay_news(collected[0]))
+
+    assert [event["type"] for event in replayed] == [
+        "post",
+        "group",
+        "group",
+        "summary",
+        "summary",
+        "done",
+    ]
+    assert [event["summary"] for event in replayed[3:5]] == [
+        "Summary of slow",
+        "Summary of fast",
+    ]
+    assert replayed[-1] == streamed[-1]
+
+
+def test_failed_streams_are_not_collected():
+    posts = [make_post(f"uncollected-{i}", title="pair") for i in range(2)]
+    user = SimpleNamespace(api_key="key")
+    collected = []
+
+    list(
+        collect_news(
+            stream_news(user, ProfilePosts(posts, []), FailingGrouper.name),  # type: ignore
+            collected.append,
+        )
+    )
+
+    assert collected == []
+
+
+def test_grouping_records_metrics():
+    posts = [make_post(f"metrics-{i}", title="pair") for i in range(2)]
+    posts.append(make_post("metrics-2", title="single"))
+
+    with collect_metrics() as metrics:
+        PairsGrouper.group_posts(posts, GeminiClient(api_key="key"))
+
+    assert {"group", "summarize"} <= metrics.durations.keys()
+    assert metrics.counters == {
+        "groups": 1,
+        "summaries_cached": 0,
+        "summaries_generated": 1,
+    }
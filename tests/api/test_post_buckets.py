@@ -0,0 +1,101 @@
+from datetime import UTC, datetime, timedelta
+from types import SimpleNamespace
+from typing import ClassVar
+
+from conftest import MockParser
+
+from news_grouper.api.common.models import Post
+from news_grouper.api.news_sources.post_buckets import (
+    PostBucketCache,
+    bucket_start,
+    fetch_posts_by_buckets,
+)
+
+NOW = datetime.now(tz=UTC)
+
+
+class WindowParser(MockParser):
+    name = "window_parser"
+    # posts published every 30 minutes in the last two days
+    published: ClassVar[list[datetime]] = [
+        NOW - timedelta(minutes=30 * i) for i in range(96)
+    ]
+    starts: ClassVar[list[datetime]] = []
+
+    @classmethod
+    def get_posts(cls, link, from_datetime, to_datetime):
+        cls.starts.append(from_datetime)
+        return [
+            Post(
+                title="Title",
+                body=f"Body {published}",
+                published_time=published,
+                author="Author",
+                link=f"{link}/{published.isoformat()}",
+            )
+            for published in cls.published
+            if published >= from_datetime
+            and (to_datetime is None or published <= to_datetime)
+        ]
+
+
+def make_source():
+    return SimpleNamespace(
+        id=1,
+        name="Source",
+        link="https://example.com",
+        parser_name=WindowParser.name,
+        parser=WindowParser,
+    )
+
+
+def fetch(cache, from_datetime, to_datetime=None):
+    return fetch_posts_by_buckets(
+        [make_source()], from_datetime, to_datetime, cache
+    ).posts
+
+
+def test_sliding_window_fetches_only_since_previous_fetch():
+    WindowParser.starts = []
+    cache = PostBucketCache(retention=timedelta(days=7), max_feeds=8)
+
+    first = fetch(cache, NOW - timedelta(hours=24))
+    second = fetch(cache, NOW - timedelta(hours=23, minutes=50))
+
+    assert WindowParser.starts == [
+        bucket_start(NOW - timedelta(hours=24)),
+        bucket_start(NOW),
+    ]
+    assert len(first) == 49
+    assert [post.link for post in second] == [
+        post.link
+        for post in WindowParser.get_posts(
+            "https://example.com", NOW - timedelta(hours=23, minutes=50), None
+        )
+    ]
+
+
+def test_covered_past_range_is_not_fetched_again():
+    WindowParser.starts = []
+    cache = PostBucketCache(retention=timedelta(days=7), max_feeds=8)
+    fetch(cache, NOW - timedelta(hours=10))
+
+    posts = fetch(cache, NOW - timedelta(hours=5), NOW - timedelta(hours=4))
+
+    assert len(WindowParser.starts) == 1
+    assert len(posts) == 3
+    assert all(
+        NOW - timedelta(hours=5) <= post.published_time <= NOW - timedelta(hours=4)
+        for post in posts
+    )
+
+
+def test_earlier_range_than_cached_is_fetched_in_full():
+    WindowParser.starts = []
+    cache = PostBucketCache(retention=timedelta(days=7), max_feeds=8)
+    fetch(cache, NOW - timedelta(hours=2))
+
+    posts = fetch(cache, NOW - timedelta(hours=10))
+
+    assert WindowParser.starts[-1] == bucket_start(NOW - timedelta(hours=10))
+    assert len(posts) == 21
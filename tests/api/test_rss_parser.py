@@ -0,0 +1,78 @@
+from datetime import UTC, datetime, timedelta
+from email.utils import format_datetime
+
+import feedparser
+
+from news_grouper.api.news_sources.news_parsers import RSSFeedParser
+from news_grouper.api.news_sources.news_parsers.rss_parser import EARLY_STOP_ENTRIES
+
+NOW = datetime(2025, 1, 1, 12, tzinfo=UTC)
+
+
+def make_feed(published_times):
+    items = "".join(
+        f"<item><title>Post {i}</title><link>https://example.com/{i}</link>"
+        f"<description>&lt;p&gt;Body {i}&lt;/p&gt;</description>"
+        f"<pubDate>{format_datetime(published)}</pubDate></item>"
+        for i, published in enumerate(published_times)
+    )
+    return feedparser.parse(
+        f'<?xml version="1.0"?><rss version="2.0"><channel><title>Feed</title>'
+        f"{items}</channel></rss>"
+    )
+
+
+def count_calls(monkeypatch, name):
+    calls = []
+    method = getattr(RSSFeedParser, name)
+
+    def counted(entry):
+        calls.append(entry)
+        return method(entry)
+
+    monkeypatch.setattr(RSSFeedParser, name, counted)
+    return calls
+
+
+def test_bodies_are_extracted_only_for_entries_in_range(monkeypatch):
+    hourly = [NOW - timedelta(hours=i) for i in range(50)]
+    feed = make_feed(hourly)
+    monkeypatch.setattr(RSSFeedParser, "fetch_feed", lambda link: feed)
+    dated = count_calls(monkeypatch, "extract_published_time")
+    extracted = count_calls(monkeypatch, "extract_body")
+
+    posts = RSSFeedParser.get_posts(
+        "https://example.com/feed",
+        NOW - timedelta(hours=5),
+        NOW - timedelta(hours=2),
+    )
+
+    assert [post.body for post in posts] == ["Body 2", "Body 3", "Body 4", "Body 5"]
+    assert len(extracted) == 4
+    assert len(dated) == 6 + EARLY_STOP_ENTRIES
+
+
+def test_entries_out_of_order_are_not_skipped(monkeypatch):
+    oldest_first = [NOW - timedelta(hours=i) for i in reversed(range(50))]
+    pinned = [NOW - timedelta(days=30), *[NOW - timedelta(hours=i) for i in range(3)]]
+
+    for published_times in (oldest_first, pinned):
+        feed = make_feed(published_times)
+        monkeypatch.setattr(RSSFeedParser, "fetch_feed", lambda link, feed=feed: feed)
+
+        posts = RSSFeedParser.get_posts(
+            "https://example.com/feed", NOW - timedelta(hours=2)
+        )
+
+        assert len(posts) == 3
+
+
+def test_early_stop_can_be_disabled(monkeypatch):
+    feed = make_feed([NOW - timedelta(hours=i) for i in range(50)])
+    monkeypatch.setattr(RSSFeedParser, "fetch_feed", lambda link: feed)
+    monkeypatch.setattr(RSSFeedParser, "early_stop_entries", None)
+    dated = count_calls(monkeypatch, "extract_published_time")
+
+    RSSFeedParser.get_posts("https://example.com/feed", NOW - timedelta(hours=2))
+
+    assert len(dated) == 50
@@ -0,0 +1,82 @@
+from datetime import timedelta
+
+import pytest
+from conftest import FakeGeminiClient, make_post
+
+from news_grouper.api.common.models import PostGroup
+from news_grouper.api.news_grouping.news_groupers import NewsGrouper
+from news_grouper.api.news_grouping.news_groupers.gemini import SUMMARY_FAILED_MESSAGE
+from news_grouper.api.news_grouping.summary_cache import SummaryCache
+
+
+class SingleGroupGrouper(NewsGrouper):
+    name = "Test Single Group"
+    description = "Puts all posts into one group"
+
+    @classmethod
+    def _get_groups(cls, posts, gemini_client, options=None):
+        return [posts]
+
+
+@pytest.fixture
+def cache():
+    return SummaryCache(ttl=timedelta(hours=1), max_entries=2)
+
+
+def test_unchanged_groups_are_not_summarized_again(cache):
+    client = FakeGeminiClient(summary_cache=cache)
+    first, second = make_post("first"), make_post("second")
+
+    SingleGroupGrouper.group_posts([first, second], client)  # type: ignore
+    (group,) = SingleGroupGrouper.group_posts([second, first], client)  # type: ignore
+
+    assert client.summarized == [["first", "second"]]
+    assert isinstance(group, PostGroup)
+    assert group.summary == "Summary [1, 2]"
+    # posts are ordered as they were summarized, so cited ids stay correct
+    assert [post.body for post in group.posts] == ["first", "second"]
+
+
+def test_changed_groups_are_summarized(cache):
+    client = FakeGeminiClient(summary_cache=cache)
+
+    SingleGroupGrouper.group_posts([make_post("a"), make_post("b")], client)  # type: ignore
+    SingleGroupGrouper.group_posts(  # type: ignore
+        [make_post("a"), make_post("b"), make_post("c")],
+        client,  # type: ignore
+    )
+
+    assert client.summarized == [["a", "b"], ["a", "b", "c"]]
+
+
+def test_failed_summaries_are_not_cached(cache):
+    client = FakeGeminiClient(summary_cache=cache, summary=SUMMARY_FAILED_MESSAGE)
+    posts = [make_post("a"), make_post("b")]
+
+    SingleGroupGrouper.group_posts(posts, client)  # type: ignore
+    SingleGroupGrouper.group_posts(posts, client)  # type: ignore
+
+    assert len(client.summarized) == 2
+
+
+def test_summary_cache_evicts_least_recently_used(cache):
+    groups = [[make_post(f"{i}a"), make_post(f"{i}b")] for i in range(3)]
+    for group in groups:
+        cache.set(group, "gemini", "Summary")
+
+    assert cache.get(groups[0], "gemini") is None
+    assert cache.get(groups[2], "gemini") is not None
+
+
+def test_persistent_summary_cache_survives_restart(db):
+    posts = [make_post("a"), make_post("b")]
+    SummaryCache(ttl=timedelta(hours=1), max_entries=10, persistent=True).set(
+        posts, "gemini", "Summary"
+    )
+
+    restarted = SummaryCache(ttl=timedelta(hours=1), max_entries=10, persistent=True)
+
+    cached = restarted.get(posts, "gemini")
+    assert cached is not None
+    assert cached.summary == "Summary"
+    assert restarted.get(posts, "other") is None